@@ -0,0 +1,132 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+# Alert aggregation by incident.
+# Repeated alerts for the same (source IP, attack type) are folded into one
+# open "incident". When it goes quiet for `window` seconds, lasts longer than
+# `max_window`, or has to make room (table full), the incident is closed and
+# turned into a single rollup record: first/last seen, count and peak rate.
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class Incident:
+    __slots__ = ("src_ip", "attack_type", "description", "first_seen", "last_seen",
+                 "count", "bucket", "bucket_count", "peak_rate", "continued")
+
+    def __init__(self, src_ip, attack_type, description, now, continued=False):
+        self.src_ip = src_ip
+        self.attack_type = attack_type
+        self.description = description
+        self.first_seen = now
+        self.last_seen = now
+        self.count = 1
+        self.bucket = int(now)   # Current second, for the peak rate
+        self.bucket_count = 1
+        self.peak_rate = 1       # Max alerts seen in one second
+        self.continued = continued # Follows an incident closed by max_window
+
+    def hit(self, description, now):
+        self.count += 1
+        self.last_seen = now
+        self.description = description
+        second = int(now)
+        if second == self.bucket:
+            self.bucket_count += 1
+        else:
+            self.bucket = second
+            self.bucket_count = 1
+        if self.bucket_count > self.peak_rate:
+            self.peak_rate = self.bucket_count
+
+    def rollup(self):
+        """Dashboard-compatible record summarizing the whole incident."""
+        last = datetime.fromtimestamp(self.last_seen).strftime(TIME_FORMAT)
+        return {
+            "timestamp": last,
+            "logged_at": last,
+            "src_ip": self.src_ip,
+            "type": self.attack_type,
+            "description": f"[Aggregated {self.count} times] {self.description}",
+            "count": self.count,
+            "kind": "rollup",
+            "first_seen": datetime.fromtimestamp(self.first_seen).strftime(TIME_FORMAT),
+            "last_seen": last,
+            "duration": round(self.last_seen - self.first_seen, 3),
+            "peak_rate": self.peak_rate,
+        }
+
+
+class AlertAggregator:
+    """Bounded table of open incidents, in least-recently-seen order."""
+
+    def __init__(self, window=5, max_window=300, max_entries=10000):
+        self.window = window           # Quiet time closing an incident
+        self.max_window = max_window   # Longest incident before a rollup is forced
+        self.max_entries = max_entries
+        self._open = OrderedDict()     # (src_ip, type) -> Incident
+
+        # Counters
+        self.closed = 0
+        self.evicted = 0 # Closed early because the table was full
+
+    def observe(self, src_ip, attack_type, description, now=None):
+        """Adds one alert. Returns (incident, is_new, rollups) where rollups are
+        the records of the incidents closed meanwhile."""
+        now = time.time() if now is None else now
+        rollups = self.expire(now)
+        key = (src_ip, attack_type)
+        incident = self._open.get(key)
+
+        continued = False
+        if incident is not None and now - incident.first_seen >= self.max_window:
+            # Long-running attack: one rollup per max_window, same incident goes on
+            del self._open[key]
+            rollups.extend(self._close(incident))
+            incident = None
+            continued = True
+
+        if incident is not None:
+            incident.hit(description, now)
+            self._open.move_to_end(key)
+            return incident, False, rollups
+
+        incident = self._open[key] = Incident(src_ip, attack_type, description, now, continued)
+        if len(self._open) > self.max_entries:
+            _, oldest = self._open.popitem(last=False)
+            self.evicted += 1
+            rollups.extend(self._close(oldest))
+        return incident, True, rollups
+
+    def expire(self, now=None):
+        """Closes the incidents quiet for `window` seconds, returns their rollups."""
+        now = time.time() if now is None else now
+        rollups = []
+        while self._open:
+            key, incident = next(iter(self._open.items()))
+            if now - incident.last_seen < self.window:
+                break
+            del self._open[key]
+            rollups.extend(self._close(incident))
+        return rollups
+
+    def close_all(self):
+        """Closes every open incident (shutdown), returns their rollups."""
+        rollups = []
+        for incident in self._open.values():
+            rollups.extend(self._close(incident))
+        self._open.clear()
+        return rollups
+
+    def _close(self, incident):
+        self.closed += 1
+        # A single alert was already written when the incident opened
+        return [incident.rollup()] if incident.count > 1 else []
+
+    def __len__(self):
+        return len(self._open)
+
+    def stats(self):
+        return {"open": len(self._open), "max_entries": self.max_entries,
+                "closed": self.closed, "evicted": self.evicted}
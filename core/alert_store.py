@@ -0,0 +1,203 @@
+import glob
+import json
+import os
+import time
+from datetime import datetime
+
+# Append-only alert history.
+# Each alert is one JSON line appended to logs/attacks.jsonl, so logging
+# costs the same whatever the size of the history. When the active segment
+# gets too big or too old it is renamed (atomically) to a dated segment and
+# a fresh one is started; nothing is ever rewritten or thrown away.
+
+FSYNC_POLICIES = ("none", "interval", "always")
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Which store the IDS writes to ("jsonl" or "sqlite"), recorded in the log
+# directory when it starts: the dashboard follows it rather than guessing
+# from the files present (an old alerts.db may outlive a switch back to JSONL)
+BACKEND_FILE = "alert_backend"
+
+
+class JsonlAlertStore:
+    """Newline-delimited JSON alert log with size/time based segment rotation.
+
+    fsync policies:
+      - "none":     flush to the OS only (fastest, may lose the last alerts on power loss)
+      - "interval": fsync at most every `fsync_interval` seconds
+      - "always":   fsync after every write
+    """
+
+    def __init__(self, directory, name="attacks", max_segment_bytes=10 * 1024 * 1024,
+                 max_segment_age=24 * 3600, fsync="interval", fsync_interval=1.0, max_segments=0):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync} (expected one of {FSYNC_POLICIES})")
+        self.directory = directory
+        self.name = name
+        self.path = os.path.join(directory, f"{name}.jsonl")
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_segments = max_segments # 0 = keep the whole history
+
+        self._fh = None
+        self._size = 0
+        self._started = None
+        self._last_fsync = 0.0
+        self.rotations = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    # --- Writing ---
+    def _open(self):
+        self._fh = open(self.path, "a", encoding="utf-8")
+        self._size = self._fh.tell()
+        self._started = self._segment_start() if self._size else time.time()
+
+    def _segment_start(self):
+        """Time of the first alert of an existing active segment."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                first = json.loads(f.readline())
+            return datetime.strptime(first.get("logged_at", ""), TIME_FORMAT).timestamp()
+        except (OSError, ValueError, AttributeError):
+            return time.time()
+
+    def append(self, entry):
+        self.append_many([entry])
+
+    def append_many(self, entries):
+        """Appends several alerts with a single write (and at most one fsync)."""
+        if not entries:
+            return
+        if self._fh is None:
+            self._open()
+        if self._should_rotate():
+            self.rotate()
+
+        data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries)
+        self._fh.write(data)
+        self._fh.flush()
+        self._size += len(data.encode("utf-8"))
+
+        now = time.monotonic()
+        if self.fsync == "always" or (self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval):
+            os.fsync(self._fh.fileno())
+            self._last_fsync = now
+
+    def _should_rotate(self):
+        if not self._size:
+            return False
+        if self.max_segment_bytes and self._size >= self.max_segment_bytes:
+            return True
+        return bool(self.max_segment_age) and time.time() - self._started >= self.max_segment_age
+
+    def rotate(self):
+        """Closes the active segment and renames it to a dated one."""
+        if self._fh is not None:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+            self._fh = None
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            return None
+
+        stamp = datetime.fromtimestamp(self._started or time.time()).strftime("%Y%m%d-%H%M%S")
+        n = 0
+        target = os.path.join(self.directory, f"{self.name}-{stamp}-{n:03d}.jsonl")
+        while os.path.exists(target):
+            n += 1
+            target = os.path.join(self.directory, f"{self.name}-{stamp}-{n:03d}.jsonl")
+        os.replace(self.path, target) # Atomic: readers see the old or the new name
+        self.rotations += 1
+        self._prune()
+        self._open()
+        return target
+
+    def _prune(self):
+        if not self.max_segments:
+            return
+        old = self.segments()[:-1] # Rotated ones, oldest first
+        for path in old[:max(0, len(old) - self.max_segments)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+            self._fh = None
+
+    # --- Reading ---
+    def segments(self):
+        return segment_paths(self.directory, self.name)
+
+    def tail(self, n=500):
+        return tail_alerts(self.directory, n, self.name)
+
+
+def write_backend(directory, backend):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, BACKEND_FILE), "w", encoding="utf-8") as f:
+        f.write(backend)
+
+
+def read_backend(directory):
+    """Backend recorded by the IDS, or None (not started yet, older version)."""
+    try:
+        with open(os.path.join(directory, BACKEND_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def segment_paths(directory, name="attacks"):
+    """All segments, oldest first (the active one last)."""
+    rotated = sorted(glob.glob(os.path.join(directory, f"{name}-*.jsonl")))
+    active = os.path.join(directory, f"{name}.jsonl")
+    return rotated + ([active] if os.path.exists(active) else [])
+
+
+def _tail_lines(path, n, block=64 * 1024, end=None):
+    """Last `n` complete lines of a file, reading backwards from the end
+    (or from byte `end`)."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell() if end is None else min(end, f.tell())
+        data = b""
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.splitlines()
+    if pos > 0:
+        lines = lines[1:] # First one is probably cut
+    return lines[-n:] if n else []
+
+
+def tail_alerts(directory, n=500, name="attacks", active_end=None):
+    """The last `n` alerts (oldest first), without reading the whole history.
+    `active_end` stops the read of the active segment at that byte offset."""
+    alerts = []
+    active = os.path.join(directory, f"{name}.jsonl")
+    for path in reversed(segment_paths(directory, name)):
+        try:
+            lines = _tail_lines(path, n - len(alerts), end=active_end if path == active else None)
+        except OSError:
+            continue
+        chunk = []
+        for line in lines:
+            try:
+                chunk.append(json.loads(line))
+            except ValueError:
+                pass # Line cut by a crash
+        alerts = chunk + alerts
+        if len(alerts) >= n:
+            break
+    return alerts[-n:]
@@ -0,0 +1,150 @@
+import queue
+import threading
+import time
+import traceback
+
+# Background alert writer.
+# Detection threads only put alerts in an in-memory queue; a dedicated thread
+# writes them to the store in groups (group commit), when the batch is full
+# or when `flush_interval` seconds have passed. Disk latency never reaches
+# the packet processing path.
+
+_WAKE = None # Put by close() so an idle writer stops now, not after flush_interval
+
+
+class AsyncAlertWriter:
+    """Group-commits alerts to a store (anything with append_many/close)."""
+
+    def __init__(self, store, batch_size=100, flush_interval=0.5, max_queue=100000):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(max_queue)
+        self._thread = None
+        self._stop = threading.Event()
+        self._exit_lock = threading.Lock()
+        self._exited = False         # The thread left its loop: nothing more will be written
+        self._close_on_exit = False  # close() timed out: the thread closes the store itself
+
+        # Metrics
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0          # Queue full: we drop rather than block detection
+        self.last_latency = 0.0   # Seconds spent in the last append_many
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="alert-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, entry):
+        """Queues one alert, never blocks."""
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _collect(self):
+        """Waits for a first alert, then gathers more until the batch is full
+        or the flush interval is over."""
+        try:
+            first = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return []
+        if first is _WAKE:
+            self._queue.task_done()
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is _WAKE:
+                self._queue.task_done()
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._commit(batch)
+        with self._exit_lock:
+            self._exited = True
+            close = self._close_on_exit
+        if close:
+            self.store.close()
+
+    def _commit(self, batch):
+        start = time.perf_counter()
+        try:
+            self.store.append_many(batch)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            latency = time.perf_counter() - start
+            self.last_latency = latency
+            self.max_latency = max(self.max_latency, latency)
+            self.total_latency += latency
+            self.written += len(batch)
+            self.batches += 1
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self):
+        """Blocks until every queued alert has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self, timeout=10):
+        """Writes what is left, stops the thread and closes the store."""
+        self._stop.set()
+        if self._thread is not None:
+            try:
+                self._queue.put_nowait(_WAKE)
+            except queue.Full:
+                pass # Busy writer: it will see _stop after this batch
+            self._thread.join(timeout)
+            with self._exit_lock:
+                if not self._exited:
+                    # Still in a commit (slow disk): writing or closing under it would
+                    # interleave lines, so the thread finishes the queue and closes the store
+                    self._close_on_exit = True
+                    print(f"[!] Alert writer still busy after {timeout}s "
+                          f"({self._queue.qsize()} queued): it will close the store when done")
+                    return
+                if self._close_on_exit:
+                    self._thread = None
+                    return # An earlier close() timed out: the thread closed the store
+            self._thread = None
+        # Thread gone (or never started): write the rest ourselves
+        leftovers = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not _WAKE:
+                leftovers.append(entry)
+        if leftovers:
+            self._commit(leftovers)
+        self.store.close()
+
+    def stats(self):
+        return {
+            "queue_depth": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "last_write_ms": round(self.last_latency * 1000, 3),
+            "max_write_ms": round(self.max_latency * 1000, 3),
+            "avg_write_ms": round(self.total_latency / self.batches * 1000, 3) if self.batches else 0.0,
+        }
@@ -0,0 +1,264 @@
+import heapq
+import json
+import os
+import threading
+import time
+import traceback
+
+from core.firewall_manager import FirewallManager, normalize_ip
+from core.rules_file import read_rules, update_rules
+
+# Automatic blocking.
+# Alerts only update an in-memory "pending" table; a background thread turns
+# it into firewall batches once per `batch_interval`, never making more than
+# `max_changes_per_sec` rule changes, and lifts each block when its time is up
+# (min-heap of expiry times). Active blocks are saved in logs/active_blocks.json
+# so they survive a restart, and mirrored in the blocklist of
+# logs/firewall_rules.json (the dashboard and the detection engine read it).
+# The responder only removes the blocklist entries it added itself: an IP an
+# operator blocked by hand is never auto-blocked, expired or unlisted.
+
+# Attack type -> severity. Spoofed or non-IP sources are never blocked:
+# blocking the forged address would only hurt its real owner.
+SEVERITIES = {
+    "SYN Flood": "high",
+    "Brute Force": "high",
+    "Port Scan": "medium",
+    "Network Scan": "medium",
+    "Drapeaux Anormaux": "low",
+}
+
+# Severity -> block duration in seconds (0 = alert only)
+DURATIONS = {"high": 3600, "medium": 900, "low": 0}
+
+MAX_DURATION = 24 * 3600 # Repeat offenders get twice as long each time, up to this
+MAX_OFFENDERS = 100000   # Past offences remembered (beyond that, only active ones are kept)
+
+
+def severity_of(attack_type):
+    for prefix, severity in SEVERITIES.items():
+        if attack_type.startswith(prefix): # "Brute Force (SSH)" -> "Brute Force"
+            return severity
+    return None
+
+
+class AutoResponder:
+    """Turns alerts into time-limited firewall blocks."""
+
+    def __init__(self, firewall=FirewallManager, durations=None, state_file="logs/active_blocks.json",
+                 rules_file="logs/firewall_rules.json", max_changes_per_sec=20, batch_interval=1.0,
+                 is_protected=None):
+        self.firewall = firewall           # Anything with block_many/unblock_many
+        self.durations = dict(DURATIONS, **(durations or {}))
+        self.state_file = state_file
+        self.rules_file = rules_file
+        self.max_changes_per_sec = max_changes_per_sec
+        self.batch_interval = batch_interval
+        self.is_protected = is_protected   # e.g. whitelist check: never block those
+
+        self.active = {}     # ip -> {"expires", "type", "blocks"}
+        self._expiry = []    # heap of (expires, ip); stale entries are skipped
+        self._to_block = {}  # ip -> (duration, attack_type), coalesced between batches
+        self._to_unblock = set()
+        self._offences = {}  # ip -> how many times it was blocked (escalation)
+        self._owned = set()  # Blocklist entries added by the responder (the others are manual, batch lock)
+        self._tokens = max_changes_per_sec
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()        # Pending tables, shared with on_alert()
+        self._batch_lock = threading.Lock()  # One batch at a time (firewall + files)
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Counters
+        self.blocked = 0
+        self.unblocked = 0
+        self.deferred = 0 # Changes pushed to a later batch by the rate limit (per batch)
+
+        self._load_state()
+
+    # --- Input (called from the logging path, must stay cheap) ---
+    def on_alert(self, src_ip, attack_type, description=None, timestamp=None):
+        duration = self.durations.get(severity_of(attack_type), 0)
+        if not duration:
+            return
+        ip = normalize_ip(src_ip)
+        if ip is None:
+            return
+        with self._lock:
+            if ip in self.active and ip not in self._to_unblock:
+                return
+            self._to_unblock.discard(ip)
+            current = self._to_block.get(ip)
+            if current is None or current[0] < duration:
+                self._to_block[ip] = (duration, attack_type)
+
+    # --- Background thread ---
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="auto-responder", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.batch_interval):
+            try:
+                self.process()
+            except Exception:
+                traceback.print_exc()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.max_changes_per_sec,
+                           self._tokens + (now - self._last_refill) * self.max_changes_per_sec)
+        self._last_refill = now
+
+    def process(self, now=None):
+        """Applies one batch of pending blocks/unblocks. Returns (blocked, unblocked)."""
+        with self._batch_lock:
+            return self._process(time.time() if now is None else now)
+
+    def _process(self, now):
+        # self._lock only covers the in-memory tables: the firewall calls and
+        # the file writes happen outside it, so on_alert() never waits on them
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expires, ip = heapq.heappop(self._expiry)
+                entry = self.active.get(ip)
+                if entry is not None and entry["expires"] == expires:
+                    self._to_unblock.add(ip)
+
+            self._refill()
+            budget = int(self._tokens)
+            # New blocks first: stopping an attack matters more than lifting an old block
+            blocks = list(self._to_block.items())[:budget]
+            unblocks = sorted(self._to_unblock)[:budget - len(blocks)]
+            for ip, _ in blocks:
+                del self._to_block[ip]
+            self._to_unblock.difference_update(unblocks)
+            self.deferred += len(self._to_block) + len(self._to_unblock)
+            self._tokens -= len(blocks) + len(unblocks)
+
+        handed_over = []
+        if blocks or unblocks:
+            # Blocked by hand: not ours to block, expire or unlist
+            manual = set(self._read_rules().get("blocklist", [])) - self._owned
+            blocks = [(ip, b) for ip, b in blocks if ip not in manual
+                      and not (self.is_protected is not None and self.is_protected(ip))]
+            handed_over = [ip for ip in unblocks if ip in manual] # Listed by hand since: it stays
+            unblocks = [ip for ip in unblocks if ip not in manual]
+        if not blocks and not unblocks and not handed_over:
+            return [], []
+
+        done_blocks = set(self.firewall.block_many([ip for ip, _ in blocks])) if blocks else set()
+        done_unblocks = set(self.firewall.unblock_many(unblocks)) if unblocks else set()
+        in_firewall = self._firewall_blocked() if blocks or unblocks else set()
+        # Refused unblocks (rule still in the firewall) are retried on the next
+        # batch; the ones already gone count as lifted
+        failed_unblocks = [ip for ip in unblocks if ip not in done_unblocks and ip in in_firewall]
+        unblocks = [ip for ip in unblocks if ip not in failed_unblocks]
+
+        with self._lock:
+            for ip, (duration, attack_type) in blocks:
+                if ip not in done_blocks and ip not in in_firewall:
+                    continue # The firewall refused it: it will be retried on the next alert
+                offences = self._offences.get(ip, 0)
+                self._offences[ip] = offences + 1
+                expires = now + min(MAX_DURATION, duration * 2 ** offences)
+                self.active[ip] = {"expires": expires, "type": attack_type, "blocks": offences + 1}
+                heapq.heappush(self._expiry, (expires, ip))
+            for ip in unblocks + handed_over:
+                self.active.pop(ip, None)
+            for ip in failed_unblocks:
+                if ip not in self._to_block: # Re-offended meanwhile: the new block wins
+                    self._to_unblock.add(ip)
+            if len(self._offences) > MAX_OFFENDERS:
+                self._offences = {ip: n for ip, n in self._offences.items() if ip in self.active}
+            self.blocked += len(done_blocks)
+            self.unblocked += len(done_unblocks)
+            active = dict(self.active)
+            offences = dict(self._offences)
+
+        self._sync_blocklist(set(active), set(unblocks))
+        self._save_state(active, offences)
+        if done_blocks or done_unblocks or failed_unblocks:
+            print(f"[*] Auto-response: +{len(done_blocks)} blocked, -{len(done_unblocks)} expired "
+                  f"({len(active)} active)")
+        if failed_unblocks:
+            print(f"[!] Auto-response: {len(failed_unblocks)} unblock(s) refused by the firewall, will retry")
+        return sorted(done_blocks), sorted(done_unblocks)
+
+    def _firewall_blocked(self):
+        try:
+            return set(self.firewall.get_blocked_ips())
+        except Exception:
+            return set()
+
+    # --- Persistence ---
+    def _load_state(self):
+        try:
+            with open(self.state_file, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for ip, entry in state.get("active", {}).items():
+            self.active[ip] = entry
+            if entry["expires"] <= now:
+                self._to_unblock.add(ip) # Expired while we were down
+            else:
+                heapq.heappush(self._expiry, (entry["expires"], ip))
+        self._offences = state.get("offences", {})
+        # Older state files don't say which entries are ours: the active blocks are
+        self._owned = set(state.get("owned", self.active))
+        # The firewall may have lost them (reboot): re-apply on the first batch
+        live = [ip for ip in self.active if ip not in self._to_unblock]
+        if live:
+            self.firewall.block_many(live)
+
+    def _save_state(self, active, offences):
+        _write_json(self.state_file, {"active": active, "offences": offences,
+                                      "owned": sorted(self._owned)})
+
+    def _read_rules(self):
+        return read_rules(self.rules_file)
+
+    def _sync_blocklist(self, active, removed):
+        """Keeps the blocklist of firewall_rules.json in line with the active
+        auto-blocks. Only the entries the responder added are removed; the
+        change is applied under the rules file lock (see core/rules_file.py)."""
+        removed = removed & self._owned
+        added = set()
+        def change(rules):
+            blocklist = [ip for ip in rules["blocklist"] if ip not in removed]
+            added.update(active - set(blocklist))
+            rules["blocklist"] = blocklist + sorted(added)
+        update_rules(self.rules_file, change)
+        self._owned = (self._owned - removed) | added
+
+    def close(self, timeout=5):
+        """Stops the thread and applies what is still pending (one batch)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        try:
+            self.process()
+        except Exception:
+            traceback.print_exc()
+
+    def stats(self):
+        return {
+            "active": len(self.active),
+            "pending": len(self._to_block) + len(self._to_unblock),
+            "blocked": self.blocked,
+            "unblocked": self.unblocked,
+            "deferred": self.deferred,
+        }
+
+
+def _write_json(path, data):
+    """Writes through a temporary file: readers never see half a file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp, path)
@@ -0,0 +1,99 @@
+import sys
+import os
+import ipaddress
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.detection import BRUTE_FORCE_SERVICES
+
+# Kernel-side pre-filtering.
+# We build a BPF expression matching only the packets the enabled detectors
+# look at, so the rest of the traffic is dropped before it reaches Python.
+
+# Above this many whitelisted IPs the filter gets too long for the kernel
+# (BPF programs are limited to 4096 instructions, and the expression appears
+# twice: untagged and VLAN-tagged), we then skip the exclusion
+MAX_WHITELIST_IN_FILTER = 100
+
+_SYN_ONLY = "tcp[tcpflags] == tcp-syn"
+
+
+def detector_filters(enabled, port_scan_max_port=1024, flows=False):
+    """BPF fragments per enabled detector, split in two groups: the ones
+    applying to a source IP that the whitelist can exclude, and the others.
+
+    With `flows` (connection tracking), the SYN flood and brute force
+    detectors follow whole connections: they need every TCP packet, the
+    server's side included, even when the server is whitelisted."""
+    ip_parts = []
+    other_parts = []
+    if flows and ("syn_flood" in enabled or "brute_force" in enabled):
+        other_parts.append("tcp")
+        enabled = set(enabled) - {"syn_flood", "brute_force"}
+
+    if "arp_spoofing" in enabled:
+        other_parts.append("(arp and arp[6:2] == 2)") # ARP replies only
+    if "ip_spoofing" in enabled:
+        ip_parts.append("ip") # Needs every IPv4 packet to compare MACs
+    if "syn_flood" in enabled:
+        ip_parts.append(f"({_SYN_ONLY})")
+    if "port_scan" in enabled:
+        if port_scan_max_port is None:
+            ip_parts.append("tcp")
+        else:
+            ip_parts.append(f"(tcp dst portrange 0-{port_scan_max_port})")
+    if "brute_force" in enabled:
+        ports = " or ".join(str(p) for p in sorted(BRUTE_FORCE_SERVICES))
+        ip_parts.append(f"({_SYN_ONLY} and tcp dst port ({ports}))")
+    if "abnormal_flags" in enabled:
+        ip_parts.append(
+            "(tcp[tcpflags] == 0"                                          # NULL
+            " or tcp[tcpflags] & (tcp-fin|tcp-push|tcp-urg) == (tcp-fin|tcp-push|tcp-urg)"  # XMAS
+            " or tcp[tcpflags] & (tcp-syn|tcp-fin) == (tcp-syn|tcp-fin))"  # SYN+FIN
+        )
+    if "dns_spoofing" in enabled:
+        # DNS doesn't check the whitelist: the resolver may well be trusted
+        other_parts.append("(udp src port 53)")
+    return ip_parts, other_parts
+
+
+def _ipv4_entries(whitelist):
+    """Whitelist entries usable in the filter: IPv4 addresses and networks."""
+    entries = []
+    for entry in whitelist:
+        try:
+            net = ipaddress.ip_network(str(entry).strip(), strict=False)
+        except ValueError:
+            continue
+        if net.version == 4: # The IP detectors only see IPv4
+            entries.append(str(net) if net.prefixlen < 32 else str(net.network_address))
+    return entries
+
+def _whitelist_clause(whitelist):
+    entries = _ipv4_entries(whitelist)
+    if not entries or len(entries) > MAX_WHITELIST_IN_FILTER:
+        return ""
+    return " and not (" + " or ".join(f"src net {ip}" for ip in entries) + ")"
+
+
+def build_filter(enabled, whitelist=(), port_scan_max_port=1024, flows=False):
+    """BPF expression for the enabled detectors, or None if nothing to capture."""
+    ip_parts, other_parts = detector_filters(enabled, port_scan_max_port, flows)
+    parts = list(other_parts)
+    if ip_parts:
+        parts.insert(0, "((" + " or ".join(ip_parts) + ")" + _whitelist_clause(whitelist) + ")")
+    if not parts:
+        return None
+    expr = " or ".join(parts)
+    # The primitives only look at untagged frames: "vlan" shifts the offsets
+    # past an 802.1Q tag (what core/decoder.py skips) for the rest of the
+    # expression, so the tagged copy must come last
+    return f"{expr} or (vlan and ({expr}))"
+
+
+def engine_filter(engine):
+    """Filter matching the current configuration of a DetectionEngine."""
+    engine.reload_lists()
+    # In sketch mode the port scan covers the full port range
+    max_port = None if engine.SCAN_MODE == "sketch" else 1024
+    return build_filter(engine.enabled, engine.whitelist, port_scan_max_port=max_port,
+                        flows=engine.flows is not None)
@@ -0,0 +1,183 @@
+import socket
+import struct
+
+# Lightweight frame decoder working directly on the raw bytes.
+# It only extracts the fields used by DetectionEngine, so we skip the full
+# Scapy dissection (the biggest CPU cost in the capture loop).
+
+ETH_P_IP = 0x0800
+ETH_P_ARP = 0x0806
+ETH_P_VLAN = (0x8100, 0x88A8)
+
+IPPROTO_TCP = 6
+IPPROTO_UDP = 17
+
+DNS_PORTS = (53, 5353)  # Same ports Scapy binds the DNS layer to
+
+# Scapy prints TCP flags in bit order "FSRPAUECN" (SYN+ACK -> "SA"),
+# the detectors compare against those strings, so we precompute all 512 values.
+_FLAG_STRINGS = tuple(
+    "".join(name for bit, name in enumerate("FSRPAUECN") if value >> bit & 1)
+    for value in range(512)
+)
+
+_ETH = struct.Struct("!6s6sH")
+_ARP = struct.Struct("!HHBBH6s4s")
+_TCP = struct.Struct("!HHIIH")
+_UDP = struct.Struct("!HH")
+_DNS = struct.Struct("!HHHHHH")
+_RR = struct.Struct("!HHIH")
+
+
+class PacketInfo:
+    """The handful of fields the detectors need from one frame."""
+
+    __slots__ = ("time", "src_mac", "arp_op", "arp_psrc", "ip_src", "ip_dst",
+                 "sport", "dport", "tcp_flags", "dns_id", "dns_qname", "dns_answers")
+
+    def __init__(self, time=None):
+        self.time = time
+        self.src_mac = None
+        self.arp_op = None
+        self.arp_psrc = None
+        self.ip_src = None
+        self.ip_dst = None
+        self.sport = None
+        self.dport = None
+        self.tcp_flags = None     # None when the packet is not TCP
+        self.dns_id = None
+        self.dns_qname = None
+        self.dns_answers = None   # A records of a DNS response
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__
+                           if getattr(self, k) is not None)
+        return f"PacketInfo({fields})"
+
+
+def tcp_flags_str(value):
+    """Converts the raw TCP flag bits to Scapy's string form ("S", "SA", ...)."""
+    return _FLAG_STRINGS[value & 0x1FF]
+
+
+def decode(raw, ts=None):
+    """Decodes an Ethernet frame.
+
+    Returns a PacketInfo, or None when the frame is truncated or uses a
+    feature we don't parse; the caller then falls back to Scapy.
+    """
+    try:
+        return _decode(memoryview(raw), ts)
+    except (struct.error, IndexError, ValueError, UnicodeDecodeError):
+        return None
+
+
+def _decode(buf, ts):
+    info = PacketInfo(ts)
+    _dst, src, ethertype = _ETH.unpack_from(buf, 0)
+    info.src_mac = src.hex(":")
+    offset = 14
+
+    # 802.1Q / QinQ tags
+    while ethertype in ETH_P_VLAN:
+        ethertype, = struct.unpack_from("!H", buf, offset + 2)
+        offset += 4
+
+    if ethertype == ETH_P_ARP:
+        hwtype, ptype, hwlen, plen, op, _hwsrc, psrc = _ARP.unpack_from(buf, offset)
+        if ptype != ETH_P_IP or hwlen != 6 or plen != 4:
+            return None
+        info.arp_op = op
+        info.arp_psrc = socket.inet_ntoa(psrc)
+        return info
+
+    if ethertype != ETH_P_IP:
+        return info  # IPv6, LLDP, ... : nothing for the detectors
+
+    version_ihl = buf[offset]
+    if version_ihl >> 4 != 4:
+        return None
+    ihl = (version_ihl & 0x0F) * 4
+    if ihl < 20:
+        return None
+    total_len, = struct.unpack_from("!H", buf, offset + 2)
+    frag, = struct.unpack_from("!H", buf, offset + 6)
+    proto = buf[offset + 9]
+    info.ip_src = socket.inet_ntoa(buf[offset + 12:offset + 16])
+    info.ip_dst = socket.inet_ntoa(buf[offset + 16:offset + 20])
+
+    if frag & 0x1FFF:
+        return info  # Non-first fragment: no transport header
+    l4 = offset + ihl
+    end = min(len(buf), offset + total_len) if total_len >= ihl else len(buf)
+
+    if proto == IPPROTO_TCP:
+        sport, dport, _seq, _ack, off_flags = _TCP.unpack_from(buf, l4)
+        info.sport = sport
+        info.dport = dport
+        info.tcp_flags = _FLAG_STRINGS[off_flags & 0x1FF]
+    elif proto == IPPROTO_UDP:
+        sport, dport = _UDP.unpack_from(buf, l4)
+        info.sport = sport
+        info.dport = dport
+        if sport in DNS_PORTS or dport in DNS_PORTS:
+            _decode_dns(buf[l4 + 8:end], info)
+    return info
+
+
+def _decode_dns(dns, info):
+    dns_id, flags, qdcount, ancount, _ns, _ar = _DNS.unpack_from(dns, 0)
+    if not flags & 0x8000:
+        return  # Query, we only look at responses
+    info.dns_id = dns_id
+    offset = 12
+
+    qname = "unknown"
+    for i in range(qdcount):
+        name, offset = _read_name(dns, offset)
+        if i == 0:
+            qname = name
+        offset += 4  # qtype + qclass
+    info.dns_qname = qname
+
+    answers = []
+    for _ in range(ancount):
+        _name, offset = _read_name(dns, offset)
+        rtype, _rclass, _ttl, rdlen = _RR.unpack_from(dns, offset)
+        offset += 10
+        if rtype == 1 and rdlen == 4:  # A record (IPv4)
+            answers.append(socket.inet_ntoa(dns[offset:offset + 4]))
+        offset += rdlen
+        if offset > len(dns):
+            raise ValueError("truncated DNS record")
+    info.dns_answers = answers
+
+
+def _read_name(dns, offset):
+    """Reads a (possibly compressed) domain name, returns (name, next offset)."""
+    labels = []
+    next_offset = None
+    jumps = 0
+    while True:
+        length = dns[offset]
+        if length & 0xC0 == 0xC0:
+            pointer = ((length & 0x3F) << 8) | dns[offset + 1]
+            if next_offset is None:
+                next_offset = offset + 2
+            jumps += 1
+            if jumps > 16:
+                raise ValueError("DNS compression loop")
+            offset = pointer
+            continue
+        if length & 0xC0:
+            raise ValueError("unsupported DNS label")
+        offset += 1
+        if length == 0:
+            break
+        label = bytes(dns[offset:offset + length])
+        if len(label) != length:
+            raise ValueError("truncated DNS label")
+        labels.append(label.decode())
+        offset += length
+    name = ".".join(labels) + "."
+    return name, (next_offset if next_offset is not None else offset)
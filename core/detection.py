@@ -1,90 +1,330 @@
 import sys
 import os
 import time
-import json
 
 # Teacher says: On s'assure que Python trouve bien le dossier "core"
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.logger import LogManager
+from core.sliding_window import SlidingWindowCounter
+from core.state_table import StateTable
+from core.ip_index import IPListFile
+from core.port_sketch import ScanSketch, hash_port, hash_host
+from core.flow_table import FlowTable, NEW, REPEAT, COMPLETED, CLOSED
+
+# Noms des détecteurs (pour activer/désactiver et construire le filtre BPF)
+SCAN_MODES = ("exact", "sketch")
+
+DETECTORS = ("arp_spoofing", "ip_spoofing", "syn_flood", "port_scan",
+             "brute_force", "abnormal_flags", "dns_spoofing")
+
+# Services surveillés pour le Brute Force
+BRUTE_FORCE_SERVICES = {21: "FTP", 22: "SSH", 23: "Telnet", 3389: "RDP"}
 
 class DetectionEngine:
-    def __init__(self):
+    def __init__(self, logger=None, enabled=None):
         # Initialisation du "cerveau" de l'IDS
-        self.logger = LogManager()
+        # (un worker multi-process passe son propre logger qui renvoie les alertes)
+        self.logger = logger if logger is not None else LogManager()
         
         # Fichiers de configuration
         self.whitelist_file = "logs/whitelist.json"
         self.firewall_file = "logs/firewall_rules.json"
         
-        # Mémoire pour les détections
-        self.syn_times = {}           # Pour le SYN Flood
-        self.port_scan_times = {}     # Pour le Scan de Ports
-        self.brute_force_attempts = {} # Pour le Brute Force
-        self.arp_cache = {}           # Pour le Spoofing ARP
-        self.dns_queries = {}         # Pour le Spoofing DNS
-        
-        # Listes de sécurité
-        self.whitelist = []
-        self.blocklist = []
+        # Listes de sécurité (index compilés, rechargés seulement si le fichier change)
+        self.whitelist_source = IPListFile(self.whitelist_file)
+        self.blocklist_source = IPListFile(self.firewall_file, lambda data: data.get("blocklist", []))
+        self.whitelist = self.whitelist_source.index
+        self.blocklist = self.blocklist_source.index
         self.last_reload = 0
+
+        # Détecteurs actifs (tous par défaut)
+        self.enabled = set(enabled) if enabled is not None else set(DETECTORS)
+        unknown = self.enabled - set(DETECTORS)
+        if unknown:
+            raise ValueError(f"Détecteurs inconnus : {', '.join(sorted(unknown))}")
+
+        # Horloge : en mode replay on utilise l'heure de capture du paquet
+        self.packet_time = None
+
+        # Mesures (core/metrics.py) : None = aucune instrumentation
+        self.metrics = None
         
         # Seuils de détection (faciles à modifier)
         self.SYNC_LIMIT = 30   # 30 paquets SYN
         self.SCAN_LIMIT = 15   # 15 ports différents
         self.BRUTE_LIMIT = 5   # 5 essais de connexion
         self.WINDOW = 10       # Fenêtre de temps de 10 secondes
+        self.BRUTE_WINDOW = 30 # Fenêtre du Brute Force (30 secondes)
+
+        # Scan de ports : "exact" (ports <= 1024, un dict par source)
+        # ou "sketch" (tous les ports, bitmap de taille fixe par source)
+        self.SCAN_MODE = "exact"
+        self.HOST_SCAN_LIMIT = 30 # Machines différentes (scan horizontal, mode sketch)
+        self.SKETCH_BITS = 1024   # Taille des bitmaps (128 octets chacun)
+
+        # Suivi des connexions TCP (core/flow_table.py), désactivé par défaut.
+        # Activé, le SYN Flood compte les nouvelles connexions (pas les SYN
+        # retransmis) et n'alerte que si elles restent semi-ouvertes ; le Brute
+        # Force compte les sessions établies puis fermées rapidement.
+        self.CONN_TRACKING = False
+        self.HALF_OPEN_RATIO = 0.8 # Part minimale de poignées de main non terminées (SYN Flood)
+        self.SHORT_SESSION = 30    # Une session fermée en moins de 30s = un essai (Brute Force)
+        self.MAX_FLOWS = 100000    # Connexions suivies au maximum
+        self.HANDSHAKE_TTL = 30    # On oublie une poignée de main sans réponse après 30s
+        self.FLOW_IDLE_TTL = 300   # ... une connexion établie silencieuse après 5 min
+        self.FLOW_CLOSE_TTL = 10   # ... une connexion en cours de fermeture après 10s
+        self.flows = None
+
+        # Limites mémoire : nombre max d'entrées par table et durée de vie
+        self.MAX_ENTRIES = 100000  # Par table (les sources les plus anciennes partent en premier)
+        self.ARP_TTL = 3600        # On oublie une MAC après 1h sans nouvelles
+        self.DNS_TTL = 60          # Les réponses DNS d'une transaction arrivent en quelques secondes
+        self.SWEEP_INTERVAL = 5    # Nettoyage des entrées expirées toutes les 5 secondes
+        self.last_sweep = 0
+        
+        # Mémoire pour les détections (bornée, voir core/state_table.py)
+        self.syn_times = self._table("syn_flood", self.WINDOW)                    # Pour le SYN Flood
+        self.port_scan_times = self._table("port_scan", self.WINDOW)              # Pour le Scan de Ports
+        self.brute_force_attempts = self._table("brute_force", self.BRUTE_WINDOW) # Pour le Brute Force
+        self.arp_cache = self._table("arp_cache", self.ARP_TTL)                   # Pour le Spoofing ARP
+        self.dns_queries = self._table("dns_queries", self.DNS_TTL)               # Pour le Spoofing DNS
+        self.state_tables = [self.syn_times, self.port_scan_times, self.brute_force_attempts,
+                             self.arp_cache, self.dns_queries]
+
+    def now(self):
+        """Heure courante vue par les détecteurs (paquet rejoué ou horloge murale)."""
+        if self.packet_time is not None:
+            return self.packet_time
+        return time.time()
+
+    def settings(self):
+        """Seuils et limites actuels (attributs en MAJUSCULES)."""
+        return {k: v for k, v in vars(self).items() if k.isupper()}
+
+    def configure(self, **settings):
+        """Change les seuils (ex: configure(SYNC_LIMIT=50, SCAN_MODE="sketch"))."""
+        old_mode = self.SCAN_MODE
+        for name, value in settings.items():
+            if not name.isupper() or not hasattr(self, name):
+                raise ValueError(f"Paramètre inconnu : {name}")
+            setattr(self, name, value)
+        if self.SCAN_MODE not in SCAN_MODES:
+            raise ValueError(f"SCAN_MODE invalide : {self.SCAN_MODE} (attendu : {SCAN_MODES})")
+        if self.SCAN_MODE != old_mode:
+            self.port_scan_times.clear() # Les entrées n'ont plus le même format
+        if bool(self.CONN_TRACKING) != (self.flows is not None):
+            self.flows = self._flow_table() if self.CONN_TRACKING else None
+            self.syn_times.clear() # Idem pour le SYN Flood et le Brute Force
+            self.brute_force_attempts.clear()
+
+        # Les tables suivent les nouvelles fenêtres et limites
+        ttls = ((self.syn_times, self.WINDOW), (self.port_scan_times, self.WINDOW),
+                (self.brute_force_attempts, self.BRUTE_WINDOW),
+                (self.arp_cache, self.ARP_TTL), (self.dns_queries, self.DNS_TTL))
+        for table, ttl in ttls:
+            table.ttl = ttl
+            table.max_entries = self.MAX_ENTRIES
+        if self.flows is not None:
+            self.flows.max_flows = self.MAX_FLOWS
+            self.flows.handshake_ttl = self.HANDSHAKE_TTL
+            self.flows.idle_ttl = self.FLOW_IDLE_TTL
+            self.flows.close_ttl = self.FLOW_CLOSE_TTL
+            self.flows.short_session = self.SHORT_SESSION
+
+    def _table(self, name, ttl):
+        return StateTable(name, max_entries=self.MAX_ENTRIES, ttl=ttl, clock=self.now)
+
+    def _flow_table(self):
+        return FlowTable(self.MAX_FLOWS, self.HANDSHAKE_TTL, self.FLOW_IDLE_TTL, self.FLOW_CLOSE_TTL,
+                         self.SHORT_SESSION, clock=self.now)
+
+    def sweep(self, now=None):
+        """Supprime les sources inactives de toutes les tables."""
+        now = self.now() if now is None else now
+        self.last_sweep = now
+        # Le logger en profite pour fermer les incidents terminés
+        tick = getattr(self.logger, "tick", None)
+        if tick is not None:
+            tick(now)
+        removed = sum(table.sweep(now) for table in self.state_tables)
+        if self.flows is not None:
+            removed += self.flows.sweep(now)
+        return removed
+
+    def state_stats(self):
+        """Taille et compteurs d'éviction de chaque table."""
+        stats = {table.name: table.stats() for table in self.state_tables}
+        if self.flows is not None:
+            stats["flows"] = self.flows.stats()
+        return stats
 
     def is_safe(self, ip):
         """Vérifie si une IP est autorisée ou déjà bloquée."""
         now = time.time()
         # On recharge les listes toutes les 5 secondes
         if now - self.last_reload > 5:
-            self._load_lists()
+            self.reload_lists()
             self.last_reload = now
         
         if ip in self.whitelist: return True
         if ip in self.blocklist: return True  # On ignore les IPs déjà bloquées
         return False
 
-    def _load_lists(self):
-        """Charge la Whitelist et la Blocklist depuis les fichiers JSON."""
-        # Whitelist
-        if os.path.exists(self.whitelist_file):
-            try:
-                with open(self.whitelist_file, "r") as f: self.whitelist = json.load(f)
-            except: self.whitelist = ["127.0.0.1"]
-        
-        # Blocklist (Firewall)
-        if os.path.exists(self.firewall_file):
-            try:
-                with open(self.firewall_file, "r") as f:
-                    self.blocklist = json.load(f).get("blocklist", [])
-            except: self.blocklist = []
+    def reload_lists(self):
+        """Recharge la Whitelist et la Blocklist si les fichiers JSON ont changé."""
+        # On remplace la référence d'un coup : jamais d'index à moitié construit
+        if self.whitelist_source.refresh():
+            self.whitelist = self.whitelist_source.index
+        if self.blocklist_source.refresh():
+            self.blocklist = self.blocklist_source.index
+
+    def analyze(self, info):
+        """Passe un paquet décodé (core.decoder.PacketInfo) à tous les détecteurs.
+
+        Retourne la liste des alertes levées par ce paquet.
+        """
+        metrics = self.metrics
+        if metrics is not None:
+            # Un paquet sur `sample_every` est chronométré détecteur par détecteur
+            metrics.packets += 1
+            metrics.countdown -= 1
+            if metrics.countdown <= 0:
+                return metrics.measure(self, info)
+        return self._analyze(info, self)
+
+    def _analyze(self, info, det):
+        """Corps de analyze() : `det` fournit les méthodes detect_* (le moteur
+        lui-même, ou la sonde de mesure qui les chronomètre)."""
+        # Heure de capture en mode replay, None (horloge murale) en direct
+        self.packet_time = info.time
+        now = self.now()
+        if now - self.last_sweep >= self.SWEEP_INTERVAL:
+            self.sweep(now)
+        alerts = []
+        enabled = self.enabled
+
+        # ARP : on surveille les changements de MAC
+        if info.arp_op is not None and "arp_spoofing" in enabled:
+            alerts.append(det.detect_arp_spoofing(info.arp_psrc, info.src_mac, info.arp_op))
+
+        if info.ip_src is not None:
+            src_ip = info.ip_src
+
+            # IP Spoofing (MAC différente de celle connue)
+            if info.src_mac and "ip_spoofing" in enabled:
+                alerts.append(det.detect_ip_spoofing(src_ip, info.src_mac))
+
+            # TCP
+            if info.tcp_flags is not None:
+                flags = info.tcp_flags
+                dst_port = info.dport
+                if self.flows is not None:
+                    alerts += self._track(info, det, now)
+                else:
+                    if "syn_flood" in enabled:
+                        alerts.append(det.detect_syn_flood(src_ip, flags, dst_port))
+                    if flags == "S" and "brute_force" in enabled:
+                        alerts.append(det.detect_brute_force(src_ip, dst_port))
+                if "port_scan" in enabled:
+                    alerts.append(det.detect_port_scan(src_ip, dst_port, info.ip_dst, flags))
+                if "abnormal_flags" in enabled:
+                    alerts.append(det.detect_abnormal_flags(src_ip, flags, dst_port))
+
+            # DNS (réponses avec des enregistrements A)
+            if info.dns_answers and "dns_spoofing" in enabled:
+                alerts.append(det.detect_dns_spoofing(info.dns_id, info.dns_qname, info.dns_answers))
+
+        return [a for a in alerts if a]
+
+    def _track(self, info, det, now, create=True):
+        """Suivi des connexions : SYN Flood et Brute Force voient le client et
+        le service de la connexion, quel que soit le sens du paquet."""
+        flags = info.tcp_flags
+        flow = self.flows.update(info.ip_src, info.sport, info.ip_dst, info.dport, flags, now, create)
+        if flow is None or flow.event is None:
+            return []
+        alerts = []
+        if "syn_flood" in self.enabled:
+            alerts.append(det.detect_syn_flood(flow.client, flags, flow.server_port, flow))
+        if "brute_force" in self.enabled:
+            alerts.append(det.detect_brute_force(flow.client, flow.server_port, flow))
+        return alerts
+
+    def track_flow(self, info):
+        """Met à jour les connexions déjà suivies avec un paquet TCP, sans autre
+        détection (mode multi-process : copie d'un paquet envoyée au worker de
+        sa destination, voir core/workers.py). Aucune connexion n'est créée ici :
+        elles le sont sur le worker de leur client.
+        """
+        if self.flows is None or info.tcp_flags is None:
+            return []
+        self.packet_time = info.time
+        return [a for a in self._track(info, self, self.now(), create=False) if a]
 
     # --- 1. DETECTION SYN FLOOD ---
-    def detect_syn_flood(self, src_ip, tcp_flags, dst_port):
+    def detect_syn_flood(self, src_ip, tcp_flags, dst_port, flow=None):
+        if flow is not None:
+            return self._detect_syn_flood_flow(src_ip, flow)
         if self.is_safe(src_ip) or tcp_flags != "S": return None
         
-        now = time.time()
-        if src_ip not in self.syn_times: self.syn_times[src_ip] = []
+        now = self.now()
+        counter = self.syn_times.get(src_ip)
+        if counter is None:
+            counter = self.syn_times[src_ip] = SlidingWindowCounter(self.WINDOW)
         
-        # On ajoute le nouveau paquet et on nettoie les vieux
-        self.syn_times[src_ip].append(now)
-        self.syn_times[src_ip] = [t for t in self.syn_times[src_ip] if now - t < self.WINDOW]
+        # On ajoute le nouveau paquet (les vieux sortent de la fenêtre)
+        count = counter.add(now)
         
-        if len(self.syn_times[src_ip]) > self.SYNC_LIMIT:
-            msg = f"SYN Flood detecté : {len(self.syn_times[src_ip])} paquets en {self.WINDOW}s"
-            self.logger.log_alert(src_ip, "SYN Flood", msg)
-            self.syn_times[src_ip] = [] # Reset
+        if count > self.SYNC_LIMIT:
+            msg = f"SYN Flood detecté : {count} paquets en {self.WINDOW}s"
+            self.logger.log_alert(src_ip, "SYN Flood", msg, timestamp=now)
+            counter.reset()
             return f"[!!!] ALERT: {msg}"
         return None
 
+    def _detect_syn_flood_flow(self, src_ip, flow):
+        """Suivi des connexions : on compte les connexions ouvertes par la source
+        (un SYN retransmis n'en ouvre pas de nouvelle) et celles qui ont terminé
+        leur poignée de main. Un pic de connexions qui aboutissent (navigateur,
+        proxy...) n'est pas un SYN Flood : seules les connexions semi-ouvertes
+        comptent pour l'alerte.
+        """
+        event = flow.event
+        if event not in (NEW, REPEAT, COMPLETED) or self.is_safe(src_ip): return None
+
+        now = self.now()
+        # [connexions ouvertes, connexions abouties] ; la seconde n'est créée
+        # qu'à la première poignée de main terminée (un flood n'en a jamais)
+        counters = self.syn_times.get(src_ip)
+        if counters is None:
+            if event == COMPLETED: return None
+            counters = self.syn_times[src_ip] = [SlidingWindowCounter(self.WINDOW), None]
+        if event == COMPLETED:
+            if counters[1] is None:
+                counters[1] = SlidingWindowCounter(self.WINDOW)
+            counters[1].add(now)
+            return None
+
+        count = counters[0].add(now)
+        if count > self.SYNC_LIMIT:
+            completed = counters[1].count(now) if counters[1] is not None else 0
+            half_open = 1 - min(completed, count) / count
+            if half_open >= self.HALF_OPEN_RATIO:
+                msg = f"SYN Flood detecté : {count} connexions en {self.WINDOW}s, {half_open:.0%} semi-ouvertes"
+                self.logger.log_alert(src_ip, "SYN Flood", msg, timestamp=now)
+                counters[0].reset()
+                counters[1] = None
+                return f"[!!!] ALERT: {msg}"
+        return None
+
     # --- 2. DETECTION PORT SCAN ---
-    def detect_port_scan(self, src_ip, dst_port):
+    def detect_port_scan(self, src_ip, dst_port, dst_ip=None, tcp_flags=None):
+        if self.SCAN_MODE == "sketch":
+            return self._detect_scan_sketch(src_ip, dst_port, dst_ip, tcp_flags)
         if self.is_safe(src_ip) or dst_port > 1024: return None
         
-        now = time.time()
+        now = self.now()
         if src_ip not in self.port_scan_times: self.port_scan_times[src_ip] = {}
         
         # On enregistre le port visité
@@ -93,29 +333,87 @@ class DetectionEngine:
         
         if len(self.port_scan_times[src_ip]) > self.SCAN_LIMIT:
             msg = f"Scan de Ports detecté : {len(self.port_scan_times[src_ip])} ports scannés"
-            self.logger.log_alert(src_ip, "Port Scan", msg)
+            self.logger.log_alert(src_ip, "Port Scan", msg, timestamp=now)
             self.port_scan_times[src_ip] = {}
             return f"[!!!] ALERT: {msg}"
         return None
 
+    def _detect_scan_sketch(self, src_ip, dst_port, dst_ip, tcp_flags):
+        """Mode "sketch" : tous les ports (0-65535), mémoire fixe par source.
+
+        On ne compte que les tentatives (pas de drapeau ACK) : les réponses d'un
+        serveur vers les ports éphémères de ses clients ne sont pas des scans.
+        """
+        if self.is_safe(src_ip): return None
+        if tcp_flags is not None and "A" in tcp_flags: return None
+
+        now = self.now()
+        sketch = self.port_scan_times.get(src_ip)
+        if sketch is None:
+            sketch = self.port_scan_times[src_ip] = ScanSketch(self.WINDOW, self.SKETCH_BITS)
+
+        # Scan vertical : beaucoup de ports sur une même cible
+        # Estimation arrondie : sans collision, 15 ports donnent ~15.1 (pas d'alerte à 15)
+        ports = round(sketch.ports.add(hash_port(dst_port), now))
+        if ports > self.SCAN_LIMIT:
+            msg = f"Scan de Ports detecté : ~{ports} ports scannés"
+            self.logger.log_alert(src_ip, "Port Scan", msg, timestamp=now)
+            sketch.ports.reset()
+            return f"[!!!] ALERT: {msg}"
+
+        # Scan horizontal : beaucoup de machines visitées
+        if dst_ip is not None:
+            hosts = round(sketch.hosts.add(hash_host(dst_ip), now))
+            if hosts > self.HOST_SCAN_LIMIT:
+                msg = f"Scan Réseau detecté : ~{hosts} machines visitées (port {dst_port})"
+                self.logger.log_alert(src_ip, "Network Scan", msg, timestamp=now)
+                sketch.hosts.reset()
+                return f"[!!!] ALERT: {msg}"
+        return None
+
     # --- 3. DETECTION BRUTE FORCE ---
-    def detect_brute_force(self, src_ip, dst_port):
+    def detect_brute_force(self, src_ip, dst_port, flow=None):
         if self.is_safe(src_ip): return None
         
-        services = {21: "FTP", 22: "SSH", 23: "Telnet", 3389: "RDP"}
+        services = BRUTE_FORCE_SERVICES
         if dst_port not in services: return None
+        if flow is not None:
+            return self._detect_brute_force_flow(src_ip, dst_port, flow)
         
-        now = time.time()
+        now = self.now()
         key = (src_ip, dst_port)
-        if key not in self.brute_force_attempts: self.brute_force_attempts[key] = []
+        counter = self.brute_force_attempts.get(key)
+        if counter is None:
+            counter = self.brute_force_attempts[key] = SlidingWindowCounter(self.BRUTE_WINDOW)
         
-        self.brute_force_attempts[key].append(now)
-        self.brute_force_attempts[key] = [t for t in self.brute_force_attempts[key] if now - t < 30]
+        count = counter.add(now)
         
-        if len(self.brute_force_attempts[key]) > self.BRUTE_LIMIT:
-            msg = f"Brute Force sur {services[dst_port]} ({len(self.brute_force_attempts[key])} essais)"
-            self.logger.log_alert(src_ip, f"Brute Force ({services[dst_port]})", msg)
-            self.brute_force_attempts[key] = []
+        if count > self.BRUTE_LIMIT:
+            msg = f"Brute Force sur {services[dst_port]} ({count} essais)"
+            self.logger.log_alert(src_ip, f"Brute Force ({services[dst_port]})", msg, timestamp=now)
+            counter.reset()
+            return f"[!!!] ALERT: {msg}"
+        return None
+
+    def _detect_brute_force_flow(self, src_ip, dst_port, flow):
+        """Suivi des connexions : un essai = une session établie puis fermée en
+        moins de SHORT_SESSION secondes (mot de passe refusé, on recommence).
+        Les SYN retransmis et les connexions refusées ne comptent pas.
+        """
+        if flow.event != CLOSED or flow.duration() > self.SHORT_SESSION: return None
+
+        now = self.now()
+        service = BRUTE_FORCE_SERVICES[dst_port]
+        key = (src_ip, dst_port)
+        counter = self.brute_force_attempts.get(key)
+        if counter is None:
+            counter = self.brute_force_attempts[key] = SlidingWindowCounter(self.BRUTE_WINDOW)
+
+        count = counter.add(now)
+        if count > self.BRUTE_LIMIT:
+            msg = f"Brute Force sur {service} ({count} sessions courtes)"
+            self.logger.log_alert(src_ip, f"Brute Force ({service})", msg, timestamp=now)
+            counter.reset()
             return f"[!!!] ALERT: {msg}"
         return None
 
@@ -125,7 +423,7 @@ class DetectionEngine:
         
         if src_ip in self.arp_cache and self.arp_cache[src_ip].lower() != src_mac.lower():
             msg = f"ARP Spoofing! {src_ip} a changé d'adresse MAC ({self.arp_cache[src_ip]} -> {src_mac})"
-            self.logger.log_alert(src_ip, "ARP Spoofing", msg)
+            self.logger.log_alert(src_ip, "ARP Spoofing", msg, timestamp=self.now())
             return f"[!!!] ALERT: {msg}"
         
         self.arp_cache[src_ip] = src_mac
@@ -136,7 +434,7 @@ class DetectionEngine:
         # On vérifie si la MAC envoyant cet IP est celle qu'on connaît
         if src_ip in self.arp_cache and self.arp_cache[src_ip].lower() != src_mac.lower():
             msg = f"IP Spoofing! L'IP {src_ip} est utilisée par une MAC inconnue : {src_mac}"
-            self.logger.log_alert(src_ip, "IP Spoofing", msg)
+            self.logger.log_alert(src_ip, "IP Spoofing", msg, timestamp=self.now())
             return f"[!!!] ALERT: {msg}"
         return None
 
@@ -148,7 +446,7 @@ class DetectionEngine:
         # Si on voit une deuxième réponse différente pour le même ID
         if not set(answers).issubset(self.dns_queries[dns_id]["ips"]):
             msg = f"DNS Spoofing sur {dns_name}! Réponses contradictoires détectées."
-            self.logger.log_alert("Serv_DNS", "DNS Spoofing", msg)
+            self.logger.log_alert("Serv_DNS", "DNS Spoofing", msg, timestamp=self.now())
             return f"[!!!] ALERT: {msg}"
         return None
 
@@ -162,6 +460,6 @@ class DetectionEngine:
         elif "S" in tcp_flags and "F" in tcp_flags: msg = "SYN+FIN (Combinaison illégale)"
         
         if msg:
-            self.logger.log_alert(src_ip, "Drapeaux Anormaux", msg)
+            self.logger.log_alert(src_ip, "Drapeaux Anormaux", msg, timestamp=self.now())
             return f"[!!!] ALERT: {msg}"
         return None
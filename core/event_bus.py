@@ -0,0 +1,213 @@
+import json
+import os
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+
+# Live event channel from the IDS to the dashboards.
+# A small TCP server on localhost speaks line-delimited JSON. Every event gets
+# a sequence number and is kept in a ring buffer, so a dashboard that lost
+# its connection can come back and ask for everything after the last number
+# it saw. Publishing never blocks: events are queued per client and a client
+# that cannot keep up is disconnected (it reconnects and catches up).
+#
+# Protocol:
+#   server -> {"kind": "hello", "session": "...", "seq": <last seq>}
+#   client -> {"since": <seq>}          (omit to only get new events)
+#   server -> {"kind": "alert"|"stats"|..., "seq": n, "data": {...}}  one per line
+#   server -> {"kind": "gap", "seq": n}  when the ring no longer holds `since`
+
+EVENT_HOST = "127.0.0.1"
+EVENT_PORT = 8765
+
+
+class _Client:
+    __slots__ = ("sock", "inbuf", "outbuf", "subscribed")
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.inbuf = b""
+        self.outbuf = bytearray()
+        self.subscribed = False
+
+
+class EventServer:
+    """Fans events out to any number of local subscribers."""
+
+    def __init__(self, host=EVENT_HOST, port=EVENT_PORT, ring_size=10000, max_client_buffer=4 * 1024 * 1024):
+        self.host = host
+        self.port = port
+        self.max_client_buffer = max_client_buffer
+        self.session = f"{os.getpid():x}-{time.time_ns():x}" # Changes on every start
+        self.seq = 0
+        self._ring = deque(maxlen=ring_size) # (seq, encoded line)
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._server = None
+        self._thread = None
+        self._stop = threading.Event()
+
+        # Counters
+        self.published = 0
+        self.kicked = 0 # Slow clients disconnected
+
+    def start(self):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((self.host, self.port))
+        self._server.listen(16)
+        self._server.setblocking(False)
+        self.port = self._server.getsockname()[1] # When started with port 0
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._server, selectors.EVENT_READ, "accept")
+        self._selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+        self._thread = threading.Thread(target=self._run, name="event-server", daemon=True)
+        self._thread.start()
+        return self
+
+    # --- Publishing (any thread) ---
+    def publish(self, kind, data):
+        with self._lock:
+            self.seq += 1
+            line = (json.dumps({"kind": kind, "seq": self.seq, "data": data}, ensure_ascii=False) + "\n").encode()
+            self._ring.append((self.seq, line))
+            self.published += 1
+            for client in self._clients.values():
+                if client.subscribed:
+                    client.outbuf += line
+        self._wake()
+        return self.seq
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass # Buffer full: the loop is already awake
+
+    # --- Server loop ---
+    def _run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                pending = any(c.outbuf for c in self._clients.values())
+            # A socket buffer was full: retry soon rather than waiting for the next event
+            for key, mask in self._selector.select(timeout=0.05 if pending else 1.0):
+                if key.data == "accept":
+                    self._accept()
+                elif key.data == "wake":
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                else:
+                    client = key.data
+                    if mask & selectors.EVENT_READ:
+                        self._read(client)
+            self._flush_all()
+        for client in list(self._clients.values()):
+            self._drop(client)
+        self._selector.close()
+        self._server.close()
+
+    def _accept(self):
+        try:
+            sock, _ = self._server.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        client = _Client(sock)
+        with self._lock:
+            self._clients[sock.fileno()] = client
+            hello = {"kind": "hello", "session": self.session, "seq": self.seq}
+            client.outbuf += (json.dumps(hello) + "\n").encode()
+        self._selector.register(sock, selectors.EVENT_READ, client)
+
+    def _read(self, client):
+        try:
+            data = client.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(client)
+            return
+        client.inbuf += data
+        while b"\n" in client.inbuf:
+            line, client.inbuf = client.inbuf.split(b"\n", 1)
+            try:
+                request = json.loads(line)
+            except ValueError:
+                continue
+            self._subscribe(client, request.get("since"))
+
+    def _subscribe(self, client, since):
+        with self._lock:
+            if since is not None and not client.subscribed:
+                oldest = self._ring[0][0] if self._ring else self.seq + 1
+                if since + 1 < oldest:
+                    # Part of what the client missed is gone: it must re-read the log
+                    client.outbuf += (json.dumps({"kind": "gap", "seq": since}) + "\n").encode()
+                for seq, line in self._ring:
+                    if seq > since:
+                        client.outbuf += line
+            client.subscribed = True
+
+    def _flush_all(self):
+        with self._lock:
+            clients = [c for c in self._clients.values() if c.outbuf]
+        for client in clients:
+            with self._lock:
+                if len(client.outbuf) > self.max_client_buffer:
+                    self.kicked += 1
+                    slow = True
+                else:
+                    slow = False
+                    data = bytes(client.outbuf)
+            if slow:
+                self._drop(client)
+                continue
+            try:
+                sent = client.sock.send(data)
+            except BlockingIOError:
+                continue
+            except OSError:
+                self._drop(client)
+                continue
+            with self._lock:
+                del client.outbuf[:sent]
+
+    def _drop(self, client):
+        with self._lock:
+            self._clients.pop(client.sock.fileno(), None)
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+
+    def close(self, timeout=2):
+        """Tries to deliver what is queued, then closes every connection."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                pending = any(c.outbuf for c in self._clients.values())
+            if not pending:
+                break
+            self._wake()
+            time.sleep(0.05)
+        self._stop.set()
+        self._wake()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {"clients": len(self._clients), "seq": self.seq,
+                    "published": self.published, "kicked": self.kicked}
@@ -1,54 +1,300 @@
+import ipaddress
+import json
+import platform
 import subprocess
-import os
+
+# Firewall backends.
+# Every backend adds/removes many IPs per call and keeps an in-process cache
+# of what it has blocked, so listing the blocked IPs never re-parses the
+# firewall. Commands go through an executor, which can be swapped for
+# DryRunExecutor to see (and test) what would be run without touching the host.
+
+
+def normalize_ip(ip):
+    """Returns the canonical form of an IP address, or None for anything else
+    (names like "DNS_Server", networks, garbage)."""
+    try:
+        return str(ipaddress.ip_address(str(ip).strip()))
+    except ValueError:
+        return None
+
+
+class FirewallError(Exception):
+    pass
+
+
+class SubprocessExecutor:
+    """Runs a command for real. Raises FirewallError when it fails."""
+
+    def __call__(self, argv, input=None):
+        try:
+            result = subprocess.run(argv, input=input, capture_output=True, text=True)
+        except OSError as e:
+            raise FirewallError(f"{argv[0]}: {e}")
+        if result.returncode != 0:
+            raise FirewallError(result.stderr.strip() or f"{argv[0]} exited with {result.returncode}")
+        return result.stdout
+
+
+class DryRunExecutor:
+    """Records the commands instead of running them.
+
+    `responses` maps a command (tuple of arguments) to the output it should
+    return; anything else returns "". Set `fail` to make every command fail.
+    """
+
+    def __init__(self, responses=None, fail=False):
+        self.responses = responses or {}
+        self.fail = fail
+        self.commands = [] # (argv, input) in call order
+
+    def __call__(self, argv, input=None):
+        self.commands.append((list(argv), input))
+        if self.fail:
+            raise FirewallError("dry-run failure")
+        return self.responses.get(tuple(argv), "")
+
+
+class FirewallBackend:
+    """Interface shared by the backends."""
+
+    name = "none"
+
+    def __init__(self, executor=None):
+        self.run = executor or SubprocessExecutor()
+        self._blocked = None # Cache, loaded from the firewall on first use
+
+    def block_many(self, ips):
+        """Blocks every valid IP of `ips`. Returns the list actually added."""
+        raise NotImplementedError
+
+    def unblock_many(self, ips):
+        """Unblocks every IP of `ips`. Returns the list actually removed."""
+        raise NotImplementedError
+
+    def _load(self):
+        raise NotImplementedError
+
+    def blocked(self):
+        if self._blocked is None:
+            self._blocked = set(self._load())
+        return set(self._blocked)
+
+    def refresh(self):
+        """Drops the cache (e.g. after someone edited the firewall by hand)."""
+        self._blocked = None
+
+    def _split(self, ips, present):
+        """Valid, de-duplicated IPs whose presence in the cache is `present`."""
+        current = self.blocked()
+        todo, seen = [], set()
+        for ip in ips:
+            ip = normalize_ip(ip)
+            if ip is not None and (ip in current) == present and ip not in seen:
+                seen.add(ip)
+                todo.append(ip)
+        return todo
+
+
+class NftablesBackend(FirewallBackend):
+    """Linux nftables: blocked addresses live in two named sets (IPv4/IPv6)
+    matched by a single drop rule. A whole batch is one `nft -f -` call, which
+    nftables applies as one atomic transaction."""
+
+    name = "nftables"
+
+    def __init__(self, table="ids", family="inet", executor=None):
+        super().__init__(executor)
+        self.table = table
+        self.family = family
+        self._ready = False
+
+    def _setup_script(self):
+        t = f"{self.family} {self.table}"
+        return "\n".join([
+            f"add table {t}",
+            f"add set {t} blocked4 {{ type ipv4_addr; }}",
+            f"add set {t} blocked6 {{ type ipv6_addr; }}",
+            f"add chain {t} input {{ type filter hook input priority -10; policy accept; }}",
+            f"add chain {t} forward {{ type filter hook forward priority -10; policy accept; }}",
+            # Flush + add keeps the rules unique when setup runs again
+            f"flush chain {t} input",
+            f"flush chain {t} forward",
+            f"add rule {t} input ip saddr @blocked4 drop",
+            f"add rule {t} input ip6 saddr @blocked6 drop",
+            f"add rule {t} forward ip saddr @blocked4 drop",
+            f"add rule {t} forward ip6 saddr @blocked6 drop",
+        ]) + "\n"
+
+    def _ensure_ready(self):
+        if not self._ready:
+            self.run(["nft", "-f", "-"], input=self._setup_script())
+            self._ready = True
+
+    def _element_script(self, verb, ips):
+        t = f"{self.family} {self.table}"
+        lines = []
+        for set_name, version in (("blocked4", 4), ("blocked6", 6)):
+            group = [ip for ip in ips if ipaddress.ip_address(ip).version == version]
+            if group:
+                lines.append(f"{verb} element {t} {set_name} {{ {', '.join(group)} }}")
+        return "\n".join(lines) + "\n"
+
+    def block_many(self, ips):
+        todo = self._split(ips, present=False)
+        if todo:
+            self._ensure_ready()
+            self.run(["nft", "-f", "-"], input=self._element_script("add", todo))
+            self._blocked.update(todo)
+        return todo
+
+    def unblock_many(self, ips):
+        todo = self._split(ips, present=True)
+        if todo:
+            self.run(["nft", "-f", "-"], input=self._element_script("delete", todo))
+            self._blocked.difference_update(todo)
+        return todo
+
+    def _load(self):
+        blocked = []
+        for set_name in ("blocked4", "blocked6"):
+            try:
+                out = self.run(["nft", "-j", "list", "set", self.family, self.table, set_name])
+                data = json.loads(out or "{}")
+            except (FirewallError, ValueError):
+                continue # Table not created yet: nothing blocked
+            for item in data.get("nftables", []):
+                for elem in item.get("set", {}).get("elem", []):
+                    if isinstance(elem, dict): # Elements with options (timeout...)
+                        elem = elem.get("elem", {}).get("val")
+                    if isinstance(elem, str):
+                        blocked.append(elem)
+        return blocked
+
+
+class NetshBackend(FirewallBackend):
+    """Windows Firewall through 'netsh', one IDS_BLOCK_<ip> rule per IP."""
+
+    name = "netsh"
+    PREFIX = "IDS_BLOCK_"
+
+    def block_many(self, ips):
+        done = []
+        for ip in self._split(ips, present=False):
+            cmd = ["netsh", "advfirewall", "firewall", "add", "rule", f"name={self.PREFIX}{ip}",
+                   "dir=in", "action=block", f"remoteip={ip}"]
+            try:
+                self.run(cmd)
+            except FirewallError as e:
+                print(f"[!] Firewall Error blocking {ip}: {e}")
+                continue
+            self._blocked.add(ip)
+            done.append(ip)
+        return done
+
+    def unblock_many(self, ips):
+        done = []
+        for ip in self._split(ips, present=True):
+            try:
+                self.run(["netsh", "advfirewall", "firewall", "delete", "rule", f"name={self.PREFIX}{ip}"])
+            except FirewallError as e:
+                print(f"[!] Firewall Error unblocking {ip}: {e}")
+                continue
+            self._blocked.discard(ip)
+            done.append(ip)
+        return done
+
+    def _load(self):
+        # This is a bit tricky with netsh, but we can search for our prefix
+        try:
+            out = self.run(["netsh", "advfirewall", "firewall", "show", "rule", "name=all"])
+        except FirewallError:
+            return []
+        blocked = []
+        for line in out.splitlines():
+            if self.PREFIX in line:
+                ip = normalize_ip(line.split(self.PREFIX)[-1])
+                if ip and ip not in blocked:
+                    blocked.append(ip)
+        return blocked
+
+
+BACKENDS = {"nftables": NftablesBackend, "netsh": NetshBackend}
+
+
+def default_backend(executor=None):
+    """netsh on Windows, nftables everywhere else."""
+    cls = NetshBackend if platform.system() == "Windows" else NftablesBackend
+    return cls(executor=executor)
+
 
 class FirewallManager:
-    """Uses 'netsh' to manage Windows Firewall rules."""
-    
-    @staticmethod
-    def block_ip(ip):
+    """Entry point used by the dashboard and the IDS (one backend per process)."""
+
+    backend = None
+
+    @classmethod
+    def get_backend(cls):
+        if cls.backend is None:
+            cls.backend = default_backend()
+        return cls.backend
+
+    @classmethod
+    def set_backend(cls, backend):
+        """Backend instance, or a name from BACKENDS."""
+        if isinstance(backend, str):
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown firewall backend: {backend} (expected one of {sorted(BACKENDS)})")
+            backend = BACKENDS[backend]()
+        cls.backend = backend
+        return backend
+
+    @classmethod
+    def block_many(cls, ips):
+        """Blocks several IPs in one go. Returns the IPs newly blocked."""
+        ips = list(ips)
+        try:
+            done = cls.get_backend().block_many(ips)
+        except FirewallError as e:
+            print(f"[!] Firewall Error blocking {len(ips)} IP(s): {e}")
+            print("[TIP] Ensure the IDS/dashboard runs with administrator (root) rights.")
+            return []
+        if done:
+            print(f"[*] Firewall: Blocked {', '.join(done) if len(done) <= 5 else f'{len(done)} IPs'}")
+        return done
+
+    @classmethod
+    def unblock_many(cls, ips):
+        """Unblocks several IPs in one go. Returns the IPs removed."""
+        ips = list(ips)
+        try:
+            done = cls.get_backend().unblock_many(ips)
+        except FirewallError as e:
+            print(f"[!] Firewall Error unblocking {len(ips)} IP(s): {e}")
+            return []
+        if done:
+            print(f"[*] Firewall: Unblocked {', '.join(done) if len(done) <= 5 else f'{len(done)} IPs'}")
+        return done
+
+    @classmethod
+    def block_ip(cls, ip):
         """Adds a block rule for the specified IP."""
-        if not ip or not ("." in ip or ":" in ip):
+        if normalize_ip(ip) is None:
             # Don't try to block non-IP names like "DNS_Server"
             return False
-            
-        rule_name = f"IDS_BLOCK_{ip}"
-        try:
-            cmd = f'netsh advfirewall firewall add rule name="{rule_name}" dir=in action=block remoteip={ip}'
-            subprocess.run(cmd, shell=True, check=True, capture_output=True)
-            print(f"[*] Firewall: Blocked {ip}")
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"[!] Firewall Error blocking {ip}: {e}")
-            print("[TIP] Ensure you are running the terminal/dashboard as ADMINISTRATOR.")
-            return False
+        return normalize_ip(ip) in cls.get_backend().blocked() or bool(cls.block_many([ip]))
 
-    @staticmethod
-    def unblock_ip(ip):
+    @classmethod
+    def unblock_ip(cls, ip):
         """Removes the block rule for the specified IP."""
-        rule_name = f"IDS_BLOCK_{ip}"
-        try:
-            cmd = f'netsh advfirewall firewall delete rule name="{rule_name}"'
-            subprocess.run(cmd, shell=True, check=True, capture_output=True)
-            print(f"[*] Firewall: Unblocked {ip}")
+        if normalize_ip(ip) not in cls.get_backend().blocked():
             return True
-        except subprocess.CalledProcessError as e:
-            print(f"[!] Firewall Error unblocking {ip}: {e}")
-            return False
+        return bool(cls.unblock_many([ip]))
 
-    @staticmethod
-    def get_blocked_ips():
-        """Attempts to list IPs currently blocked by IDS rules."""
-        # This is a bit tricky with netsh, but we can search for our prefix
+    @classmethod
+    def get_blocked_ips(cls):
+        """IPs currently blocked by the IDS (from the backend's cache)."""
         try:
-            cmd = 'netsh advfirewall firewall show rule name=all'
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            lines = result.stdout.splitlines()
-            blocked = []
-            for line in lines:
-                if "IDS_BLOCK_" in line:
-                    ip = line.split("IDS_BLOCK_")[-1].strip()
-                    if ip not in blocked:
-                        blocked.append(ip)
-            return blocked
-        except Exception:
+            return sorted(cls.get_backend().blocked())
+        except FirewallError:
             return []
@@ -0,0 +1,262 @@
+import time
+from collections import OrderedDict
+
+# Bidirectional TCP flow table for connection-aware detection.
+# Both directions of a connection share one record, found with a canonical
+# key (the lower endpoint first; the protocol is always TCP, so the 5-tuple
+# is stored as a 4-tuple). Each record follows the handshake
+# (SYN -> SYN-ACK -> ACK) and the teardown (FIN / RST), and each update()
+# says what the packet meant for its connection (Flow.event), so detectors
+# can tell a new attempt from a retransmission, a completed handshake from
+# a half-open one, and a short session from a long one.
+#
+# Memory stays bounded: records live in one OrderedDict per idle timeout
+# (handshake, established, closing), kept in "last packet" order, so expiry
+# pops from the front like core/state_table.py. Above `max_flows` the oldest
+# handshakes are evicted first: a SYN flood recycles its own half-open flows
+# instead of pushing out established connections.
+
+# Handshake states (Flow.state)
+SYN_SENT = 0      # Client SYN seen
+SYN_RECEIVED = 1  # Server SYN-ACK seen
+ESTABLISHED = 2   # Client ACK seen: handshake completed
+CLOSING = 3       # FIN seen on an established connection
+STATE_NAMES = ("syn_sent", "syn_received", "established", "closing")
+
+# What update() saw (Flow.event); None = nothing new for the connection
+NEW = "new"                  # SYN opening a connection
+RETRANSMIT = "retransmit"    # Same SYN again, after a plausible TCP timeout
+REPEAT = "repeat"            # Same SYN again, faster than any TCP stack retransmits
+COMPLETED = "completed"      # Handshake completed (the client's ACK)
+REJECTED = "rejected"        # RST before the handshake completed (closed port)
+CLOSED = "closed"            # FIN or RST on an established connection
+
+# TCP stacks wait at least this long before retransmitting a SYN (the Linux
+# minimum RTO is 200 ms): identical SYNs closer than that are flood traffic
+RETRANSMIT_MIN_GAP = 0.2
+
+_FIN_CLIENT = 1
+_FIN_SERVER = 2
+
+
+class Flow:
+    """One TCP connection, seen from both directions."""
+
+    __slots__ = ("client", "client_port", "server", "server_port", "state", "event",
+                 "first", "last", "syn_time", "established", "packets", "fins")
+
+    def __init__(self, client, client_port, server, server_port, now):
+        self.client = client           # Sender of the first SYN
+        self.client_port = client_port
+        self.server = server
+        self.server_port = server_port
+        self.state = SYN_SENT
+        self.event = NEW
+        self.first = now
+        self.last = now
+        self.syn_time = now            # Last client SYN (retransmission detection)
+        self.established = None        # Time the handshake completed
+        self.packets = 1
+        self.fins = 0                  # Which sides sent a FIN
+
+    def duration(self):
+        """Seconds since the handshake completed (None if it never did)."""
+        return None if self.established is None else self.last - self.established
+
+    def __repr__(self):
+        return (f"Flow({self.client}:{self.client_port} -> {self.server}:{self.server_port}, "
+                f"{STATE_NAMES[self.state]}, {self.packets} packets)")
+
+
+class FlowTable:
+    """TCP connections keyed by their endpoints, with per-state idle timeouts
+    and a cap on the number of records.
+
+    - update() follows one packet and returns its Flow (None when the packet
+      belongs to no tracked connection: mid-stream traffic is not picked up)
+    - sweep(now) expires the records idle for longer than their state allows
+    - stats() counts half-open, completed, rejected and short sessions
+    """
+
+    def __init__(self, max_flows=100000, handshake_ttl=30, idle_ttl=300, close_ttl=10,
+                 short_session=30, clock=time.time):
+        self.max_flows = max_flows
+        self.handshake_ttl = handshake_ttl # SYN_SENT / SYN_RECEIVED
+        self.idle_ttl = idle_ttl           # ESTABLISHED
+        self.close_ttl = close_ttl         # CLOSING
+        self.short_session = short_session # Sessions closed within this many seconds are "short"
+        self.clock = clock
+        self._handshake = OrderedDict()
+        self._established = OrderedDict()
+        self._closing = OrderedDict()
+
+        # Counters
+        self.created = 0
+        self.completed = 0          # Handshakes completed
+        self.half_open_expired = 0  # Handshakes that timed out
+        self.rejected = 0           # Handshakes answered by a RST
+        self.closed = 0             # Established connections closed (FIN or RST)
+        self.short_sessions = 0     # ...within `short_session` seconds
+        self.idle_expired = 0       # Established connections gone quiet
+        self.retransmits = 0
+        self.repeats = 0
+        self.evicted = 0            # Removed because the table was full
+
+    @staticmethod
+    def key(src, sport, dst, dport):
+        """Same key for both directions of a connection."""
+        if src < dst or (src == dst and sport <= dport):
+            return (src, sport, dst, dport)
+        return (dst, dport, src, sport)
+
+    def get(self, src, sport, dst, dport):
+        key = self.key(src, sport, dst, dport)
+        for group in (self._established, self._handshake, self._closing):
+            flow = group.get(key)
+            if flow is not None:
+                return flow
+        return None
+
+    def update(self, src, sport, dst, dport, flags, now=None, create=True):
+        """Follows one TCP packet (flags as in PacketInfo.tcp_flags).
+        With create=False, only connections already tracked are updated."""
+        now = self.clock() if now is None else now
+        key = self.key(src, sport, dst, dport)
+        group = self._established
+        flow = group.get(key)
+        if flow is None:
+            group = self._handshake
+            flow = group.get(key)
+            if flow is None:
+                group = self._closing
+                flow = group.get(key)
+        syn = "S" in flags
+        ack = "A" in flags
+
+        if flow is not None and syn and not ack and flow.state >= ESTABLISHED:
+            del group[key] # Same endpoints, new connection
+            flow = None
+        if flow is None:
+            if not syn or ack or not create:
+                return None # Mid-stream packet or SYN-ACK without its SYN
+            flow = self._handshake[key] = Flow(src, sport, dst, dport, now)
+            self.created += 1
+            if len(self._handshake) + len(self._established) + len(self._closing) > self.max_flows:
+                self._evict()
+            return flow
+
+        flow.last = now
+        flow.packets += 1
+        flow.event = None
+        from_client = src == flow.client and sport == flow.client_port
+        state = flow.state
+
+        if "R" in flags:
+            del group[key]
+            if state < ESTABLISHED:
+                flow.event = REJECTED
+                self.rejected += 1
+            elif state == ESTABLISHED:
+                self._close(flow, now)
+            return flow
+
+        if state < ESTABLISHED:
+            if from_client and syn and not ack:
+                if now - flow.syn_time < RETRANSMIT_MIN_GAP:
+                    flow.event = REPEAT
+                    self.repeats += 1
+                else:
+                    flow.event = RETRANSMIT
+                    self.retransmits += 1
+                flow.syn_time = now
+            elif not from_client and syn and ack:
+                flow.state = SYN_RECEIVED
+            elif from_client and ack and state == SYN_RECEIVED:
+                flow.state = ESTABLISHED
+                flow.established = now
+                flow.event = COMPLETED
+                self.completed += 1
+                del group[key]
+                self._established[key] = flow
+                return flow
+        elif "F" in flags:
+            flow.fins |= _FIN_CLIENT if from_client else _FIN_SERVER
+            if state == ESTABLISHED:
+                flow.state = CLOSING
+                self._close(flow, now)
+                del group[key]
+                self._closing[key] = flow
+                return flow
+            if flow.fins == _FIN_CLIENT | _FIN_SERVER:
+                del group[key] # Both sides done: nothing left to follow
+                return flow
+        group.move_to_end(key)
+        return flow
+
+    def _close(self, flow, now):
+        flow.event = CLOSED
+        self.closed += 1
+        if now - flow.established <= self.short_session:
+            self.short_sessions += 1
+
+    def _evict(self):
+        for group in (self._handshake, self._closing, self._established):
+            if group:
+                group.popitem(last=False)
+                self.evicted += 1
+                return
+
+    def sweep(self, now=None):
+        """Drops the connections idle for longer than their state allows,
+        returns how many."""
+        now = self.clock() if now is None else now
+        removed = 0
+        for group, ttl in ((self._handshake, self.handshake_ttl), (self._established, self.idle_ttl),
+                           (self._closing, self.close_ttl)):
+            limit = now - ttl
+            n = 0
+            while group:
+                key = next(iter(group))
+                if group[key].last > limit:
+                    break
+                del group[key]
+                n += 1
+            if group is self._handshake:
+                self.half_open_expired += n
+            elif group is self._established:
+                self.idle_expired += n
+            removed += n
+        return removed
+
+    def clear(self):
+        for group in (self._handshake, self._established, self._closing):
+            group.clear()
+
+    def flows(self):
+        for group in (self._handshake, self._established, self._closing):
+            yield from group.values()
+
+    def __len__(self):
+        return len(self._handshake) + len(self._established) + len(self._closing)
+
+    def stats(self):
+        finished = self.completed + self.half_open_expired + self.rejected
+        return {
+            "entries": len(self),
+            "max_entries": self.max_flows,
+            "half_open": len(self._handshake),
+            "established": len(self._established),
+            "closing": len(self._closing),
+            "created": self.created,
+            "completed": self.completed,
+            "half_open_expired": self.half_open_expired,
+            "rejected": self.rejected,
+            "closed": self.closed,
+            "short_sessions": self.short_sessions,
+            "idle_expired": self.idle_expired,
+            "retransmits": self.retransmits,
+            "repeats": self.repeats,
+            "evicted": self.evicted,
+            # Share of the finished handshakes that never completed
+            "half_open_ratio": round(1 - self.completed / finished, 3) if finished else 0.0,
+        }
@@ -0,0 +1,109 @@
+import ipaddress
+import json
+import os
+import socket
+
+# Compiled whitelist/blocklist lookups.
+# Exact addresses live in a hash set; CIDR ranges are grouped by prefix length
+# (one set of network numbers per length), so a lookup costs one set probe per
+# distinct prefix length instead of a scan of the whole list.
+
+CACHE_SIZE = 65536
+
+
+class IPIndex:
+    """Set of IPv4/IPv6 addresses and networks supporting `ip in index`."""
+
+    def __init__(self, entries=()):
+        self.entries = []   # As written in the file (used for the BPF filter)
+        self.exact = set()
+        self._v4 = {}       # prefix length -> set of network numbers
+        self._v6 = {}
+        self._cache = {}    # Recent CIDR lookups (the index never changes once built)
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        entry = str(entry).strip()
+        if not entry:
+            return
+        self.entries.append(entry)
+        self._cache.clear()
+        try:
+            net = ipaddress.ip_network(entry, strict=False)
+        except ValueError:
+            self.exact.add(entry) # Not an IP (e.g. "Serv_DNS"): exact match only
+            return
+        if net.prefixlen == net.max_prefixlen:
+            self.exact.add(str(net.network_address))
+            return
+        table = self._v4 if net.version == 4 else self._v6
+        table.setdefault(net.prefixlen, set()).add(int(net.network_address))
+
+    def __contains__(self, ip):
+        if ip in self.exact:
+            return True
+        if not self._v4 and not self._v6:
+            return False
+        cached = self._cache.get(ip)
+        if cached is not None:
+            return cached
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.clear()
+        found = self._cache[ip] = self._match_networks(ip)
+        return found
+
+    def _match_networks(self, ip):
+        try:
+            if ":" in ip:
+                value, bits, table = int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), "big"), 128, self._v6
+            else:
+                value, bits, table = int.from_bytes(socket.inet_aton(ip), "big"), 32, self._v4
+        except (OSError, TypeError, ValueError):
+            return False
+        for prefixlen, networks in table.items():
+            if value >> (bits - prefixlen) << (bits - prefixlen) in networks:
+                return True
+        return False
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class IPListFile:
+    """An IPIndex built from a JSON file, rebuilt only when the file changes.
+
+    `extract` pulls the list of entries out of the decoded JSON. The new index
+    is built on the side and swapped in with a single assignment, so readers
+    always see either the old or the new one.
+    """
+
+    def __init__(self, path, extract=lambda data: data, default=()):
+        self.path = path
+        self.extract = extract
+        self.index = IPIndex(default)
+        self._signature = None
+        self.reloads = 0
+
+    def refresh(self):
+        """Rebuilds the index if the file's mtime/inode/size changed.
+        Returns True when a new index was swapped in."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False # Missing file: keep what we have
+        signature = (st.st_mtime_ns, st.st_ino, st.st_size)
+        if signature == self._signature:
+            return False
+        try:
+            with open(self.path, "r") as f:
+                index = IPIndex(self.extract(json.load(f)) or [])
+        except (OSError, ValueError, TypeError, AttributeError):
+            return False # Half-written file: retry on the next check
+        self.index = index
+        self._signature = signature
+        self.reloads += 1
+        return True
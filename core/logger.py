@@ -1,61 +1,112 @@
-import json
+import itertools
 import os
+import time
 from datetime import datetime
 from core.notifier import Notifier # On garde la notification Telegram
+from core.alert_store import JsonlAlertStore, write_backend
+from core.alert_writer import AsyncAlertWriter
+from core.aggregator import AlertAggregator
+
+# Où sont stockées les alertes : fichier JSONL (défaut) ou base SQLite indexée
+BACKENDS = ("jsonl", "sqlite")
+SQLITE_FILE = "alerts.db"
 
 class LogManager:
-    def __init__(self):
+    def __init__(self, log_dir=None, fsync="interval", max_segment_bytes=10 * 1024 * 1024,
+                 max_segment_age=24 * 3600, async_write=True, backend="jsonl",
+                 aggregation_window=5, max_incident_duration=300, max_incidents=10000,
+                 event_port=None):
         # On calcule le dossier "logs" à la racine du projet
         self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.log_dir = os.path.join(self.base_dir, "logs")
-        self.log_file = os.path.join(self.log_dir, "attacks.json")
+        self.log_dir = log_dir or os.path.join(self.base_dir, "logs")
+
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend inconnu : {backend} (attendu : {BACKENDS})")
+        if backend == "sqlite":
+            # Base indexée (logs/alerts.db) : requêtes rapides sur des mois d'alertes
+            from core.sqlite_store import SQLiteAlertStore
+            self.store = SQLiteAlertStore(os.path.join(self.log_dir, SQLITE_FILE))
+        else:
+            # Historique en ajout seul (logs/attacks.jsonl + segments archivés)
+            self.store = JsonlAlertStore(self.log_dir, fsync=fsync,
+                                         max_segment_bytes=max_segment_bytes,
+                                         max_segment_age=max_segment_age)
+        self.log_file = self.store.path
+        write_backend(self.log_dir, backend) # Le tableau de bord lit ce magasin-là
 
-        # Mémoire des dernières attaques pour l'agrégation
-        self.last_alerts = {}
-        self.aggregation_window = 5  # secondes
+        # Écriture en arrière-plan : la détection ne touche jamais le disque
+        self.writer = AsyncAlertWriter(self.store).start() if async_write else None
+
+        # Agrégation par incident (IP, type) : mémoire bornée, un résumé par incident
+        self.aggregation_window = aggregation_window  # secondes sans alerte = incident terminé
+        self.aggregator = AlertAggregator(window=aggregation_window, max_window=max_incident_duration,
+                                          max_entries=max_incidents)
         self.notifier = Notifier()
+        self.listeners = [] # Appelés pour chaque alerte (ex. blocage automatique)
+
+        # Identifiant unique par enregistrement : le tableau de bord évite ainsi les
+        # doublons quand il reçoit la même alerte en direct puis en relisant le fichier
+        self._uid_prefix = f"{time.time_ns() // 1000000:x}{os.getpid():x}"
+        self._uids = itertools.count(1)
+
+        # Canal en direct vers les tableaux de bord (désactivé par défaut)
+        self.events = None
+        if event_port is not None:
+            self.start_events(event_port)
 
         # Créer le dossier logs s’il n’existe pas
         if not os.path.exists(self.log_dir):
             os.makedirs(self.log_dir)
 
-    def log_alert(self, src_ip, attack_type, description):
-        now = datetime.now()
-        key = (src_ip, attack_type)
+    def log_alert(self, src_ip, attack_type, description, timestamp=None):
+        # timestamp : heure du paquet (epoch) en mode replay, sinon l'heure actuelle
+        ts = timestamp if timestamp is not None else time.time()
+        incident, is_new, rollups = self.aggregator.observe(src_ip, attack_type, description, ts)
+        for listener in self.listeners:
+            try:
+                listener(src_ip, attack_type, description, ts)
+            except Exception as e:
+                print(f"[!] Erreur d'un abonné aux alertes : {e}")
 
-        # Si l'attaque existe déjà (agrégation)
-        if key in self.last_alerts:
-            last_time, count = self.last_alerts[key]
+        # Les incidents terminés entre-temps sont écrits en un seul enregistrement
+        for rollup in rollups:
+            self.write_json(self._clean(rollup))
 
-            # Si l’attaque revient rapidement (moins de 5s)
-            if (now - last_time).total_seconds() < self.aggregation_window:
-                count += 1
-                self.last_alerts[key] = (now, count)
+        # Les répétitions sont seulement comptées (résumé à la fermeture de l'incident)
+        if not is_new:
+            return
 
-                # On écrit dans le fichier seulement tous les 10 messages pour ne pas ramer
-                if count % 10 != 0:
-                    return
-            else:
-                count = 1
-        else:
-            count = 1
-            # Nouvelle attaque ! On envoie une notification Telegram
+        now = datetime.fromtimestamp(ts)
+        if not incident.continued:
+            # Nouvelle attaque ! On envoie une notification Telegram (en arrière-plan)
             self.notifier.send_notification(attack_type, src_ip, now.strftime("%Y-%m-%d %H:%M:%S"))
 
-        # Sauvegarder l'état actuel des compteurs
-        self.last_alerts[key] = (now, count)
-
         # Préparation de l'entrée JSON pour l'interface
         log_entry = {
             "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"), # Pour AlertsView
             "logged_at": now.strftime("%Y-%m-%d %H:%M:%S"), # Pour AttacksView
-            "src_ip": src_ip if src_ip != "DNS_Server" else "192.168.1.1",
+            "src_ip": src_ip,
             "type": attack_type,
-            "description": f"[Aggregated {count} times] {description}" if count > 1 else description,
-            "count": count
+            "description": description,
+            "count": 1
         }
 
-        self.write_json(log_entry)
+        self.write_json(self._clean(log_entry))
+
+    def add_listener(self, listener):
+        """listener(src_ip, attack_type, description, timestamp) est appelé à chaque
+        alerte, agrégée ou non. Il doit rester rapide (on est sur le chemin des paquets)."""
+        self.listeners.append(listener)
+
+    def _clean(self, entry):
+        if entry["src_ip"] == "DNS_Server":
+            entry["src_ip"] = "192.168.1.1"
+        return entry
+
+    def tick(self, now=None):
+        """Ferme les incidents inactifs (appelé régulièrement par le moteur)."""
+        for rollup in self.aggregator.expire(now):
+            self.write_json(self._clean(rollup))
 
     def log_attack(self, attack_data):
         # Utilisé pour les rapports d'attaques complets
@@ -65,19 +116,51 @@ class LogManager:
     def write_active_attacks(self, active_attacks_list):
         pass # Fonction gardée pour compatibilité mais non utilisée
 
+    def start_events(self, port):
+        """Publie les alertes en direct sur 127.0.0.1:port (voir core/event_bus.py)."""
+        from core.event_bus import EventServer
+        try:
+            self.events = EventServer(port=port).start()
+            print(f"[*] Canal d'événements en direct : 127.0.0.1:{self.events.port}")
+        except OSError as e:
+            print(f"[!] Canal d'événements indisponible (port {port}) : {e}")
+        return self.events
+
+    def publish(self, kind, data):
+        if self.events is not None:
+            self.events.publish(kind, data)
+
     def write_json(self, entry):
-        data = []
-        if os.path.exists(self.log_file):
-            try:
-                with open(self.log_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except:
-                data = []
-
-        data.append(entry)
-        
-        # On garde seulement les 500 dernières alertes pour que le Dashboard reste rapide
-        data = data[-500:]
-
-        with open(self.log_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        # Une ligne ajoutée en fin de fichier : coût constant, l'historique est conservé
+        entry.setdefault("uid", f"{self._uid_prefix}-{next(self._uids)}")
+        if self.writer is not None:
+            self.writer.write(entry)
+        else:
+            self.store.append(entry)
+        self.publish("alert", entry)
+
+    def flush(self):
+        """Attend que toutes les alertes en file soient écrites."""
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self):
+        """À appeler à l'arrêt (Ctrl+C) : résume les incidents en cours, vide la file
+        puis ferme le fichier."""
+        for rollup in self.aggregator.close_all():
+            self.write_json(self._clean(rollup))
+        self.notifier.close()
+        if self.writer is not None:
+            self.writer.close()
+        else:
+            self.store.close()
+        if self.events is not None:
+            self.events.close()
+
+    def stats(self):
+        stats = {"incidents": self.aggregator.stats(), "notifications": self.notifier.stats()}
+        if self.events is not None:
+            stats["events"] = self.events.stats()
+        if self.writer is not None:
+            stats.update(self.writer.stats())
+        return stats
@@ -0,0 +1,292 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Runtime metrics of the detection engine.
+# Every packet is counted, but only one packet in `sample_every` is timed:
+# that packet runs through a probe that times each detector it calls, so the
+# other packets pay a counter update and nothing else. Alerts are counted
+# exactly (logger listener). Other components (pipeline, decoder, state
+# tables, alert writer) register "sources" read when the metrics are scraped.
+#
+# Exposed as Prometheus text on http://127.0.0.1:PORT/metrics and written
+# periodically to logs/metrics.jsonl.
+
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
+
+# Histogram upper bounds in seconds (1 µs .. 10 ms, then +Inf)
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 1e-3, 1e-2)
+
+# Attack type (before any " (...)" detail) -> detector that raises it
+ALERT_DETECTORS = {
+    "SYN Flood": "syn_flood",
+    "Port Scan": "port_scan",
+    "Network Scan": "port_scan",
+    "Brute Force": "brute_force",
+    "ARP Spoofing": "arp_spoofing",
+    "IP Spoofing": "ip_spoofing",
+    "DNS Spoofing": "dns_spoofing",
+    "Drapeaux Anormaux": "abnormal_flags",
+}
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1) # Last one: above every bound
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None if empty)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class _Probe:
+    """Stands in for the engine on sampled packets: same detect_* methods,
+    each one timed and recorded."""
+
+    def __init__(self, engine, metrics):
+        for name in metrics.detectors:
+            setattr(self, f"detect_{name}", self._timed(name, getattr(engine, f"detect_{name}"), metrics))
+
+    @staticmethod
+    def _timed(name, method, metrics):
+        histogram = metrics.latency[name]
+        clock = time.perf_counter
+
+        def timed(*args):
+            start = clock()
+            result = method(*args)
+            histogram.observe(clock() - start)
+            metrics.sampled_calls[name] += 1
+            return result
+        return timed
+
+
+class DetectorMetrics:
+    """Counters and sampled latency histograms for one DetectionEngine."""
+
+    def __init__(self, detectors, sample_every=16):
+        self.detectors = tuple(detectors)
+        self.sample_every = max(1, int(sample_every))
+        self.countdown = self.sample_every # Packets left before the next timed one
+        self.packets = 0
+        self.sampled_packets = 0
+        self.packet_latency = Histogram()
+        self.latency = {name: Histogram() for name in self.detectors}
+        self.sampled_calls = {name: 0 for name in self.detectors}
+        self.alerts = {name: 0 for name in self.detectors}
+        self.sources = {} # name -> (function returning a dict, label for nested dicts)
+        self.started = time.time()
+        self._probe = None
+        self._server = None
+        self._snapshots = None
+        self._last = None # (time, packets, dropped) of the previous snapshot, for the rates
+        self._stop = threading.Event()
+
+    # --- Engine side ---
+    def attach(self, engine):
+        """Instruments `engine` (its analyze() then calls measure() on sampled packets)."""
+        self._probe = _Probe(engine, self)
+        engine.metrics = self
+        add_listener = getattr(engine.logger, "add_listener", None)
+        if add_listener is not None:
+            add_listener(self.count_alert)
+        self.add_source("state", engine.state_stats, label="table")
+        return self
+
+    def measure(self, engine, info):
+        """Analyzes one sampled packet through the probe."""
+        self.countdown = self.sample_every
+        self.sampled_packets += 1
+        start = time.perf_counter()
+        alerts = engine._analyze(info, self._probe)
+        self.packet_latency.observe(time.perf_counter() - start)
+        return alerts
+
+    def count_alert(self, src_ip, attack_type, description=None, timestamp=None):
+        detector = ALERT_DETECTORS.get(attack_type.split(" (")[0])
+        if detector in self.alerts:
+            self.alerts[detector] += 1
+
+    def add_source(self, name, func, label=None):
+        """func() returns a dict of numbers, exported as ids_<name>_<key>.
+        With `label`, values may be dicts: {"a": {"x": 1}} -> ids_<name>_x{label="a"} 1."""
+        self.sources[name] = (func, label)
+
+    # --- Reading ---
+    def snapshot(self):
+        """Every metric as a plain dict (for the logs)."""
+        calls = {name: n * self.sample_every for name, n in self.sampled_calls.items()}
+        latency = {}
+        for name, h in self.latency.items():
+            if h.count:
+                latency[name] = {"avg_us": round(h.sum / h.count * 1e6, 2),
+                                 "p50_us": _us(h.quantile(0.5)), "p99_us": _us(h.quantile(0.99))}
+        snapshot = {
+            "time": round(time.time(), 3),
+            "uptime": round(time.time() - self.started, 1),
+            "packets": self.packets,
+            "sample_every": self.sample_every,
+            "packet_p50_us": _us(self.packet_latency.quantile(0.5)),
+            "packet_p99_us": _us(self.packet_latency.quantile(0.99)),
+            "detector_calls": calls,
+            "detector_latency": latency,
+            "alerts": dict(self.alerts),
+        }
+        for name, (func, _label) in self.sources.items():
+            try:
+                snapshot[name] = func()
+            except Exception as e:
+                snapshot[name] = {"error": str(e)}
+        return snapshot
+
+    def render(self):
+        """Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+        metric("ids_packets_total", "counter", "Packets analyzed by the detection engine",
+               [({}, self.packets)])
+        metric("ids_metrics_sample_interval", "gauge", "One packet in this many is timed",
+               [({}, self.sample_every)])
+        metric("ids_detector_alerts_total", "counter", "Alerts raised, by detector",
+               [({"detector": d}, n) for d, n in self.alerts.items()])
+        metric("ids_detector_calls_total", "counter",
+               "Detector calls (estimated: timed calls x sample interval)",
+               [({"detector": d}, n * self.sample_every) for d, n in self.sampled_calls.items()])
+        self._histogram(lines, "ids_detector_latency_seconds", "Time spent in each detector (timed packets)",
+                        [({"detector": d}, h) for d, h in self.latency.items()])
+        self._histogram(lines, "ids_packet_latency_seconds", "Time to analyze one packet (timed packets)",
+                        [({}, self.packet_latency)])
+
+        for source, (func, label) in self.sources.items():
+            try:
+                values = func()
+            except Exception:
+                continue
+            grouped = {}
+            for key, value in values.items():
+                if isinstance(value, dict) and label:
+                    for sub, v in value.items():
+                        grouped.setdefault(sub, []).append(({label: key}, v))
+                else:
+                    grouped.setdefault(key, []).append(({}, value))
+            for key, samples in grouped.items():
+                samples = [(l, v) for l, v in samples if isinstance(v, (int, float)) and not isinstance(v, bool)]
+                if samples:
+                    metric(f"ids_{source}_{key}", "untyped", f"{source} {key}", samples)
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _histogram(lines, name, help_text, series):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, h in series:
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, h.counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(dict(labels, le=repr(bound)))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(dict(labels, le='+Inf'))} {h.count}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(h.sum)}")
+            lines.append(f"{name}_count{_labels(labels)} {h.count}")
+
+    # --- Exporting ---
+    def start_http(self, port=METRICS_PORT, host=METRICS_HOST):
+        """Serves /metrics on host:port (localhost only by default)."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Scrapes every few seconds: keep the console quiet
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server.server_address[1]
+
+    def start_snapshots(self, path, interval=60):
+        """Appends a snapshot to `path` (JSON lines) every `interval` seconds."""
+        self._snapshots = path
+
+        def run():
+            while not self._stop.wait(interval):
+                self.write_snapshot()
+        threading.Thread(target=run, name="metrics-snapshots", daemon=True).start()
+
+    def write_snapshot(self):
+        if self._snapshots is None:
+            return
+        snapshot = self.snapshot()
+        dropped = snapshot.get("pipeline", {}).get("dropped", 0)
+        if self._last is not None:
+            elapsed = max(1e-9, snapshot["time"] - self._last[0])
+            snapshot["packets_per_sec"] = round((snapshot["packets"] - self._last[1]) / elapsed, 1)
+            snapshot["dropped_per_sec"] = round((dropped - self._last[2]) / elapsed, 1)
+        self._last = (snapshot["time"], snapshot["packets"], dropped)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self._snapshots)), exist_ok=True)
+            with open(self._snapshots, "a", encoding="utf-8") as f:
+                f.write(json.dumps(snapshot) + "\n")
+        except OSError as e:
+            print(f"[!] Metrics snapshot failed: {e}")
+
+    def close(self):
+        """Stops the exporters after a last snapshot."""
+        self._stop.set()
+        self.write_snapshot()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _us(seconds):
+    if seconds is None or seconds == float("inf"):
+        return seconds if seconds is None else "inf"
+    return round(seconds * 1e6, 2)
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
@@ -1,13 +1,192 @@
-import requests
 import json
 import os
+import queue
+import threading
+import time
+import traceback
+
+TELEGRAM_API = "https://api.telegram.org"
+
+# Notifications are sent by a background thread: log_alert only queues them,
+# so a slow or unreachable Telegram never stalls packet processing.
+
+
+class NotificationDispatcher:
+    """Background sender with a bounded queue, retries and per-destination pacing.
+
+    `send(destination, items)` does the actual delivery and returns True on
+    success. Each destination gets a token bucket (`rate` messages per second,
+    bursts of `burst`); a failed send is retried with exponential backoff.
+    With `digest_window` > 0, items arriving within that many seconds for the
+    same destination are handed to `send` together, as one summary message.
+    """
+
+    def __init__(self, send, max_queue=1000, rate=1.0, burst=5, retries=3, backoff=1.0,
+                 max_backoff=60.0, digest_window=0, max_digest=50):
+        self.send = send
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.digest_window = digest_window
+        self.max_digest = max_digest
+        self._queue = queue.Queue(max_queue)
+        self._pending = {}  # destination -> _Destination
+        self._thread = None
+        self._stop = threading.Event()
+
+        # Counters
+        self.queued = 0
+        self.sent = 0       # Messages delivered (a digest counts as one)
+        self.digests = 0
+        self.retried = 0
+        self.failed = 0     # Items given up after all retries
+        self.dropped = 0    # Queue full
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, destination, item):
+        """Queues one item, never blocks. Returns False if it had to be dropped."""
+        try:
+            self._queue.put_nowait((destination, item))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.queued += 1
+        return True
+
+    def _run(self):
+        while True:
+            now = time.monotonic()
+            timeout = max(0.0, min(0.5, self._next_due(now) - now))
+            try:
+                destination, item = self._queue.get(timeout=timeout)
+                self._destination(destination).items.append(item)
+                self._drain_queue()
+            except queue.Empty:
+                pass
+            if self._stop.is_set() and self._queue.empty():
+                self._deliver(final=True)
+                return
+            self._deliver()
+
+    def _drain_queue(self):
+        while True:
+            try:
+                destination, item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._destination(destination).items.append(item)
+
+    def _destination(self, name):
+        dest = self._pending.get(name)
+        if dest is None:
+            dest = self._pending[name] = _Destination(self.burst)
+        return dest
+
+    def _next_due(self, now):
+        due = [dest.due(self, now) for dest in self._pending.values() if dest.items]
+        return min(due) if due else now + 0.5
+
+    def _deliver(self, final=False):
+        for name, dest in self._pending.items():
+            while dest.items:
+                now = time.monotonic()
+                if not final and dest.due(self, now) > now:
+                    break
+                dest.refill(self, now)
+                count = min(len(dest.items), self.max_digest) if self.digest_window else 1
+                batch = dest.items[:count]
+                try:
+                    ok = self.send(name, batch)
+                except Exception:
+                    traceback.print_exc()
+                    ok = False
+
+                if ok:
+                    del dest.items[:count]
+                    dest.tokens -= 1
+                    dest.attempts = 0
+                    dest.first_at = None
+                    self.sent += 1
+                    if count > 1:
+                        self.digests += 1
+                elif dest.attempts < self.retries and not final:
+                    dest.attempts += 1
+                    self.retried += 1
+                    delay = min(self.max_backoff, self.backoff * 2 ** (dest.attempts - 1))
+                    dest.retry_at = now + delay
+                    break
+                else:
+                    del dest.items[:count]
+                    dest.attempts = 0
+                    dest.first_at = None
+                    self.failed += count
+                    print(f"[!] Notification to {name} dropped after {self.retries} retries")
+
+    def close(self, timeout=10):
+        """Sends what is still queued (one attempt each) and stops the thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        return {
+            "queue_depth": self._queue.qsize() + sum(len(d.items) for d in self._pending.values()),
+            "queued": self.queued,
+            "sent": self.sent,
+            "digests": self.digests,
+            "retried": self.retried,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+class _Destination:
+    """Per-destination pending items and pacing state."""
+
+    __slots__ = ("items", "tokens", "updated", "first_at", "retry_at", "attempts")
+
+    def __init__(self, burst):
+        self.items = []
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.first_at = None # When the oldest pending item arrived (digest window)
+        self.retry_at = 0.0
+        self.attempts = 0
+
+    def refill(self, dispatcher, now):
+        self.tokens = min(dispatcher.burst, self.tokens + (now - self.updated) * dispatcher.rate)
+        self.updated = now
+
+    def due(self, dispatcher, now):
+        """Earliest time the next message may be sent."""
+        if self.first_at is None:
+            self.first_at = now
+        self.refill(dispatcher, now)
+        at = self.retry_at
+        if self.tokens < 1:
+            at = max(at, now + (1 - self.tokens) / dispatcher.rate)
+        if dispatcher.digest_window and not self.attempts:
+            at = max(at, self.first_at + dispatcher.digest_window)
+        return at
+
 
 class Notifier:
-    def __init__(self, config_file="logs/notifications.json"):
+    def __init__(self, config_file="logs/notifications.json", api_base=TELEGRAM_API):
         self.config_file = config_file
+        self.api_base = api_base
         self.tg_bot_token = ""
         self.tg_chat_id = ""
         self.is_enabled = False
+        self.digest_window = 0 # Seconds: close alerts are grouped into one message
+        self.dispatcher = None
+        self._session = None
         self._load_config()
 
     def _load_config(self):
@@ -19,36 +198,68 @@ class Notifier:
                     self.tg_chat_id = config.get("tg_chat_id", "")
                     # Simple check for Telegram only
                     self.is_enabled = config.get("enabled_platform") in ["telegram", "both"]
+                    self.digest_window = float(config.get("digest_window", 0) or 0)
+                    self.api_base = config.get("api_base", self.api_base)
             except:
                 pass
 
     def send_notification(self, attack_type, src_ip, timestamp):
+        """Queues the alert for the background dispatcher (never blocks)."""
         if not self.is_enabled or not self.tg_bot_token or not self.tg_chat_id:
             return False
 
-        message = (
-            f"🚨 *IDS ALERT*\n"
-            f"*Type*: {attack_type}\n"
-            f"*Source*: {src_ip}\n"
-            f"*Time*: {timestamp}\n"
-            f"Check dashboard for details!"
-        )
-        
-        # Telegram API call
-        url = f"https://api.telegram.org/bot{self.tg_bot_token}/sendMessage"
+        if self.dispatcher is None:
+            self.dispatcher = NotificationDispatcher(self._send, digest_window=self.digest_window).start()
+        return self.dispatcher.submit(self.tg_chat_id, (attack_type, src_ip, timestamp))
+
+    def format_message(self, alerts):
+        if len(alerts) == 1:
+            attack_type, src_ip, timestamp = alerts[0]
+            return (
+                f"🚨 *IDS ALERT*\n"
+                f"*Type*: {attack_type}\n"
+                f"*Source*: {src_ip}\n"
+                f"*Time*: {timestamp}\n"
+                f"Check dashboard for details!"
+            )
+        lines = [f"🚨 *IDS ALERTS* ({len(alerts)} new)"]
+        for attack_type, src_ip, timestamp in alerts[:10]:
+            lines.append(f"• {attack_type} from {src_ip} at {timestamp}")
+        if len(alerts) > 10:
+            lines.append(f"… and {len(alerts) - 10} more")
+        lines.append("Check dashboard for details!")
+        return "\n".join(lines)
+
+    def _send(self, chat_id, alerts):
+        # Telegram API call (the session keeps the connection open)
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        url = f"{self.api_base}/bot{self.tg_bot_token}/sendMessage"
         payload = {
-            "chat_id": self.tg_chat_id,
-            "text": message,
+            "chat_id": chat_id,
+            "text": self.format_message(alerts),
             "parse_mode": "Markdown"
         }
-        
+
         try:
-            resp = requests.post(url, json=payload, timeout=10)
-            if resp.status_code == 200: 
+            resp = self._session.post(url, json=payload, timeout=10)
+            if resp.status_code == 200:
                 return True
-            else: 
+            else:
                 print(f"[!] Telegram API Error: {resp.text}")
-        except Exception as e: 
+        except Exception as e:
             print(f"[!] Telegram request failed: {e}")
-            
+
         return False
+
+    def close(self, timeout=10):
+        """Sends the queued notifications, then releases the connection."""
+        if self.dispatcher is not None:
+            self.dispatcher.close(timeout)
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def stats(self):
+        return self.dispatcher.stats() if self.dispatcher is not None else {}
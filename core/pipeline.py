@@ -0,0 +1,122 @@
+import threading
+import traceback
+from collections import deque
+
+# Capture -> detection pipeline.
+# The capture thread only pushes frames into a bounded queue; detection
+# consumers drain it in batches, so a slow alert (disk, Telegram...) no longer
+# stalls the capture and overload becomes visible in the counters.
+
+POLICIES = ("block", "drop-oldest", "sample")
+
+
+class PacketPipeline:
+    """Bounded queue between the capture stage and the detection consumers.
+
+    Overload policies when the queue is full:
+      - "block":       the capture thread waits for free space
+      - "drop-oldest": the oldest queued packet is discarded
+      - "sample":      only 1 of every `sample_rate` new packets is kept
+                       (replacing the oldest one), the rest are dropped
+    """
+
+    def __init__(self, handler, capacity=10000, batch_size=64, consumers=1,
+                 policy="drop-oldest", sample_rate=10):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy} (expected one of {POLICIES})")
+        self.handler = handler          # Called with a list of queued items
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.consumers = consumers
+        self.policy = policy
+        self.sample_rate = max(1, sample_rate)
+
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._threads = []
+        self._running = False
+        self._overflow = 0
+
+        # Counters
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.high_water = 0
+
+    def start(self):
+        self._running = True
+        for i in range(self.consumers):
+            t = threading.Thread(target=self._consume, name=f"detect-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def put(self, item):
+        """Queues one item. Returns False if it (or an older one) was dropped."""
+        with self._lock:
+            accepted = True
+            if len(self._queue) >= self.capacity:
+                if self.policy == "block":
+                    while len(self._queue) >= self.capacity and self._running:
+                        self._not_full.wait(0.5)
+                elif self.policy == "drop-oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                    accepted = False
+                else: # sample
+                    self._overflow += 1
+                    self.dropped += 1
+                    if self._overflow % self.sample_rate:
+                        return False
+                    self._queue.popleft()
+                    accepted = False
+
+            self._queue.append(item)
+            self.enqueued += 1
+            if len(self._queue) > self.high_water:
+                self.high_water = len(self._queue)
+            self._not_empty.notify()
+            return accepted
+
+    def _consume(self):
+        while True:
+            with self._lock:
+                while not self._queue and self._running:
+                    self._not_empty.wait(0.5)
+                if not self._queue:
+                    return # Stopped and drained
+                n = min(self.batch_size, len(self._queue))
+                batch = [self._queue.popleft() for _ in range(n)]
+                self._not_full.notify_all()
+
+            try:
+                self.handler(batch)
+            except Exception:
+                traceback.print_exc()
+
+            with self._lock:
+                self.processed += n
+
+    def stop(self, timeout=5):
+        """Stops the consumers once the queue has been drained."""
+        with self._lock:
+            self._running = False
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enqueued": self.enqueued,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "queued": len(self._queue),
+                "high_water": self.high_water,
+                "capacity": self.capacity,
+                "policy": self.policy,
+            }
@@ -0,0 +1,92 @@
+import math
+import zlib
+
+# Fixed-memory distinct counting for the port-scan detector.
+# Instead of a port -> timestamp dict per source, each source gets small
+# "linear counting" bitmaps: a value sets one hashed bit, and the number of
+# distinct values is estimated from the fraction of bits still at zero.
+# Memory per source is fixed whatever the number of ports or hosts scanned.
+
+
+class WindowedDistinctCounter:
+    """Approximate count of distinct values seen in the last `window` seconds.
+
+    Two generations of `bits`-bit bitmaps rotate every window/2 seconds, so
+    the estimate covers between window/2 and window seconds of traffic.
+    """
+
+    __slots__ = ("bits", "half", "cur", "prev", "ones", "started")
+
+    def __init__(self, window, bits=1024):
+        self.bits = bits
+        self.half = window / 2
+        self.cur = bytearray(bits // 8)
+        self.prev = bytearray(bits // 8)
+        self.ones = 0       # Bits set in cur | prev
+        self.started = None # Start of the current generation
+
+    def _rotate(self, now):
+        if self.started is None or now - self.started >= 2 * self.half:
+            # Idle for a whole window: everything is stale
+            self.prev = bytearray(len(self.cur))
+            self.cur = bytearray(len(self.cur))
+            self.ones = 0
+        else:
+            self.prev = self.cur
+            self.cur = bytearray(len(self.cur))
+            self.ones = sum(bin(b).count("1") for b in self.prev)
+        self.started = now
+
+    def add(self, hashed, now):
+        """Records one (already hashed) value, returns the new estimate."""
+        if self.started is None or now - self.started >= self.half:
+            self._rotate(now)
+        index = hashed % self.bits
+        byte, mask = index >> 3, 1 << (index & 7)
+        if not self.cur[byte] & mask:
+            self.cur[byte] |= mask
+            if not self.prev[byte] & mask:
+                self.ones += 1
+        return self.estimate()
+
+    def estimate(self):
+        zeros = self.bits - self.ones
+        if zeros == 0:
+            return self.bits * math.log(self.bits) # Saturated
+        return -self.bits * math.log(zeros / self.bits)
+
+    def reset(self):
+        self.cur = bytearray(len(self.cur))
+        self.prev = bytearray(len(self.prev))
+        self.ones = 0
+
+
+def _mix32(h):
+    # MurmurHash3 finalizer. Linear counting assumes values land on random
+    # bits: a hash spreading consecutive ports or addresses too evenly
+    # (multiplicative hash, bare CRC) has fewer collisions than that and
+    # the estimate drifts up (~+25% for 400 consecutive ports)
+    h ^= h >> 16
+    h = h * 0x85EBCA6B & 0xFFFFFFFF
+    h ^= h >> 13
+    h = h * 0xC2B2AE35 & 0xFFFFFFFF
+    return h ^ h >> 16
+
+
+def hash_port(port):
+    return _mix32(port)
+
+
+def hash_host(ip):
+    return _mix32(zlib.crc32(ip.encode()))
+
+
+class ScanSketch:
+    """Per-source state: distinct destination ports (vertical scan) and
+    distinct destination hosts (horizontal scan)."""
+
+    __slots__ = ("ports", "hosts")
+
+    def __init__(self, window, bits=1024):
+        self.ports = WindowedDistinctCounter(window, bits)
+        self.hosts = WindowedDistinctCounter(window, bits)
@@ -0,0 +1,297 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import signal
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+# On-demand profiling of a running IDS.
+# The detection entry points are wrapped with Profiler.hook(); while no
+# session is running the wrapper costs one attribute check. A session is
+# started from outside (SIGUSR2, or a command on the local control socket),
+# lasts `seconds`, writes its files under logs/profiles/ and switches itself
+# off. Modes:
+#   "cpu":   cProfile of the hooked calls (.pstats + top functions in .txt),
+#            plus a stack sampler writing collapsed stacks (.collapsed) that
+#            flamegraph.pl / speedscope read directly
+#   "alloc": tracemalloc over the window, the snapshot diff by line (.txt),
+#            with the detection state-table sizes before and after
+#
+# Control protocol (one JSON line each way, 127.0.0.1 only):
+#   {"cmd": "profile", "mode": "cpu", "seconds": 30} -> {"ok": true, "files": [...]}
+#   {"cmd": "status"}                                -> {"ok": true, "running": ...}
+
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = 8766
+MODES = ("cpu", "alloc")
+MAX_SECONDS = 600
+
+
+class _Session:
+    def __init__(self, mode, seconds, path, context):
+        self.mode = mode
+        self.seconds = seconds
+        self.path = path # Output files are path + extension
+        self.context = context
+        self.started = time.time()
+        self.profiles = {} # thread id -> cProfile.Profile (a profiler is per thread)
+        self.stacks = Counter()
+        self.threads = set() # Threads seen in the hooked code, for the sampler
+        self.inflight = 0
+        self.skipped = 0 # Calls that could not be profiled (another profiler active)
+        self.lock = threading.Lock()
+        self.before = None
+        self.snapshot = None
+
+    def call(self, func, args):
+        ident = threading.get_ident()
+        with self.lock:
+            self.inflight += 1
+            self.threads.add(ident)
+            profile = self.profiles.get(ident) if self.mode == "cpu" else None
+            if profile is None and self.mode == "cpu":
+                profile = self.profiles[ident] = cProfile.Profile()
+        try:
+            if profile is None:
+                return func(*args)
+            try:
+                profile.enable()
+            except ValueError: # Python 3.12+: one profiler per process
+                self.skipped += 1
+                return func(*args)
+            try:
+                return func(*args)
+            finally:
+                profile.disable()
+        finally:
+            with self.lock:
+                self.inflight -= 1
+
+
+class Profiler:
+    """Time-bounded profiling sessions over the hooked functions."""
+
+    def __init__(self, output_dir="logs/profiles", context=None, sample_interval=0.005):
+        self.output_dir = output_dir
+        self.context = context # Returns a dict recorded before/after an "alloc" session
+        self.sample_interval = sample_interval # Stack sampler period ("cpu" mode)
+        self.session = None
+        self.last_files = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._stop = threading.Event()
+
+    def hook(self, func):
+        """Wraps a detection entry point so sessions can profile it."""
+        def hooked(*args):
+            session = self.session
+            if session is None:
+                return func(*args)
+            return session.call(func, args)
+        hooked.__name__ = func.__name__
+        hooked.__doc__ = func.__doc__
+        return hooked
+
+    # --- Sessions ---
+    def start(self, mode="cpu", seconds=30):
+        """Starts a session in the background. Returns the files it will write,
+        or raises ValueError (bad mode, one already running)."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected one of {MODES})")
+        seconds = max(1, min(float(seconds), MAX_SECONDS))
+        with self._lock:
+            if self.session is not None:
+                raise ValueError(f"A {self.session.mode} profile is already running")
+            os.makedirs(self.output_dir, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            session = _Session(mode, seconds, os.path.join(self.output_dir, f"{mode}-{stamp}"), self.context)
+            if mode == "alloc":
+                session.before = self.context() if self.context else None
+                tracemalloc.start(25)
+                session.snapshot = tracemalloc.take_snapshot()
+            self.session = session
+        threading.Thread(target=self._run, args=(session,), name="profiler", daemon=True).start()
+        print(f"[*] Profiling ({mode}) for {seconds:.0f}s -> {session.path}.*")
+        return self._files(session)
+
+    @staticmethod
+    def _files(session):
+        ext = (".pstats", ".collapsed", ".txt") if session.mode == "cpu" else (".txt",)
+        return [session.path + e for e in ext]
+
+    def _run(self, session):
+        me = threading.get_ident()
+        deadline = time.monotonic() + session.seconds
+        while time.monotonic() < deadline:
+            if session.mode == "cpu":
+                self._sample(session, me)
+            if self._stop.wait(self.sample_interval if session.mode == "cpu" else 0.5):
+                break
+        with self._lock:
+            self.session = None # New calls run unprofiled from now on
+        for _ in range(500): # Let the calls in flight finish (their profiler is still on)
+            if not session.inflight:
+                break
+            time.sleep(0.01)
+        try:
+            if session.mode == "cpu":
+                self._write_cpu(session)
+            else:
+                self._write_alloc(session)
+            self.last_files = self._files(session)
+            print(f"[*] Profile written: {', '.join(self.last_files)}")
+        except Exception as e:
+            print(f"[!] Profile failed: {e}")
+        finally:
+            if session.mode == "alloc":
+                tracemalloc.stop()
+
+    def _sample(self, session, me):
+        """One stack sample of every thread currently in hooked code."""
+        frames = sys._current_frames()
+        for ident in list(session.threads):
+            frame = frames.get(ident)
+            if frame is None or ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            session.stacks[";".join(reversed(stack))] += 1
+
+    def _write_cpu(self, session):
+        profiles = [p for p in session.profiles.values()]
+        with open(session.path + ".collapsed", "w", encoding="utf-8") as f:
+            for stack, count in session.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        out = io.StringIO()
+        out.write(f"CPU profile: {session.seconds:.0f}s, {len(profiles)} thread(s), "
+                  f"{sum(session.stacks.values())} stack samples\n")
+        if session.skipped:
+            out.write(f"{session.skipped} calls not profiled (another profiler was active)\n")
+        if profiles:
+            stats = pstats.Stats(profiles[0], stream=out)
+            for p in profiles[1:]:
+                stats.add(p)
+            stats.dump_stats(session.path + ".pstats")
+            stats.sort_stats("cumulative").print_stats(30)
+            stats.sort_stats("tottime").print_stats(30)
+        else:
+            out.write("No hooked call ran during the window (idle sensor?)\n")
+            open(session.path + ".pstats", "wb").close()
+        with open(session.path + ".txt", "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+
+    def _write_alloc(self, session):
+        after = tracemalloc.take_snapshot()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        diff = after.filter_traces(ignore).compare_to(session.snapshot.filter_traces(ignore), "lineno")
+        growth = sum(d.size_diff for d in diff)
+        lines = [f"Allocation profile: {session.seconds:.0f}s, net growth {growth / 1024:.1f} KiB", ""]
+        if session.context is not None:
+            lines.append("Before: " + json.dumps(session.before))
+            lines.append("After:  " + json.dumps(session.context()))
+            lines.append("")
+        lines.append("Top 50 lines by growth:")
+        lines += [str(d) for d in diff[:50]]
+        lines += ["", "Where the 5 biggest come from:"]
+        for d in sorted(diff, key=lambda d: d.size_diff, reverse=True)[:5]:
+            lines.append(f"{d.size_diff / 1024:+.1f} KiB")
+            lines += ["    " + line for line in d.traceback.format(limit=8)]
+        with open(session.path + ".txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def status(self):
+        session = self.session
+        if session is None:
+            return {"running": None, "last_files": self.last_files}
+        return {"running": session.mode, "elapsed": round(time.time() - session.started, 1),
+                "seconds": session.seconds, "files": self._files(session)}
+
+    # --- Control: signal and local socket ---
+    def install_signal(self, mode="cpu", seconds=30):
+        """SIGUSR2 starts a session (POSIX only; call from the main thread)."""
+        if not hasattr(signal, "SIGUSR2"):
+            return False
+        def handler(signum, frame):
+            try:
+                self.start(mode, seconds)
+            except ValueError as e:
+                print(f"[!] {e}")
+        signal.signal(signal.SIGUSR2, handler)
+        return True
+
+    def start_control(self, port=CONTROL_PORT, host=CONTROL_HOST):
+        """Accepts profile/status commands on host:port. Returns the port."""
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((host, port))
+        self._server.listen(4)
+        threading.Thread(target=self._serve, name="profiler-control", daemon=True).start()
+        return self._server.getsockname()[1]
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                break
+            with conn:
+                conn.settimeout(5)
+                try:
+                    request = json.loads(conn.makefile("r").readline() or "{}")
+                    reply = self.handle(request)
+                except (OSError, ValueError) as e:
+                    reply = {"ok": False, "error": str(e)}
+                try:
+                    conn.sendall((json.dumps(reply) + "\n").encode())
+                except OSError:
+                    pass
+
+    def handle(self, request):
+        cmd = request.get("cmd")
+        if cmd == "profile":
+            try:
+                files = self.start(request.get("mode", "cpu"), request.get("seconds", 30))
+            except ValueError as e:
+                return {"ok": False, "error": str(e)}
+            return {"ok": True, "files": files}
+        if cmd == "status":
+            return dict(self.status(), ok=True)
+        return {"ok": False, "error": f"Unknown command: {cmd}"}
+
+    def close(self):
+        self._stop.set() # Ends a running session early (files are still written)
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+
+def send_command(request, port=CONTROL_PORT, host=CONTROL_HOST, timeout=5):
+    """Client side of the control socket."""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((json.dumps(request) + "\n").encode())
+        return json.loads(sock.makefile("r").readline())
+
+
+if __name__ == "__main__":
+    # python core/profiler.py cpu 30 | alloc 60 | status  [--port N]
+    import argparse
+    parser = argparse.ArgumentParser(description="Profile a running IDS")
+    parser.add_argument("mode", choices=MODES + ("status",))
+    parser.add_argument("seconds", type=float, nargs="?", default=30)
+    parser.add_argument("--port", type=int, default=CONTROL_PORT)
+    args = parser.parse_args()
+    if args.mode == "status":
+        print(json.dumps(send_command({"cmd": "status"}, args.port), indent=4))
+    else:
+        print(json.dumps(send_command({"cmd": "profile", "mode": args.mode, "seconds": args.seconds},
+                                      args.port), indent=4))
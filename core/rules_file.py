@@ -0,0 +1,76 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+# logs/firewall_rules.json has several writers: the dashboard (operator
+# changes), the auto-responder and whoever edits it by hand. Each change is a
+# read-modify-write done under an exclusive lock on a side file
+# (firewall_rules.json.lock) and applied to the file as it is at that moment,
+# so no writer overwrites the lists with a stale copy.
+
+EMPTY_RULES = {"blocklist": [], "whitelist": []}
+
+
+def read_rules(path):
+    """The rules in `path`, or empty lists if it is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+    except (OSError, ValueError):
+        return {name: [] for name in EMPTY_RULES}
+    if not isinstance(rules, dict):
+        return {name: [] for name in EMPTY_RULES}
+    for name in EMPTY_RULES:
+        rules.setdefault(name, [])
+    return rules
+
+
+@contextmanager
+def locked(path, timeout=10):
+    """Exclusive lock shared by every writer of `path` (processes included)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f"{path}.lock", "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def update_rules(path, change):
+    """Applies change(rules) to the current content of `path` under the lock.
+    `change` edits the dict in place; the file is only rewritten if it
+    changed. Returns the rules as written."""
+    with locked(path):
+        rules = read_rules(path)
+        before = json.dumps(rules, sort_keys=True)
+        change(rules)
+        if json.dumps(rules, sort_keys=True) != before:
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(rules, f, indent=4)
+            os.replace(tmp, path) # Readers never see half a file
+        return rules
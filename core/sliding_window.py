@@ -0,0 +1,39 @@
+from collections import deque
+
+# Sliding-window event counter.
+# Timestamps arrive in (mostly) increasing order, so expired ones are always
+# at the left end of the deque: each event is appended once and popped once,
+# which makes the cost per packet O(1) amortized whatever the attack rate.
+
+
+class SlidingWindowCounter:
+    """Counts the events seen during the last `window` seconds."""
+
+    __slots__ = ("window", "events")
+
+    def __init__(self, window):
+        self.window = window
+        self.events = deque()
+
+    def add(self, now):
+        """Records one event at time `now` and returns the count in the window."""
+        events = self.events
+        events.append(now)
+        limit = now - self.window
+        while events and events[0] <= limit: # window <= 0 empties the deque
+            events.popleft()
+        return len(events)
+
+    def count(self, now):
+        """Number of events in the window ending at `now`."""
+        events = self.events
+        limit = now - self.window
+        while events and events[0] <= limit:
+            events.popleft()
+        return len(events)
+
+    def reset(self):
+        self.events.clear()
+
+    def __len__(self):
+        return len(self.events)
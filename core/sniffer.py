@@ -2,82 +2,468 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from scapy.all import sniff, IP, TCP, UDP, ARP, DNS, DNSQR, DNSRR, Ether, conf
-from core.detection import DetectionEngine
+# Only Scapy's config is loaded here: the layers (slow path), the capture
+# sockets and the pcap reader are imported when first needed, so the fast
+# decoder path never pays for the hundreds of modules behind scapy.all
+from scapy.config import conf
+from scapy.data import MTU, DLT_EN10MB
+from core.detection import DetectionEngine, DETECTORS
+from core.logger import LogManager
+from core.decoder import PacketInfo, decode
+from core.pipeline import PacketPipeline
+from core.workers import ShardedDetector
+from core.bpf import engine_filter
+import threading
 import traceback
+import time
 
-engine = DetectionEngine()
 conf.resolve_ips = False # Teacher says: Always use raw IPs for a security system!
 
+# Scapy layers, imported by _load_layers() the first time the slow path runs
+Ether = ARP = IP = TCP = UDP = DNS = DNSQR = DNSRR = None
+
+# The engine (and its LogManager/Notifier) is built on first use, see get_engine()
+_engine = None
+engine_options = {"enabled": None, "settings": {}}
+
+# How many frames went through the fast decoder vs the Scapy fallback: one
+# [fast, fallback] pair per decoding thread (no lock on the packet path),
+# summed by decoder_stats()
+_decode_counters = []
+_decode_local = threading.local()
+_decode_lock = threading.Lock()
+
+# The engine is not thread-safe: decoding runs in parallel, detection doesn't
+engine_lock = threading.Lock()
+pipeline = None
+sharded = None # Multi-process mode: packets go to ShardedDetector workers
+log_options = {} # LogManager settings, also used by the worker writer process
+auto_block = None # AutoResponder settings when automatic blocking is on
+event_port = None # Live event channel port for the dashboards (None = off)
+responder = None
+metrics_options = None # DetectorMetrics settings when metrics are on
+metrics = None
+profiler_port = None # Profiling control socket port (None = profiling off)
+profiler = None
+
+def get_engine():
+    """The detection engine, created with the options set so far."""
+    global _engine
+    if _engine is None:
+        engine = DetectionEngine(logger=LogManager(**log_options), enabled=engine_options["enabled"])
+        engine.configure(**engine_options["settings"])
+        _engine = engine
+    return _engine
+
+def set_engine(engine):
+    """Replaces the engine (tests, benchmarks)."""
+    global _engine
+    _engine = engine
+
+def __getattr__(name):
+    # `sniffer.engine` keeps working for callers, without building it at import
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _load_layers():
+    global Ether, ARP, IP, TCP, UDP, DNS, DNSQR, DNSRR
+    if DNSRR is None:
+        from scapy.layers.l2 import Ether, ARP
+        from scapy.layers.inet import IP, TCP, UDP
+        from scapy.layers.dns import DNS, DNSQR, DNSRR
+
+def extract_info(packet, ts=None):
+    """Builds a PacketInfo from a fully dissected Scapy packet (slow path)."""
+    _load_layers()
+    info = PacketInfo(ts)
+
+    # Extract source MAC if possible (Ethernet layer)
+    info.src_mac = packet[Ether].src if Ether in packet else None
+
+    # 1. --- ARP Analysis ---
+    if ARP in packet:
+        info.arp_psrc = packet[ARP].psrc
+        info.arp_op = packet[ARP].op # 1=req, 2=reply
+
+    # 2. --- IP Analysis ---
+    if IP in packet:
+        info.ip_src = packet[IP].src
+        info.ip_dst = packet[IP].dst
+
+        # --- TCP Analysis ---
+        if TCP in packet:
+            info.sport = packet[TCP].sport
+            info.dport = packet[TCP].dport
+            info.tcp_flags = str(packet[TCP].flags)
+        elif UDP in packet:
+            info.sport = packet[UDP].sport
+            info.dport = packet[UDP].dport
+
+        # --- DNS Analysis (UDP port 53) ---
+        if UDP in packet and DNS in packet:
+            dns_layer = packet[DNS]
+            if dns_layer.qr == 1: # It's a Response
+                info.dns_id = dns_layer.id
+                # Get the query name
+                info.dns_qname = dns_layer[DNSQR].qname.decode() if DNSQR in dns_layer else "unknown"
+                # Get all Answer IPs
+                answers = []
+                if dns_layer.ancount > 0:
+                    for i in range(dns_layer.ancount):
+                        res = packet.getlayer(DNSRR, nb=i+1)
+                        if res and res.type == 1: # A record (IPv4)
+                            answers.append(res.rdata)
+                info.dns_answers = answers
+    return info
+
+def process_info(info):
+    if sharded is not None:
+        sharded.submit(info)
+        return
+    with engine_lock:
+        alerts = (_engine or get_engine()).analyze(info)
+    for alert in alerts:
+        print(alert)
+
 def packet_callback(packet):
+    """Entry point for packets already dissected by Scapy."""
     try:
-        # Extract source MAC if possible (Ethernet layer)
-        src_mac = packet[Ether].src if Ether in packet else None
-
-        # 1. --- ARP Analysis ---
-        if ARP in packet:
-            src_ip = packet[ARP].psrc
-            op = packet[ARP].op # 1=req, 2=reply
-            alert = engine.detect_arp_spoofing(src_ip, src_mac, op)
-            if alert: print(alert)
-
-        # 2. --- IP Analysis ---
-        if IP in packet:
-            src_ip = packet[IP].src
-            
-            # Check for IP Spoofing (MAC Mismatch)
-            if src_mac:
-                alert = engine.detect_ip_spoofing(src_ip, src_mac)
-                if alert: print(alert)
-
-            # --- TCP Analysis ---
-            if TCP in packet:
-                dst_port = packet[TCP].dport
-                flags = packet[TCP].flags
-                
-                # Check for SYN Flood
-                alert = engine.detect_syn_flood(src_ip, flags, dst_port)
-                if alert: print(alert)
-                    
-                # Check for Port Scan
-                alert = engine.detect_port_scan(src_ip, dst_port)
-                if alert: print(alert)
-
-                # Check for Brute Force (SSH, FTP, etc.)
-                if flags == "S":
-                    alert = engine.detect_brute_force(src_ip, dst_port)
-                    if alert: print(alert)
-
-                # Check for Abnormal Flags (NULL, XMAS, etc.)
-                alert = engine.detect_abnormal_flags(src_ip, flags, dst_port)
-                if alert: print(alert)
-
-            # --- DNS Analysis (UDP port 53) ---
-            if UDP in packet and DNS in packet:
-                dns_layer = packet[DNS]
-                if dns_layer.qr == 1: # It's a Response
-                    dns_id = dns_layer.id
-                    # Get the query name
-                    qname = dns_layer[DNSQR].qname.decode() if DNSQR in dns_layer else "unknown"
-                    # Get all Answer IPs
-                    answers = []
-                    if dns_layer.ancount > 0:
-                        for i in range(dns_layer.ancount):
-                            res = packet.getlayer(DNSRR, nb=i+1)
-                            if res and res.type == 1: # A record (IPv4)
-                                answers.append(res.rdata)
-                    
-                    if answers:
-                        alert = engine.detect_dns_spoofing(dns_id, qname, answers)
-                        if alert: print(alert)
+        process_info(extract_info(packet))
+    except Exception:
+        traceback.print_exc()
+
+def _thread_counters():
+    counters = getattr(_decode_local, "counters", None)
+    if counters is None:
+        counters = _decode_local.counters = [0, 0]
+        with _decode_lock:
+            _decode_counters.append(counters)
+    return counters
 
+def decoder_stats():
+    """Frames decoded by the fast decoder vs the Scapy fallback, all threads."""
+    with _decode_lock:
+        return {"fast": sum(c[0] for c in _decode_counters),
+                "fallback": sum(c[1] for c in _decode_counters)}
+
+def raw_callback(raw, ts=None, linktype=DLT_EN10MB):
+    """Entry point for raw frames: fast decoder first, Scapy only as fallback."""
+    try:
+        counters = _thread_counters()
+        info = decode(raw, ts) if linktype == DLT_EN10MB else None
+        if info is not None:
+            counters[0] += 1
+        else:
+            counters[1] += 1
+            _load_layers() # Registers the link types
+            packet = conf.l2types.get(linktype, conf.raw_layer)(raw)
+            info = extract_info(packet, ts)
+        process_info(info)
     except Exception:
         traceback.print_exc()
 
-def start_sniffing():
+def _process_raw_batch(batch):
+    for raw in batch:
+        raw_callback(raw)
+    if sharded is not None:
+        sharded.flush()
+
+def _process_packet_batch(batch):
+    for packet in batch:
+        packet_callback(packet)
+    if sharded is not None:
+        sharded.flush()
+
+def start_workers(workers, notify=True, auto_block=None, replay=False):
+    """Switches detection to `workers` processes sharded by source IP."""
+    global sharded
+    options = dict(log_options, event_port=event_port) # The writer process publishes the alerts
+    engine = get_engine()
+    sharded = ShardedDetector(workers, notify=notify, enabled=engine.enabled,
+                              settings=engine.settings(), log_options=options,
+                              auto_block=auto_block, replay=replay).start()
+    print(f"[*] Detection sharded over {sharded.n} worker processes")
+    return sharded
+
+def stop_workers():
+    global sharded
+    if sharded is not None:
+        sharded.stop()
+        print(f"[*] Workers: {sharded.stats()}")
+        sharded = None
+
+def _report_pipeline(last_dropped):
+    stats = pipeline.stats()
+    get_engine().logger.publish("stats", {"pipeline": stats, "decoder": decoder_stats()})
+    if stats["dropped"] > last_dropped:
+        print(f"[!] Overload: dropped {stats['dropped'] - last_dropped} packets "
+              f"(queue {stats['queued']}/{stats['capacity']}, policy={stats['policy']})")
+    return stats["dropped"]
+
+def set_detectors(names):
+    """Restricts detection to the given detector names (see detection.DETECTORS)."""
+    enabled = set(names)
+    unknown = enabled - set(DETECTORS)
+    if unknown:
+        raise ValueError(f"Unknown detectors: {', '.join(sorted(unknown))}")
+    engine_options["enabled"] = enabled
+    if _engine is not None:
+        _engine.enabled = enabled
+
+def set_alert_backend(backend):
+    """Chooses where alerts are stored ("jsonl" or "sqlite")."""
+    set_log_options(backend=backend)
+
+def set_log_options(**options):
+    """LogManager settings (backend, log_dir, fsync...). Replaces the logger
+    if the engine already exists."""
+    log_options.update(options)
+    if _engine is None:
+        return
+    old = _engine.logger
+    _engine.logger = LogManager(**log_options)
+    _engine.logger.notifier.is_enabled = old.notifier.is_enabled
+    old.close()
+
+def enable_auto_block(**options):
+    """Blocks attacking IPs automatically during live capture, see AutoResponder
+    (options: durations, max_changes_per_sec, batch_interval...)."""
+    global auto_block
+    auto_block = options
+
+def _start_responder():
+    global responder
+    from core.auto_responder import AutoResponder
+    engine = get_engine()
+    responder = AutoResponder(is_protected=lambda ip: ip in engine.whitelist, **auto_block).start()
+    engine.logger.add_listener(responder.on_alert)
+    print(f"[*] Auto-block on: {responder.stats()['active']} active block(s) restored")
+
+def enable_event_bus(port):
+    """Publishes alerts and counters live on 127.0.0.1:port for the dashboards."""
+    global event_port
+    event_port = port
+
+def _start_event_bus():
+    logger = get_engine().logger
+    if event_port is not None and logger.events is None:
+        logger.start_events(event_port)
+
+def enable_metrics(port=None, interval=60, sample_every=16):
+    """Per-detector counters and sampled latency histograms, served as
+    Prometheus text on 127.0.0.1:port (None = no endpoint) and appended to
+    logs/metrics.jsonl every `interval` seconds (0 = never)."""
+    global metrics_options
+    metrics_options = {"port": port, "interval": interval, "sample_every": sample_every}
+
+def _start_metrics():
+    global metrics
+    if metrics_options is None or metrics is not None:
+        return
+    from core.metrics import DetectorMetrics
+    engine = get_engine()
+    metrics = DetectorMetrics(DETECTORS, metrics_options["sample_every"])
+    if sharded is None:
+        metrics.attach(engine) # With workers, detection runs in other processes
+    metrics.add_source("decoder", decoder_stats)
+    metrics.add_source("pipeline", lambda: pipeline.stats() if pipeline is not None else {})
+    metrics.add_source("alert_writer", lambda: engine.logger.writer.stats() if engine.logger.writer else {})
+    if metrics_options["interval"]:
+        metrics.start_snapshots(os.path.join(engine.logger.log_dir, "metrics.jsonl"), metrics_options["interval"])
+    if metrics_options["port"] is not None:
+        try:
+            port = metrics.start_http(metrics_options["port"])
+            print(f"[*] Metrics: http://127.0.0.1:{port}/metrics")
+        except OSError as e:
+            print(f"[!] Metrics endpoint unavailable (port {metrics_options['port']}): {e}")
+
+def enable_profiler(port):
+    """Lets a running IDS be profiled on demand: SIGUSR2 or a command on
+    127.0.0.1:port starts a time-bounded session, see core/profiler.py."""
+    global profiler_port
+    profiler_port = port
+
+def _start_profiler():
+    global profiler
+    if profiler_port is None or profiler is not None:
+        return
+    from core.profiler import Profiler
+    engine = get_engine()
+    def state_sizes():
+        return {name: stats["entries"] for name, stats in engine.state_stats().items()}
+    profiler = Profiler(os.path.join(engine.logger.log_dir, "profiles"), context=state_sizes)
+    profiler.install_signal()
+    try:
+        port = profiler.start_control(profiler_port)
+        print(f"[*] Profiling on demand: python core/profiler.py cpu|alloc SECONDS --port {port}")
+    except OSError as e:
+        print(f"[!] Profiling control unavailable (port {profiler_port}): {e}")
+
+def _hooked(func):
+    """`func` as seen by the profiler when profiling is enabled."""
+    return profiler.hook(func) if profiler is not None else func
+
+def configure_engine(**settings):
+    """Changes detection thresholds, see DetectionEngine.configure()."""
+    if _engine is not None:
+        _engine.configure(**settings)
+    engine_options["settings"].update(settings)
+
+def _refresh_filter(sock, current):
+    """Re-installs the derived BPF filter when the whitelist changed."""
+    bpf = engine_filter(get_engine())
+    if bpf and bpf != current:
+        from scapy.arch.linux import attach_filter
+        attach_filter(sock.ins, bpf, conf.iface)
+        print(f"[*] BPF filter updated: {bpf}")
+    return bpf
+
+def _enqueue(packet):
+    # Not pipeline.put itself: sniff() prints whatever prn returns
+    pipeline.put(packet)
+
+def _report_loop(stop, sock=None, bpf=None, interval=10):
+    """Every `interval` seconds, whether packets arrive or not: pipeline report
+    and, given the capture socket, refresh of the derived BPF filter."""
+    last_dropped = 0
+    while not stop.wait(interval):
+        try:
+            last_dropped = _report_pipeline(last_dropped)
+            if sock is not None:
+                bpf = _refresh_filter(sock, bpf)
+        except Exception:
+            traceback.print_exc()
+
+def start_sniffing(fast=True, queue_size=10000, policy="drop-oldest", consumers=1, batch_size=64,
+                   workers=0, bpf=None, iface=None):
+    """Live capture. The capture loop only queues frames, detection runs in
+    `consumers` background threads draining the queue in batches (or, with
+    `workers` > 0, in that many processes fed by those threads).
+
+    `bpf` overrides the kernel filter derived from the enabled detectors and
+    the whitelist; pass "" to capture everything. `iface` defaults to
+    Scapy's (the interface of the default route).
+    """
+    global pipeline
+    import scapy.arch # Capture sockets (conf.L2listen, conf.iface)
+    if iface:
+        conf.iface = iface
+    derived = bpf is None
+    if derived:
+        bpf = engine_filter(get_engine())
     print(f"[*] IDS active on: {conf.iface}")
+    print(f"[*] BPF filter: {bpf or '(none)'}")
     print("[*] Monitoring for attacks... (Ctrl+C to stop)")
-    sniff(prn=packet_callback, store=0)
+    if workers:
+        start_workers(workers, auto_block=auto_block)
+        consumers = 1 # The worker buffers are not shared between threads
+    else:
+        _start_event_bus()
+        if auto_block is not None:
+            _start_responder()
+    _start_metrics()
+    _start_profiler()
+
+    handler = _hooked(_process_raw_batch if fast else _process_packet_batch)
+    pipeline = PacketPipeline(handler, capacity=queue_size, batch_size=batch_size,
+                              consumers=consumers, policy=policy).start()
+    # The capture loop blocks in recv: the periodic work runs beside it
+    stop_reports = threading.Event()
+    try:
+        if not fast:
+            from scapy.sendrecv import sniff
+            _load_layers()
+            threading.Thread(target=_report_loop, args=(stop_reports,), name="ids-report", daemon=True).start()
+            sniff(prn=_enqueue, store=0, filter=bpf or None)
+            return
+
+        # Read raw frames from the socket so Scapy never dissects them
+        sock = conf.L2listen(iface=conf.iface, filter=bpf or None)
+        reports = threading.Thread(target=_report_loop, args=(stop_reports, sock if derived else None, bpf),
+                                   name="ids-report", daemon=True)
+        reports.start()
+        try:
+            while True:
+                _cls, raw, _ts = sock.recv_raw(MTU)
+                if raw:
+                    pipeline.put(raw)
+        finally:
+            stop_reports.set()
+            reports.join()
+            sock.close()
+    finally:
+        stop_reports.set()
+        pipeline.stop()
+        print(f"[*] Pipeline: {pipeline.stats()}")
+        stop_workers()
+
+def _pcap_timestamp(reader, meta):
+    if hasattr(meta, "tshigh"): # pcapng
+        return ((meta.tshigh << 32) + meta.tslow) / meta.tsresol
+    return meta.sec + meta.usec * (1e-9 if reader.nano else 1e-6)
+
+def replay_pcap(path, notify=False, workers=0):
+    """Streams a pcap/pcapng file through the detectors as fast as possible.
+
+    Detection windows follow each packet's capture timestamp instead of the
+    wall clock, so replaying the same file always raises the same alerts.
+    """
+    from scapy.utils import RawPcapReader
+    print(f"[*] Replaying capture: {path}")
+    engine = get_engine()
+    if not notify:
+        engine.logger.notifier.is_enabled = False # Don't page anyone for old traffic
+    if workers:
+        start_workers(workers, notify=notify, replay=True)
+    else:
+        _start_event_bus()
+    _start_metrics()
+    _start_profiler()
+    callback = _hooked(raw_callback)
+
+    count = 0
+    start = time.perf_counter()
+    try:
+        with RawPcapReader(path) as reader: # Handles both pcap and pcapng
+            for raw, meta in reader:
+                linktype = getattr(meta, "linktype", None) or reader.linktype
+                callback(raw, _pcap_timestamp(reader, meta), linktype)
+                count += 1
+    finally:
+        stop_workers() # Waits for the workers to finish the queued packets
+        engine.packet_time = None
+
+    duration = time.perf_counter() - start
+    rate = count / duration if duration > 0 else 0.0
+    print(f"[*] Replay done: {count} packets in {duration:.2f}s ({rate:.0f} pkt/s)")
+    decoded = decoder_stats()
+    print(f"[*] Decoder: {decoded['fast']} fast, {decoded['fallback']} via Scapy")
+    return count, duration
+
+def shutdown():
+    """Flushes everything still in memory (workers, queued alerts) before exit."""
+    stop_workers()
+    if responder is not None:
+        responder.close()
+    if metrics is not None:
+        metrics.close() # Last snapshot
+    if profiler is not None:
+        profiler.close()
+    if _engine is None:
+        return # Nothing ran
+    _engine.logger.close()
+    stats = _engine.logger.stats()
+    if stats:
+        print(f"[*] Alerts: {stats}")
 
 if __name__ == "__main__":
-    start_sniffing()
+    try:
+        if len(sys.argv) > 1:
+            replay_pcap(sys.argv[1])
+        else:
+            start_sniffing()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown()
@@ -0,0 +1,154 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+# Optional SQLite alert backend.
+# WAL mode lets the dashboard read while the IDS writes, and the indexes on
+# time, source IP and type turn "alerts of this IP last week" or "how many
+# unique sources" into index lookups instead of re-parsing a JSON file.
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Columns stored as-is, everything else of an entry goes in "extra" (JSON)
+COLUMNS = ("timestamp", "logged_at", "src_ip", "type", "description", "count")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id          INTEGER PRIMARY KEY,
+    ts          REAL NOT NULL,
+    timestamp   TEXT,
+    logged_at   TEXT,
+    src_ip      TEXT,
+    type        TEXT,
+    description TEXT,
+    count       INTEGER NOT NULL DEFAULT 1,
+    extra       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_ts ON alerts(ts);
+CREATE INDEX IF NOT EXISTS idx_alerts_src_ip ON alerts(src_ip, ts);
+CREATE INDEX IF NOT EXISTS idx_alerts_type ON alerts(type, ts);
+"""
+
+
+def entry_time(entry):
+    if "ts" in entry:
+        return float(entry["ts"])
+    for key in ("logged_at", "timestamp"):
+        try:
+            return datetime.strptime(entry.get(key, ""), TIME_FORMAT).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return datetime.now().timestamp()
+
+
+class SQLiteAlertStore:
+    """Alert store backed by SQLite, with a small query API for the dashboard."""
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if readonly:
+            self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(SCHEMA)
+            self._db.commit()
+        self._db.row_factory = sqlite3.Row
+
+    # --- Writing (same interface as JsonlAlertStore) ---
+    def append(self, entry):
+        self.append_many([entry])
+
+    def append_many(self, entries):
+        rows = []
+        for e in entries:
+            extra = {k: v for k, v in e.items() if k not in COLUMNS}
+            rows.append((entry_time(e), e.get("timestamp"), e.get("logged_at"), e.get("src_ip"),
+                         e.get("type"), e.get("description"), e.get("count", 1),
+                         json.dumps(extra) if extra else None))
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO alerts (ts, timestamp, logged_at, src_ip, type, description, count, extra)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # --- Reading ---
+    @staticmethod
+    def _to_dict(row):
+        entry = {k: row[k] for k in COLUMNS}
+        entry["id"] = row["id"]
+        if row["extra"]:
+            entry.update(json.loads(row["extra"]))
+        return entry
+
+    @staticmethod
+    def _where(start=None, end=None, src_ip=None, attack_type=None):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(end)
+        if src_ip:
+            clauses.append("src_ip = ?")
+            params.append(src_ip)
+        if attack_type:
+            clauses.append("type = ?")
+            params.append(attack_type)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _fetch(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def query(self, start=None, end=None, src_ip=None, attack_type=None,
+              limit=100, offset=0, newest_first=True):
+        """Alerts matching the filters (times are epoch seconds), one page at a time."""
+        where, params = self._where(start, end, src_ip, attack_type)
+        order = "DESC" if newest_first else "ASC"
+        rows = self._fetch(f"SELECT * FROM alerts{where} ORDER BY ts {order}, id {order} LIMIT ? OFFSET ?",
+                           params + [limit, offset])
+        return [self._to_dict(r) for r in rows]
+
+    def count(self, start=None, end=None, src_ip=None, attack_type=None):
+        where, params = self._where(start, end, src_ip, attack_type)
+        return self._fetch(f"SELECT COUNT(*) FROM alerts{where}", params)[0][0]
+
+    def count_by(self, field, start=None, end=None, limit=20):
+        """Top values of "src_ip" or "type" with their number of alerts."""
+        if field not in ("src_ip", "type"):
+            raise ValueError(f"Cannot group by {field}")
+        where, params = self._where(start, end)
+        rows = self._fetch(f"SELECT {field}, COUNT(*) AS n FROM alerts{where}"
+                           f" GROUP BY {field} ORDER BY n DESC LIMIT ?", params + [limit])
+        return [(r[0], r[1]) for r in rows]
+
+    def stats(self, start=None, end=None):
+        """Aggregates for the dashboard tiles."""
+        where, params = self._where(start, end)
+        row = self._fetch(
+            "SELECT COUNT(*), COUNT(DISTINCT src_ip), COALESCE(MAX(count), 0),"
+            " COALESCE(SUM(description LIKE '%BLOCK%' OR type LIKE '%Flood%'), 0)"
+            f" FROM alerts{where}", params)[0]
+        return {"total": row[0], "unique_ips": row[1], "max_count": row[2], "critical": row[3]}
+
+    def since(self, last_id=0, limit=1000):
+        """Alerts written after the one with id `last_id`, oldest first
+        (lets a reader fetch only what is new since its last visit)."""
+        rows = self._fetch("SELECT * FROM alerts WHERE id > ? ORDER BY id LIMIT ?", (last_id, limit))
+        return [self._to_dict(r) for r in rows]
+
+    def tail(self, n=500):
+        """The last `n` alerts, oldest first (like JsonlAlertStore.tail)."""
+        rows = self._fetch("SELECT * FROM alerts ORDER BY id DESC LIMIT ?", (n,))
+        return [self._to_dict(r) for r in reversed(rows)]
@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+
+# Bounded per-source state for the detectors.
+# Entries are kept in "last touched" order, so both TTL expiry (oldest first)
+# and LRU eviction simply pop from the front of the OrderedDict. A spoofed
+# source flood can no longer grow the detector memory without limit.
+
+
+class StateTable:
+    """Dict-like table with an entry cap, TTL expiry and LRU eviction.
+
+    - get()/set()/touch() move the entry to the "most recent" end
+    - sweep(now) drops entries not touched for `ttl` seconds
+    - when more than `max_entries` are stored, the least recently used go
+    """
+
+    def __init__(self, name, max_entries=100000, ttl=300, clock=time.time):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()  # key -> [last_seen, value]
+
+        # Counters
+        self.expired = 0   # Removed by the TTL sweep
+        self.evicted = 0   # Removed because the table was full (LRU)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        entry[0] = self.clock()
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def peek(self, key, default=None):
+        """Like get() but without refreshing the entry."""
+        entry = self._data.get(key)
+        return default if entry is None else entry[1]
+
+    def set(self, key, value):
+        entry = self._data.get(key)
+        if entry is None:
+            self._data[key] = [self.clock(), value]
+            if len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evicted += 1
+        else:
+            entry[0] = self.clock()
+            entry[1] = value
+            self._data.move_to_end(key)
+        return value
+
+    def setdefault(self, key, factory):
+        """Returns the value for `key`, creating it with factory() if missing."""
+        entry = self._data.get(key)
+        if entry is not None:
+            entry[0] = self.clock()
+            self._data.move_to_end(key)
+            return entry[1]
+        return self.set(key, factory())
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def sweep(self, now=None):
+        """Drops the entries idle for more than `ttl` seconds, returns how many."""
+        limit = (self.clock() if now is None else now) - self.ttl
+        data = self._data
+        removed = 0
+        while data:
+            key = next(iter(data))
+            if data[key][0] > limit:
+                break
+            del data[key]
+            removed += 1
+        self.expired += removed
+        return removed
+
+    def clear(self):
+        self._data.clear()
+
+    def items(self):
+        return ((k, e[1]) for k, e in self._data.items())
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __getitem__(self, key):
+        return self._data[key][1]
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,206 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import multiprocessing as mp
+import queue
+import traceback
+import zlib
+
+from core.detection import DetectionEngine
+from core.logger import LogManager
+
+# Multi-core detection.
+# Each packet is routed to one of N worker processes by hashing its source IP,
+# so all the per-IP state (SYN flood, port scan, brute force, ARP cache) of a
+# given source lives in exactly one DetectionEngine. With connection tracking
+# (CONN_TRACKING), the worker of the destination also gets a "flow only" copy
+# of each TCP packet: a client's worker then sees its servers' replies and
+# follows whole connections, while every other detector keeps seeing each
+# packet once, on its source's worker. Workers don't write logs
+# themselves: their alerts go to a single writer process running LogManager.
+
+
+_TICK = "__tick__" # Marks a clock tick among the forwarded alerts
+
+
+class AlertForwarder:
+    """Stands in for LogManager inside a worker: alerts go to the writer process."""
+
+    def __init__(self, alerts):
+        self.alerts = alerts
+
+    def log_alert(self, src_ip, attack_type, description, timestamp=None):
+        self.alerts.put((src_ip, attack_type, description, timestamp))
+
+    def tick(self, now=None):
+        # The engine's clock (packet time in replay mode): the writer closes
+        # the quiet incidents against it, like LogManager.tick() in one process
+        self.alerts.put((_TICK, now))
+
+
+def shard_key(info):
+    """Which value decides the worker of a packet (None = nothing to detect)."""
+    if info.dns_answers:
+        # DNS spoofing compares responses sharing a transaction ID,
+        # possibly sent by different sources
+        return f"dns:{info.dns_id}"
+    if info.arp_op is not None:
+        return info.arp_psrc # Same key as IP packets: they share the ARP cache
+    return info.ip_src
+
+
+def shard_of(key, n):
+    # crc32 rather than hash(): stable across processes and runs
+    return zlib.crc32(key.encode()) % n
+
+
+def routes(info, n, flows=False):
+    """(worker, item) pairs for one packet: the packet itself for the worker
+    of its shard key and, with connection tracking, a ("flow", info) copy for
+    the worker of its destination (see handle())."""
+    key = shard_key(info)
+    if key is None:
+        return []
+    shard = shard_of(key, n)
+    routed = [(shard, info)]
+    if flows and info.tcp_flags is not None:
+        other = shard_of(info.ip_dst, n)
+        if other != shard:
+            routed.append((other, ("flow", info)))
+    return routed
+
+
+def handle(engine, item):
+    """Runs one routed item through a worker engine, returns its alerts."""
+    if type(item) is tuple: # Flow-only copy: the source belongs to another worker
+        return engine.track_flow(item[1])
+    return engine.analyze(item)
+
+
+def _worker_main(index, packets, alerts, enabled, settings):
+    engine = DetectionEngine(logger=AlertForwarder(alerts), enabled=enabled)
+    if settings:
+        engine.configure(**settings)
+    while True:
+        batch = packets.get()
+        if batch is None:
+            break
+        for item in batch:
+            try:
+                for alert in handle(engine, item):
+                    print(f"[worker {index}] {alert}")
+            except Exception:
+                traceback.print_exc()
+
+
+def _writer_main(alerts, notify, log_options, auto_block=None, replay=False):
+    logger = LogManager(**(log_options or {}))
+    if not notify:
+        logger.notifier.is_enabled = False
+    responder = None
+    if auto_block is not None:
+        from core.auto_responder import AutoResponder
+        from core.ip_index import IPListFile
+        whitelist = IPListFile("logs/whitelist.json")
+        def protected(ip):
+            whitelist.refresh()
+            return ip in whitelist.index
+        responder = AutoResponder(is_protected=protected, **auto_block).start()
+        logger.add_listener(responder.on_alert)
+    clock = None # Latest detection time received (packet time in replay mode)
+    while True:
+        try:
+            item = alerts.get(timeout=5)
+        except queue.Empty:
+            if not replay:
+                logger.tick() # Close the incidents that went quiet
+            continue # Replay: time only moves with the packets
+        if item is None:
+            break
+        try:
+            if item[0] == _TICK:
+                if item[1] is not None:
+                    clock = item[1] if clock is None else max(clock, item[1])
+                if clock is not None:
+                    logger.tick(clock)
+                continue
+            logger.log_alert(*item)
+        except Exception:
+            traceback.print_exc()
+    if responder is not None:
+        responder.close()
+    logger.close()
+
+
+class ShardedDetector:
+    """Fans decoded packets (PacketInfo) out to N DetectionEngine processes."""
+
+    def __init__(self, workers=None, batch_size=256, queue_batches=64, notify=True, enabled=None,
+                 settings=None, log_options=None, auto_block=None, replay=False):
+        self.n = workers or mp.cpu_count()
+        self.enabled = enabled   # Active detectors (None = all)
+        self.settings = settings # Thresholds applied to every worker engine
+        self.flows = bool((settings or {}).get("CONN_TRACKING")) # Connection-aware sharding
+        self.log_options = log_options # LogManager settings of the writer process
+        self.auto_block = auto_block   # AutoResponder settings (None = no automatic blocking)
+        self.replay = replay           # Packet-time clock: the writer never ticks on the wall clock
+        self.batch_size = batch_size
+        self.queue_batches = queue_batches # Bounded: capture feels the backpressure
+        self.notify = notify
+
+        self._queues = []
+        self._buffers = [[] for _ in range(self.n)]
+        self._procs = []
+        self._alerts = None
+        self._writer = None
+        self.submitted = [0] * self.n
+
+    def start(self):
+        self._alerts = mp.Queue()
+        self._writer = mp.Process(target=_writer_main, args=(self._alerts, self.notify, self.log_options, self.auto_block,
+                                                            self.replay),
+                                  name="ids-writer", daemon=True)
+        self._writer.start()
+        for i in range(self.n):
+            q = mp.Queue(self.queue_batches)
+            p = mp.Process(target=_worker_main, args=(i, q, self._alerts, self.enabled, self.settings),
+                           name=f"ids-worker-{i}", daemon=True)
+            p.start()
+            self._queues.append(q)
+            self._procs.append(p)
+        return self
+
+    def shard_of(self, key):
+        return shard_of(key, self.n)
+
+    def submit(self, info):
+        for shard, item in routes(info, self.n, self.flows):
+            buf = self._buffers[shard]
+            buf.append(item)
+            self.submitted[shard] += 1
+            if len(buf) >= self.batch_size:
+                self._queues[shard].put(buf)
+                self._buffers[shard] = []
+
+    def flush(self):
+        """Sends the partially filled batches."""
+        for shard, buf in enumerate(self._buffers):
+            if buf:
+                self._queues[shard].put(buf)
+                self._buffers[shard] = []
+
+    def stop(self, timeout=10):
+        self.flush()
+        for q in self._queues:
+            q.put(None)
+        for p in self._procs:
+            p.join(timeout)
+        if self._alerts is not None:
+            self._alerts.put(None)
+            self._writer.join(timeout)
+        self._queues = []
+        self._procs = []
+
+    def stats(self):
+        return {"workers": self.n, "submitted": list(self.submitted)}
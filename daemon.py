@@ -0,0 +1,170 @@
+import os
+import sys
+import json
+import signal
+import argparse
+
+# Headless entry point (service / container): no banner, no dashboard.
+# Nothing heavy is imported before the options are parsed and checked, the
+# fast decoder path never loads Scapy's layers, and the detection engine is
+# built once, with its final settings.
+#
+#   python daemon.py --iface eth0 --backend sqlite --set SYNC_LIMIT=50
+#   python daemon.py --config /etc/ids.json --check
+#
+# The config file is a JSON object using the option names ("iface",
+# "detectors", "thresholds": {"SYNC_LIMIT": 50}, ...); command-line options
+# override it.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from core.detection import DETECTORS, SCAN_MODES
+from core.logger import BACKENDS
+from core.pipeline import POLICIES
+from core.event_bus import EVENT_PORT
+from core.metrics import METRICS_PORT
+from core.profiler import CONTROL_PORT
+
+DEFAULTS = {
+    "iface": None,
+    "bpf": None,
+    "replay": None,
+    "detectors": list(DETECTORS),
+    "scan_mode": "exact",
+    "conn_tracking": False,
+    "thresholds": {},
+    "backend": "jsonl",
+    "log_dir": None,
+    "notify": True,
+    "scapy": False,
+    "queue_size": 10000,
+    "overload": "drop-oldest",
+    "consumers": 1,
+    "workers": 0,
+    "auto_block": False,
+    "max_block_rate": 20,
+    "live_port": EVENT_PORT,
+    "metrics_port": METRICS_PORT,
+    "metrics_interval": 60,
+    "metrics_sample": 16,
+    "profile_port": 0, # Opt-in: no control socket, no SIGUSR2 handler unless asked
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mini IDS - headless daemon")
+    parser.add_argument("--config", help="JSON file with the options below (command line wins)")
+    parser.add_argument("--check", action="store_true",
+                        help="Validate the options, build the engine, print the effective config and exit")
+    parser.add_argument("--iface", help="Capture interface (default: Scapy's default route interface)")
+    parser.add_argument("--bpf", help="Custom BPF capture filter (default: derived from the detectors, '' = none)")
+    parser.add_argument("--replay", metavar="PCAP", help="Replay a capture file instead of sniffing")
+    parser.add_argument("--detectors", help=f"Comma-separated detectors (default: all of {', '.join(DETECTORS)})")
+    parser.add_argument("--scan-mode", choices=SCAN_MODES)
+    parser.add_argument("--conn-tracking", action="store_true", default=None,
+                        help="Follow TCP connections (half-open SYN flood, short-session brute force)")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", dest="thresholds",
+                        help="Detection threshold, e.g. --set SYNC_LIMIT=50 (repeatable)")
+    parser.add_argument("--backend", choices=BACKENDS, help="Alert storage (default: jsonl)")
+    parser.add_argument("--log-dir", help="Where alerts, metrics and profiles go (default: ./logs of the project)")
+    parser.add_argument("--no-notify", dest="notify", action="store_false", default=None,
+                        help="Never send Telegram notifications")
+    parser.add_argument("--scapy", action="store_true", default=None,
+                        help="Let Scapy dissect every packet (slow path) instead of the fast decoder")
+    parser.add_argument("--queue-size", type=int)
+    parser.add_argument("--overload", choices=POLICIES)
+    parser.add_argument("--consumers", type=int)
+    parser.add_argument("--workers", type=int, help="Shard detection over N processes (default: 0 = off)")
+    parser.add_argument("--auto-block", action="store_true", default=None)
+    parser.add_argument("--max-block-rate", type=int)
+    parser.add_argument("--live-port", type=int, help=f"Dashboard event channel (default: {EVENT_PORT}, 0 = off)")
+    parser.add_argument("--metrics-port", type=int, help=f"Prometheus endpoint (default: {METRICS_PORT}, 0 = off)")
+    parser.add_argument("--metrics-interval", type=int, help="Metrics snapshot period in seconds (0 = off)")
+    parser.add_argument("--metrics-sample", type=int, help="Time one packet in N (default: 16)")
+    parser.add_argument("--profile-port", type=int, help=f"Profiling control socket, e.g. {CONTROL_PORT} (default: 0 = off)")
+    return parser, parser.parse_args(argv)
+
+def _threshold(text):
+    name, _, value = text.partition("=")
+    if not value:
+        raise ValueError(f"Expected NAME=VALUE, got {text!r}")
+    try:
+        return name.strip(), json.loads(value)
+    except ValueError:
+        return name.strip(), value # Plain string, e.g. SCAN_MODE=sketch
+
+def load_options(args):
+    """Defaults < config file < command line."""
+    options = dict(DEFAULTS, thresholds={})
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        unknown = set(config) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown config keys: {', '.join(sorted(unknown))}")
+        options.update(config)
+        options["thresholds"] = dict(config.get("thresholds", {}))
+    for key, value in vars(args).items():
+        if key in ("config", "check", "thresholds") or value is None:
+            continue
+        options[key] = value
+    options["thresholds"].update(_threshold(t) for t in args.thresholds)
+    if isinstance(options["detectors"], str):
+        options["detectors"] = [d.strip() for d in options["detectors"].split(",") if d.strip()]
+    return options
+
+def configure(options):
+    """Applies the options to core.sniffer (imported here, after parsing)."""
+    from core import sniffer
+    if options["log_dir"]:
+        sniffer.set_log_options(log_dir=os.path.abspath(options["log_dir"]))
+    if options["backend"] != "jsonl":
+        sniffer.set_log_options(backend=options["backend"])
+    sniffer.set_detectors(options["detectors"])
+    settings = {"SCAN_MODE": options["scan_mode"], "CONN_TRACKING": options["conn_tracking"]}
+    sniffer.configure_engine(**dict(settings, **options["thresholds"])) # --set wins
+    if options["live_port"]:
+        sniffer.enable_event_bus(options["live_port"])
+    if options["metrics_port"] or options["metrics_interval"]:
+        sniffer.enable_metrics(port=options["metrics_port"] or None, interval=options["metrics_interval"],
+                               sample_every=options["metrics_sample"])
+    if options["profile_port"]:
+        sniffer.enable_profiler(options["profile_port"])
+    if options["auto_block"]:
+        sniffer.enable_auto_block(max_changes_per_sec=options["max_block_rate"])
+    engine = sniffer.get_engine() # Built once, with everything above
+    if not options["notify"]:
+        engine.logger.notifier.is_enabled = False
+    return sniffer, engine
+
+def main(argv=None):
+    parser, args = parse_args(argv)
+    try:
+        options = load_options(args)
+        sniffer, engine = configure(options)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.check:
+        effective = dict(options, thresholds=engine.settings(), log_dir=engine.logger.log_dir)
+        print(json.dumps(effective, indent=4, default=list))
+        sniffer.shutdown()
+        return 0
+
+    # systemd / docker stop: leave through the normal shutdown path
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        if options["replay"]:
+            sniffer.replay_pcap(options["replay"], notify=options["notify"], workers=options["workers"])
+        else:
+            sniffer.start_sniffing(fast=not options["scapy"], queue_size=options["queue_size"],
+                                   policy=options["overload"], consumers=options["consumers"],
+                                   workers=options["workers"], bpf=options["bpf"], iface=options["iface"])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sniffer.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,93 @@
 import os
 import sys
+import argparse
 
 # Teacher says: This line helps Python find our 'core' folder
 sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
 
-from sniffer import start_sniffing
+from sniffer import (start_sniffing, replay_pcap, set_detectors, configure_engine, set_alert_backend,
+                     enable_auto_block, enable_event_bus, enable_metrics,
+                     enable_profiler, shutdown)
+from pipeline import POLICIES
+from detection import DETECTORS, SCAN_MODES
+from logger import BACKENDS
+from event_bus import EVENT_PORT
+from metrics import METRICS_PORT
+from profiler import CONTROL_PORT
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mini IDS")
+    parser.add_argument("--replay", metavar="PCAP",
+                        help="Replay a pcap/pcapng file offline instead of sniffing live")
+    parser.add_argument("--notify", action="store_true",
+                        help="Send Telegram notifications during a replay")
+    parser.add_argument("--scapy", action="store_true",
+                        help="Let Scapy dissect every packet instead of the fast decoder")
+    parser.add_argument("--queue-size", type=int, default=10000,
+                        help="Max packets waiting for detection (default: 10000)")
+    parser.add_argument("--overload", choices=POLICIES, default="drop-oldest",
+                        help="What to do when the queue is full (default: drop-oldest)")
+    parser.add_argument("--consumers", type=int, default=1,
+                        help="Number of detection threads (default: 1)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Shard detection over N processes by source IP (default: off)")
+    parser.add_argument("--detectors", default=",".join(DETECTORS),
+                        help="Comma-separated detectors to enable (default: all)")
+    parser.add_argument("--scan-mode", choices=SCAN_MODES, default="exact",
+                        help="Port scan detection: exact (ports <= 1024) or sketch (all ports, fixed memory)")
+    parser.add_argument("--conn-tracking", action="store_true",
+                        help="Follow TCP connections: SYN flood counts half-open connections, "
+                             "brute force counts short completed sessions")
+    parser.add_argument("--backend", choices=BACKENDS, default="jsonl",
+                        help="Alert storage: jsonl (logs/attacks.jsonl) or sqlite (logs/alerts.db)")
+    parser.add_argument("--bpf", default=None,
+                        help="Custom BPF capture filter (default: derived from the detectors, '' = none)")
+    parser.add_argument("--auto-block", action="store_true",
+                        help="Block attacking IPs in the firewall for a limited time (live capture only)")
+    parser.add_argument("--max-block-rate", type=int, default=20,
+                        help="Max firewall rule changes per second with --auto-block (default: 20)")
+    parser.add_argument("--live-port", type=int, default=EVENT_PORT,
+                        help=f"Push alerts to dashboards on 127.0.0.1:PORT (default: {EVENT_PORT}, 0 = off)")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help=f"Serve Prometheus metrics on 127.0.0.1:PORT/metrics (default: {METRICS_PORT}, 0 = off)")
+    parser.add_argument("--metrics-interval", type=int, default=60,
+                        help="Write a metrics snapshot to logs/metrics.jsonl every N seconds (default: 60, 0 = off)")
+    parser.add_argument("--metrics-sample", type=int, default=16,
+                        help="Time one packet in N per detector (default: 16, 1 = every packet)")
+    parser.add_argument("--profile-port", type=int, default=0,
+                        help=f"Accept on-demand profiling commands on 127.0.0.1:PORT, e.g. {CONTROL_PORT} "
+                             f"(default: 0 = off; when on, SIGUSR2 also starts one)")
+    return parser.parse_args()
 
 if __name__ == "__main__":
+    args = parse_args()
     print("""
     =========================================
     🛡️  MINI IDS - STARTING SYSTEM 🛡️
     =========================================
     """)
+    set_detectors(d.strip() for d in args.detectors.split(",") if d.strip())
+    configure_engine(SCAN_MODE=args.scan_mode, CONN_TRACKING=args.conn_tracking)
+    if args.backend != "jsonl":
+        set_alert_backend(args.backend)
+    if args.live_port:
+        enable_event_bus(args.live_port)
+    if args.metrics_port or args.metrics_interval:
+        enable_metrics(port=args.metrics_port or None, interval=args.metrics_interval,
+                       sample_every=args.metrics_sample)
+    if args.profile_port:
+        enable_profiler(args.profile_port)
+    if args.auto_block:
+        enable_auto_block(max_changes_per_sec=args.max_block_rate)
     try:
-        start_sniffing()
+        if args.replay:
+            replay_pcap(args.replay, notify=args.notify, workers=args.workers)
+        else:
+            start_sniffing(fast=not args.scapy, queue_size=args.queue_size,
+                           policy=args.overload, consumers=args.consumers,
+                           workers=args.workers, bpf=args.bpf)
     except KeyboardInterrupt:
         print("\n[!] IDS Stopped by User.")
         sys.exit(0)
+    finally:
+        shutdown() # Writes the alerts still queued in memory
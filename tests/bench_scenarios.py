@@ -0,0 +1,179 @@
+import sys
+import os
+import json
+import time
+import platform
+import argparse
+import subprocess
+import tempfile
+import contextlib
+from array import array
+from collections import Counter
+
+# Add parent directory to path to import core
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from traffic_corpus import SCENARIOS
+
+# Offline throughput benchmark.
+# Every scenario of traffic_corpus.py is pushed through sniffer.raw_callback
+# (fast decoder + DetectionEngine, exactly like a replayed capture) with no
+# network at all. Each one runs in its own process so the peak RSS is the
+# scenario's own, then we report packets/s, per-packet latency percentiles
+# and peak memory. --output writes the results as JSON; --compare prints the
+# change against a previous run.
+#
+#   python tests/bench_scenarios.py --output bench.json
+#   python tests/bench_scenarios.py --scale 0.1 --compare bench.json
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError: # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak # bytes on macOS, KB elsewhere
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+def run_scenario(name, scale=1.0, settings=None):
+    """Runs one scenario in this process and returns its measurements."""
+    generator, default_count, expected = SCENARIOS[name]
+    count = max(1, int(default_count * scale))
+
+    from core import sniffer
+    from core.detection import DetectionEngine
+    from core.logger import LogManager
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Relative paths (whitelist, firewall rules, notifications) resolve in
+        # an empty directory: no list, no notification, same result every run
+        os.chdir(tmp)
+        logger = LogManager(log_dir=os.path.join(tmp, "logs"))
+        logger.notifier.is_enabled = False
+        alerts = Counter()
+        logger.add_listener(lambda src_ip, attack_type, description, ts: alerts.update([attack_type]))
+        engine = DetectionEngine(logger=logger)
+        if settings:
+            engine.configure(**settings)
+        sniffer.set_engine(engine)
+
+        callback = sniffer.raw_callback
+        clock = time.perf_counter_ns
+        latencies = array("q")
+        rss_before = peak_rss_kb()
+
+        # Alerts are printed by the callback: keep the terminal out of the timing
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            for ts, raw in generator(count):
+                t0 = clock()
+                callback(raw, ts)
+                latencies.append(clock() - t0)
+            wall = time.perf_counter() - start
+
+        busy = sum(latencies) / 1e9
+        logger.close()
+        os.chdir(ROOT)
+
+    ordered = sorted(latencies)
+    missing = [t for t in expected if not alerts[t]]
+    return {
+        "packets": count,
+        "pps": round(count / busy) if busy else 0,
+        "wall_pps": round(count / wall) if wall else 0, # Includes generating the frames
+        "p50_us": round(percentile(ordered, 50) / 1000, 2),
+        "p99_us": round(percentile(ordered, 99) / 1000, 2),
+        "max_us": round(ordered[-1] / 1000, 2),
+        "rss_start_kb": rss_before,
+        "rss_peak_kb": peak_rss_kb(),
+        "alerts": dict(alerts),
+        "decoder": sniffer.decoder_stats(),
+        "state": {table: {"entries": s["entries"], "evicted": s["evicted"]}
+                  for table, s in engine.state_stats().items()},
+        "missing_alerts": missing,
+    }
+
+def run_isolated(name, scale, settings=None):
+    """Runs one scenario in a fresh interpreter and returns its result."""
+    cmd = [sys.executable, os.path.abspath(__file__), "--run-one", name, "--scale", str(scale)]
+    if settings:
+        cmd += ["--settings", json.dumps(settings)]
+    out = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT)
+    if out.returncode != 0:
+        raise RuntimeError(f"scenario {name} failed:\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=ROOT).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+def print_results(results, previous=None):
+    print(f"    {'scenario':<14} {'packets':>9} {'pkt/s':>10} {'p50 us':>8} {'p99 us':>8} {'peak RSS':>10}  alerts")
+    for name, r in results.items():
+        rss = f"{r['rss_peak_kb'] / 1024:.0f} MB" if r["rss_peak_kb"] else "n/a"
+        line = (f"    {name:<14} {r['packets']:>9,} {r['pps']:>10,} {r['p50_us']:>8} {r['p99_us']:>8} "
+                f"{rss:>10}  {sum(r['alerts'].values())}")
+        old = (previous or {}).get(name)
+        if old and old.get("pps"):
+            line += f"  ({(r['pps'] / old['pps'] - 1) * 100:+.1f}% pkt/s vs previous)"
+        print(line)
+        if r["missing_alerts"]:
+            print(f"[X] {name}: expected alerts not raised: {', '.join(r['missing_alerts'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline IDS throughput benchmark on synthetic traffic")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplies every scenario's packet count")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Previous JSON results to compare with")
+    parser.add_argument("--settings", help="Detection settings as JSON (e.g. '{\"SCAN_MODE\": \"sketch\"}')")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS) # Child process
+    args = parser.parse_args()
+    settings = json.loads(args.settings) if args.settings else None
+
+    if args.run_one:
+        print(json.dumps(run_scenario(args.run_one, args.scale, settings)))
+        return
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    print(f"[*] Offline benchmark ({len(names)} scenarios, scale {args.scale})")
+    results = {}
+    for name in names:
+        print(f"    - {name}...", flush=True)
+        results[name] = run_isolated(name, args.scale, settings)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            previous = json.load(f).get("scenarios")
+    print_results(results, previous)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "scale": args.scale, "settings": settings or {},
+                       "scenarios": results}, f, indent=4)
+        print(f"[+] Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+# Startup time of the headless daemon, each measure in a fresh interpreter.
+#
+#   python tests/bench_startup.py              # median of 5 runs, checks the budget
+#   python tests/bench_startup.py --runs 9 --budget 0.6
+#
+# "--check" is the whole startup path: options parsed, engine and logger
+# built with their final settings, then shut down. Reference: importing
+# scapy.all, which every start used to pay for.
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DAEMON = os.path.join(ROOT, "daemon.py")
+BUDGET = 0.5 # Seconds, median of `daemon.py --check`
+
+QUIET = ["--live-port", "0", "--metrics-port", "0", "--metrics-interval", "0", "--profile-port", "0"]
+
+# Run in the child after a --check: which heavy modules got imported
+PROBE = """
+import sys, json
+sys.path.insert(0, {root!r})
+import daemon
+daemon.main({argv!r})
+print(json.dumps({{
+    "scapy_modules": sum(1 for m in sys.modules if m.startswith("scapy")),
+    "layers": sorted(m for m in sys.modules if m.startswith("scapy.layers")),
+    "engine_built": sys.modules["core.sniffer"]._engine is not None,
+}}))
+"""
+
+def timed(cmd, cwd):
+    start = time.perf_counter()
+    out = subprocess.run(cmd, capture_output=True, text=True, cwd=cwd)
+    duration = time.perf_counter() - start
+    if out.returncode != 0:
+        raise RuntimeError(f"{' '.join(cmd)} failed:\n{out.stderr}")
+    return duration, out.stdout
+
+def median_time(cmd, cwd, runs):
+    timed(cmd, cwd) # Warm the OS file cache and the .pyc files
+    return statistics.median(timed(cmd, cwd)[0] for _ in range(runs))
+
+def main():
+    parser = argparse.ArgumentParser(description="IDS daemon startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=BUDGET, help=f"Seconds (default: {BUDGET})")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="ids-startup-") # No whitelist/blocklist files, throwaway logs
+    check = [sys.executable, DAEMON, "--check", "--log-dir", os.path.join(work, "logs")] + QUIET
+    cases = [
+        ("python -c pass", [sys.executable, "-c", "pass"]),
+        ("import scapy.all", [sys.executable, "-c", "import scapy.all"]),
+        ("daemon.py --help", [sys.executable, DAEMON, "--help"]),
+        ("daemon.py --check", check),
+    ]
+    print(f"[*] Startup times, median of {args.runs} runs")
+    times = {}
+    for name, cmd in cases:
+        times[name] = median_time(cmd, work, args.runs)
+        print(f"    - {name:<20} {times[name] * 1000:>7.0f} ms")
+
+    # What the fast path actually loaded
+    _, stdout = timed([sys.executable, "-c", PROBE.format(root=ROOT, argv=check[2:])], work)
+    probe = json.loads(stdout.strip().splitlines()[-1])
+    print(f"    - scapy modules loaded by --check: {probe['scapy_modules']}")
+
+    ok = True
+    if probe["layers"]:
+        print(f"[X] The fast path imported Scapy layers: {', '.join(probe['layers'])}")
+        ok = False
+    else:
+        print("[V] No Scapy layer imported on the fast path")
+    if not probe["engine_built"]:
+        print("[X] --check did not build the engine")
+        ok = False
+    if times["daemon.py --check"] <= args.budget:
+        print(f"[V] Startup within budget ({times['daemon.py --check']:.2f}s <= {args.budget:.2f}s)")
+    else:
+        print(f"[X] Startup over budget ({times['daemon.py --check']:.2f}s > {args.budget:.2f}s)")
+        ok = False
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
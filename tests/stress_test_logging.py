@@ -1,64 +1,150 @@
 import sys
 import os
+import json
 import time
+import tempfile
+import queue
+import threading
 
 # Add parent directory to path to import core
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.logger import LogManager
+from core.alert_store import segment_paths
+from core.workers import _writer_main, _TICK
+from core.alert_writer import AsyncAlertWriter
+
+def read_entries(log_dir):
+    entries = []
+    for path in segment_paths(log_dir):
+        with open(path, "r", encoding="utf-8") as f:
+            entries += [json.loads(line) for line in f]
+    return entries
 
 def run_stress_test():
     print("[*] Starting Logger Stress Test...")
-    logger = LogManager("logs/test_alerts.json")
-    
-    # Clean up previous test file
-    if os.path.exists("logs/test_alerts.json"):
-        os.remove("logs/test_alerts.json")
-    
+    log_dir = tempfile.mkdtemp(prefix="ids-stress-")
+    # Small segments so the rotation is exercised
+    logger = LogManager(log_dir=log_dir, max_segment_bytes=32 * 1024)
+    logger.notifier.is_enabled = False
+
     start_time = time.time()
-    
+
     # 1. Test Aggregation: Send 100 identical alerts in quick succession
     print("[*] Testing Aggregation (100 similar alerts)...")
     for _ in range(100):
         logger.log_alert("1.1.1.1", "Test Attack", "This should be aggregated")
-    
-    # Verify aggregation immediately before rotation
-    import json
-    with open("logs/test_alerts.json", "r") as f:
-        logs_pre = json.load(f)
-    
-    agg_entry = next((l for l in logs_pre if l["src_ip"] == "1.1.1.1"), None)
-    if agg_entry and agg_entry.get("count", 0) > 1:
-        print(f"[V] Aggregation verified early (count {agg_entry['count']})")
-    else:
-        print("[X] Aggregation failed early!")
 
     # 2. Test Different IPs: Send 10 different alerts
     print("[*] Testing Different IPs (10 unique alerts)...")
     for i in range(10):
         logger.log_alert(f"192.168.1.{i}", "Unique Attack", f"Alert number {i}")
-    
-    # 3. Test Rotation: Send 600 unique alerts (rotation limit is 500)
+
+    # 3. Test Rotation: Send 600 unique alerts
     print("[*] Testing Rotation (600 unique alerts)...")
     for i in range(600):
-        logger.log_alert(f"10.0.0.{i}", "Rotation Test", f"Log {i}")
+        logger.log_alert(f"10.0.{i // 250}.{i % 250}", "Rotation Test", f"Log {i}")
         if i % 200 == 0:
             print(f"    - Progress: {i}/600")
 
-    end_time = time.time()
-    duration = end_time - start_time
-    
+    logger.close() # Writes the rollups of the open incidents
+    duration = time.time() - start_time
     print(f"\n[+] Stress test completed in {duration:.2f} seconds.")
-    
-    with open("logs/test_alerts.json", "r") as f:
-        logs = json.load(f)
-    
-    print(f"[+] Total entries in file: {len(logs)}")
-    
-    if len(logs) <= 500:
-        print("[V] Rotation verified (<= 500 items)")
+
+    entries = read_entries(log_dir)
+    print(f"[+] Total entries written: {len(entries)}")
+
+    agg = [e for e in entries if e["src_ip"] == "1.1.1.1"]
+    rollup = next((e for e in agg if e.get("kind") == "rollup"), None)
+    if len(agg) == 2 and rollup and rollup["count"] == 100:
+        print("[V] Aggregation verified (1 alert + 1 rollup of 100)")
+    else:
+        print(f"[X] Aggregation failed! {agg}")
+
+    unique = {e["src_ip"] for e in entries if e["type"] == "Unique Attack"}
+    if len(unique) == 10:
+        print("[V] Different IPs verified (10 incidents)")
+    else:
+        print(f"[X] Different IPs failed! ({len(unique)} IPs)")
+
+    segments = segment_paths(log_dir)
+    if len(segments) > 1 and sum(1 for e in entries if e["type"] == "Rotation Test") == 600:
+        print(f"[V] Rotation verified ({len(segments)} segments, nothing lost)")
+    else:
+        print(f"[X] Rotation failed! ({len(segments)} segments)")
+
+def run_replay_writer_test():
+    # Worker writer (--workers) during a replay: a pause in the capture file is
+    # not a pause in the attack, only the packet time may close an incident
+    print("\n[*] Testing the worker writer on the replay clock (~6s)...")
+    log_dir = tempfile.mkdtemp(prefix="ids-writer-")
+    alerts = queue.Queue()
+    writer = threading.Thread(target=_writer_main, args=(alerts, False, {"log_dir": log_dir}, None, True))
+    writer.start()
+    t0 = 1500000000.0 # Packet time, years before the wall clock
+    for i in range(3):
+        alerts.put(("2.2.2.2", "Replay Attack", "Same incident", t0 + i))
+    alerts.put((_TICK, t0 + 2))
+    time.sleep(6) # Longer than the writer's idle timeout
+    for i in range(3, 5):
+        alerts.put(("2.2.2.2", "Replay Attack", "Same incident", t0 + i))
+    alerts.put((_TICK, t0 + 4))
+    alerts.put(None)
+    writer.join()
+
+    entries = [e for e in read_entries(log_dir) if e["src_ip"] == "2.2.2.2"]
+    rollups = [e for e in entries if e.get("kind") == "rollup"]
+    if len(entries) == 2 and len(rollups) == 1 and rollups[0]["count"] == 5:
+        print("[V] Replay writer: one incident of 5 alerts despite the idle pause")
+    else:
+        print(f"[X] Replay writer split the incident on the wall clock! {entries}")
+
+class SlowStore:
+    """Store whose writes take 0.5s; records overlapping calls."""
+
+    def __init__(self):
+        self.lines = []
+        self.busy = False
+        self.overlaps = 0
+        self.closed = 0
+
+    def append_many(self, entries):
+        if self.busy or self.closed:
+            self.overlaps += 1
+        self.busy = True
+        time.sleep(0.5)
+        self.lines += entries
+        self.busy = False
+
+    def close(self):
+        if self.busy:
+            self.overlaps += 1
+        self.closed += 1
+
+def run_close_timeout_test():
+    # close() giving up on a slow disk must not write or close under the writer thread
+    print("\n[*] Testing close() timing out on a slow store...")
+    store = SlowStore()
+    writer = AsyncAlertWriter(store, batch_size=10, flush_interval=0.05).start()
+    for i in range(30):
+        writer.write({"n": i})
+    time.sleep(0.1) # First batch in progress
+    start = time.time()
+    writer.close(timeout=0.2)
+    returned = time.time() - start
+    deadline = time.time() + 5
+    while not store.closed and time.time() < deadline:
+        time.sleep(0.05)
+    writer.close(timeout=0.2) # A second call does not close twice
+    ok = (returned < 0.5 and store.overlaps == 0 and store.closed == 1
+          and [e["n"] for e in store.lines] == list(range(30)))
+    if ok:
+        print(f"[V] close() returned after {returned:.1f}s, the thread wrote the 30 alerts in order then closed")
     else:
-        print("[X] Rotation failed!")
+        print(f"[X] close() raced the writer thread! overlaps={store.overlaps} closed={store.closed} "
+              f"lines={len(store.lines)}")
 
 if __name__ == "__main__":
     run_stress_test()
+    run_replay_writer_test()
+    run_close_timeout_test()
@@ -0,0 +1,175 @@
+import random
+import socket
+import struct
+
+# Deterministic synthetic traffic for the offline benchmarks.
+# Frames are packed by hand with struct (building a million packets with
+# Scapy would take longer than analysing them) and generated lazily, so the
+# corpus itself never sits in memory. Same scenario + seed = same bytes.
+
+START_TIME = 1700000000.0 # Capture timestamps start here (replay mode clock)
+
+GATEWAY_MAC = bytes.fromhex("aabbccdd0001")
+SERVER_MAC = bytes.fromhex("aabbccdd0002")
+
+_ETH = struct.Struct("!6s6sH")
+_IP = struct.Struct("!BBHHHBBH4s4s")
+_TCP = struct.Struct("!HHIIBBHHH")
+_UDP = struct.Struct("!HHHH")
+_ARP = struct.Struct("!HHBBH6s4s6s4s")
+_DNS = struct.Struct("!HHHHHH")
+
+TCP_FLAGS = {"F": 0x01, "S": 0x02, "R": 0x04, "P": 0x08, "A": 0x10, "U": 0x20}
+
+
+def mac(n):
+    return struct.pack("!HI", 0x0200, n & 0xFFFFFFFF) # Locally administered
+
+
+def ip(text_or_int):
+    if isinstance(text_or_int, int):
+        return struct.pack("!I", text_or_int)
+    return socket.inet_aton(text_or_int)
+
+
+def ipv4(src, dst, proto, payload, src_mac=GATEWAY_MAC, dst_mac=SERVER_MAC):
+    header = _IP.pack(0x45, 0, 20 + len(payload), 0, 0, 64, proto, 0, ip(src), ip(dst))
+    return _ETH.pack(dst_mac, src_mac, 0x0800) + header + payload
+
+
+def tcp(src, dst, sport, dport, flags, payload=b"", seq=0, ack=0, **eth):
+    bits = sum(TCP_FLAGS[f] for f in flags)
+    segment = _TCP.pack(sport, dport, seq, ack, 5 << 4, bits, 65535, 0, 0) + payload
+    return ipv4(src, dst, 6, segment, **eth)
+
+
+def udp(src, dst, sport, dport, payload=b"", **eth):
+    return ipv4(src, dst, 17, _UDP.pack(sport, dport, 8 + len(payload), 0) + payload, **eth)
+
+
+def arp_reply(psrc, hwsrc, pdst="192.168.1.1", hwdst=GATEWAY_MAC):
+    body = _ARP.pack(1, 0x0800, 6, 4, 2, hwsrc, ip(psrc), hwdst, ip(pdst))
+    return _ETH.pack(hwdst, hwsrc, 0x0806) + body
+
+
+def dns_response(dns_id, qname, answers, server="8.8.8.8", client="10.0.0.5"):
+    name = b"".join(bytes([len(part)]) + part.encode() for part in qname.strip(".").split(".")) + b"\0"
+    body = _DNS.pack(dns_id, 0x8180, 1, len(answers), 0, 0) + name + struct.pack("!HH", 1, 1)
+    for answer in answers:
+        # Name as a pointer to the question (offset 12)
+        body += struct.pack("!HHHIH", 0xC00C, 1, 1, 300, 4) + ip(answer)
+    return udp(server, client, 53, 33000 + dns_id % 1000, body)
+
+
+# --- Scenarios: generators of (timestamp, frame) ---
+
+def benign(n, seed=1, rate=2000):
+    """Ordinary traffic: web sessions, DNS lookups, UDP, consistent ARP.
+    Should raise no alert with the default thresholds."""
+    rng = random.Random(seed)
+    clients = [(f"10.0.{i // 250}.{i % 250 + 1}", mac(i)) for i in range(200)]
+    servers = [(f"10.1.0.{i + 10}", mac(1000 + i)) for i in range(4)]
+    names = ["example.com.", "intranet.local.", "updates.vendor.com."]
+    sent = 0
+    dns_id = 0
+    t = START_TIME
+    while sent < n:
+        client, client_mac = rng.choice(clients)
+        server, server_mac = rng.choice(servers)
+        up = {"src_mac": client_mac, "dst_mac": server_mac}
+        down = {"src_mac": server_mac, "dst_mac": client_mac}
+        sport = rng.randrange(32768, 61000)
+        dport = rng.choice((80, 443, 443, 8080))
+        kind = rng.random()
+        if kind < 0.80:
+            # One short TCP session
+            frames = [tcp(client, server, sport, dport, "S", **up),
+                      tcp(server, client, dport, sport, "SA", **down),
+                      tcp(client, server, sport, dport, "A", **up)]
+            frames += [tcp(client, server, sport, dport, "PA", b"x" * rng.randrange(40, 400), **up)
+                       for _ in range(rng.randrange(1, 6))]
+            frames += [tcp(server, client, dport, sport, "FA", **down),
+                       tcp(client, server, sport, dport, "A", **up)]
+        elif kind < 0.92:
+            i = rng.randrange(len(names))
+            dns_id = (dns_id + 1) % 65536
+            frames = [dns_response(dns_id, names[i], [f"203.0.113.{i + 1}"], client=client)]
+        elif kind < 0.98:
+            frames = [udp(client, server, sport, 5001, b"y" * rng.randrange(20, 1000), **up)]
+        else:
+            frames = [arp_reply(client, client_mac)]
+        for frame in frames:
+            if sent == n:
+                return
+            yield t, frame
+            t += 1.0 / rate
+            sent += 1
+
+
+def syn_flood(n, seed=2, rate=50000, sources=10):
+    """A few hosts hammering one web server with SYNs."""
+    rng = random.Random(seed)
+    attackers = [f"172.16.0.{i + 1}" for i in range(sources)]
+    for i in range(n):
+        yield START_TIME + i / rate, tcp(attackers[i % sources], "10.1.0.10", rng.randrange(1024, 65535), 80, "S")
+
+
+def port_scan(n, seed=3, rate=20000, sources=5):
+    """SYN scans sweeping ports 1-1024 over a handful of targets."""
+    rng = random.Random(seed)
+    scanners = [f"172.17.0.{i + 1}" for i in range(sources)]
+    targets = [f"10.1.0.{i + 10}" for i in range(8)]
+    for i in range(n):
+        src = scanners[i % sources]
+        yield START_TIME + i / rate, tcp(src, rng.choice(targets), 40000 + i % sources, i // sources % 1024 + 1, "S")
+
+
+def brute_force(n, seed=4, rate=5000, sources=50):
+    """Repeated connection attempts on SSH/RDP/FTP/Telnet."""
+    rng = random.Random(seed)
+    attackers = [f"172.18.{i // 250}.{i % 250 + 1}" for i in range(sources)]
+    services = (22, 22, 3389, 21, 23)
+    for i in range(n):
+        yield (START_TIME + i / rate,
+               tcp(rng.choice(attackers), "10.1.0.11", rng.randrange(1024, 65535), rng.choice(services), "S"))
+
+
+def spoofing(n, seed=5, rate=10000):
+    """ARP replies flipping between two MACs, IP traffic from the wrong MAC
+    and DNS transactions answered twice with different addresses."""
+    rng = random.Random(seed)
+    victims = [f"192.168.1.{i + 2}" for i in range(50)]
+    for i in range(n):
+        t = START_TIME + i / rate
+        victim = victims[i % len(victims)]
+        kind = i % 4
+        if kind == 0:
+            yield t, arp_reply(victim, mac(i % len(victims)))          # Genuine owner
+        elif kind == 1:
+            yield t, arp_reply(victim, mac(0xBAD00000 + rng.randrange(4))) # Attacker
+        elif kind == 2:
+            yield t, tcp(victim, "10.1.0.10", 40000, 443, "PA", b"z" * 64, src_mac=mac(0xBAD00000))
+        else:
+            dns_id = (i // 4) % 65536
+            answer = "203.0.113.7" if i // 4 % 2 else "198.51.100.66"
+            yield t, dns_response(dns_id - dns_id % 2, "bank.example.", [answer])
+
+
+def spoofed_flood(n, seed=6, rate=200000):
+    """SYN flood from a different random source for (almost) every packet:
+    the worst case for per-source state tables."""
+    rng = random.Random(seed)
+    for i in range(n):
+        src = rng.getrandbits(32) | 0x01000000 # Avoid 0.x.x.x
+        yield START_TIME + i / rate, tcp(src, "10.1.0.10", rng.randrange(1024, 65535), 80, "S")
+
+
+# name -> (generator, default packet count, alert types expected at least once)
+SCENARIOS = {
+    "benign": (benign, 200000, ()),
+    "syn_flood": (syn_flood, 200000, ("SYN Flood",)),
+    "port_scan": (port_scan, 200000, ("Port Scan",)),
+    "brute_force": (brute_force, 100000, ("Brute Force (SSH)",)),
+    "spoofing": (spoofing, 100000, ("ARP Spoofing", "IP Spoofing", "DNS Spoofing")),
+    "spoofed_flood": (spoofed_flood, 1000000, ()),
+}
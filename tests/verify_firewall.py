@@ -0,0 +1,178 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.firewall_manager import DryRunExecutor, FirewallManager, NetshBackend, NftablesBackend
+from core.auto_responder import AutoResponder
+from core.rules_file import update_rules
+
+# Checks the firewall backends with a dry-run executor: nothing is applied to
+# the host, we only look at the commands that would have been run.
+
+def check_nftables_batch():
+    print("[*] nftables: blocking 5000 IPs...")
+    listing = json.dumps({"nftables": [{"set": {"name": "blocked4", "elem": ["10.9.9.9"]}}]})
+    executor = DryRunExecutor({("nft", "-j", "list", "set", "inet", "ids", "blocked4"): listing})
+    backend = NftablesBackend(executor=executor)
+    ips = [f"10.{i // 65536}.{i // 256 % 256}.{i % 256}" for i in range(5000)] + ["2001:db8::1", "10.9.9.9", "DNS_Server"]
+
+    start = time.perf_counter()
+    added = backend.block_many(ips)
+    elapsed = time.perf_counter() - start
+    applies = [c for c in executor.commands if c[0] == ["nft", "-f", "-"]]
+    print(f"  [+] {len(added)} IPs added with {len(applies) - 1} nft transaction(s) (+ table setup) in {elapsed * 1000:.1f} ms")
+    assert len(added) == 5001                 # Already-blocked and non-IP entries skipped
+    assert len(applies) == 2                  # Setup + one batch
+    assert "add element inet ids blocked6 { 2001:db8::1 }" in applies[1][1]
+
+    calls = len(executor.commands)
+    assert backend.block_many(ips[:100]) == [] and len(executor.commands) == calls
+    print("  [+] Re-blocking known IPs is answered from the cache (no command)")
+
+    removed = backend.unblock_many(["10.0.0.1", "10.0.0.2", "192.0.2.1"])
+    assert removed == ["10.0.0.1", "10.0.0.2"]
+    assert executor.commands[-1][1] == "delete element inet ids blocked4 { 10.0.0.1, 10.0.0.2 }\n"
+    assert len(backend.blocked()) == 5000
+    print("  [+] Unblock batch OK")
+
+def check_netsh():
+    print("[*] netsh: one rule per IP...")
+    executor = DryRunExecutor({("netsh", "advfirewall", "firewall", "show", "rule", "name=all"):
+                               "Rule Name:      IDS_BLOCK_1.2.3.4\n"})
+    backend = NetshBackend(executor=executor)
+    assert backend.blocked() == {"1.2.3.4"}
+    assert backend.block_many(["1.2.3.4", "5.6.7.8"]) == ["5.6.7.8"]
+    assert executor.commands[-1][0][-1] == "remoteip=5.6.7.8"
+    print("  [+] OK")
+
+def check_manager_api():
+    print("[*] FirewallManager static API with a failing backend...")
+    FirewallManager.set_backend(NftablesBackend(executor=DryRunExecutor(fail=True)))
+    assert FirewallManager.block_ip("DNS_Server") is False
+    assert FirewallManager.block_ip("1.2.3.4") is False # Error reported, not raised
+    FirewallManager.set_backend(NftablesBackend(executor=DryRunExecutor()))
+    assert FirewallManager.block_ip("1.2.3.4") is True
+    assert FirewallManager.get_blocked_ips() == ["1.2.3.4"]
+    assert FirewallManager.unblock_ip("1.2.3.4") is True
+    assert FirewallManager.get_blocked_ips() == []
+    print("  [+] OK")
+
+class FlakyFirewall:
+    """In-memory firewall whose unblocks can be refused."""
+
+    def __init__(self):
+        self.rules = set()
+        self.refuse_unblock = False
+
+    def block_many(self, ips):
+        added = [ip for ip in ips if ip not in self.rules]
+        self.rules.update(added)
+        return added
+
+    def unblock_many(self, ips):
+        if self.refuse_unblock:
+            return []
+        removed = [ip for ip in ips if ip in self.rules]
+        self.rules.difference_update(removed)
+        return removed
+
+    def get_blocked_ips(self):
+        return sorted(self.rules)
+
+def check_auto_responder():
+    print("[*] AutoResponder: refused unblocks, manual entries, repeat offenders...")
+    work = tempfile.mkdtemp(prefix="ids-responder-")
+    rules_file = os.path.join(work, "firewall_rules.json")
+    with open(rules_file, "w") as f:
+        json.dump({"blocklist": ["9.9.9.9"], "whitelist": []}, f) # Blocked by hand
+    firewall = FlakyFirewall()
+    responder = AutoResponder(firewall=firewall, state_file=os.path.join(work, "active_blocks.json"),
+                              rules_file=rules_file, max_changes_per_sec=1000)
+    def blocklist():
+        with open(rules_file) as f:
+            return set(json.load(f)["blocklist"])
+
+    now = time.time()
+    responder.on_alert("1.2.3.4", "SYN Flood")
+    responder.on_alert("9.9.9.9", "SYN Flood")
+    assert responder.process(now) == (["1.2.3.4"], []) # The manual entry is not ours to block
+    assert blocklist() == {"1.2.3.4", "9.9.9.9"}
+
+    # The firewall refuses the unblock: the block stays active and listed, and is retried
+    firewall.refuse_unblock = True
+    later = now + 3601
+    assert responder.process(later) == ([], [])
+    assert "1.2.3.4" in responder.active and "1.2.3.4" in blocklist() and "1.2.3.4" in firewall.rules
+    firewall.refuse_unblock = False
+    assert responder.process(later) == ([], ["1.2.3.4"])
+    assert blocklist() == {"9.9.9.9"} and not firewall.rules # Manual entry untouched
+    print("  [+] Refused unblock retried, manual entry kept")
+
+    # Re-offending while its block expires: blocked again, for twice as long
+    responder.on_alert("1.2.3.4", "SYN Flood")
+    responder.process(later)
+    assert responder.active["1.2.3.4"]["blocks"] == 2
+    assert responder.active["1.2.3.4"]["expires"] == later + 2 * 3600
+    responder._expiry.clear()
+    responder._to_unblock.add("1.2.3.4")
+    responder.on_alert("1.2.3.4", "SYN Flood") # Alert between expiry and the next batch
+    responder.process(later + 10)
+    assert responder.active["1.2.3.4"]["blocks"] == 3, responder.active
+    print("  [+] Repeat offender escalates (1h -> 2h -> 4h)")
+
+class SlowDiskResponder(AutoResponder):
+    """Takes its time writing firewall_rules.json."""
+
+    def _sync_blocklist(self, active, removed):
+        time.sleep(0.5)
+        super()._sync_blocklist(active, removed)
+
+def check_rules_writers():
+    print("[*] firewall_rules.json: slow disk, concurrent writers...")
+    work = tempfile.mkdtemp(prefix="ids-rules-")
+    rules_file = os.path.join(work, "firewall_rules.json")
+    responder = SlowDiskResponder(firewall=FlakyFirewall(), state_file=os.path.join(work, "active_blocks.json"),
+                                  rules_file=rules_file, max_changes_per_sec=1000)
+
+    # Alerts keep flowing while a batch writes the files
+    responder.on_alert("1.2.3.4", "SYN Flood")
+    batch = threading.Thread(target=responder.process)
+    batch.start()
+    time.sleep(0.1)
+    start = time.perf_counter()
+    responder.on_alert("5.6.7.8", "Brute Force (SSH)")
+    waited = time.perf_counter() - start
+    batch.join()
+    assert waited < 0.1, waited
+    print(f"  [+] on_alert() during a slow batch: {waited * 1000:.2f} ms")
+
+    # The dashboard adds whitelist entries while the responder syncs its blocks:
+    # every change survives
+    def operator(n):
+        for i in range(25):
+            ip = f"192.168.{n}.{i}"
+            update_rules(rules_file, lambda rules: rules["whitelist"].append(ip))
+    threads = [threading.Thread(target=operator, args=(n,)) for n in range(4)]
+    threads.append(threading.Thread(target=responder.process))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with open(rules_file) as f:
+        rules = json.load(f)
+    assert len(rules["whitelist"]) == 100, len(rules["whitelist"])
+    assert set(rules["blocklist"]) == {"1.2.3.4", "5.6.7.8"}, rules["blocklist"]
+    print("  [+] 100 operator changes and the auto-blocks, none lost")
+
+if __name__ == "__main__":
+    print("=== Firewall Backend Verification (dry run) ===")
+    check_nftables_batch()
+    check_netsh()
+    check_manager_api()
+    check_auto_responder()
+    check_rules_writers()
+    print("\n[+] All firewall checks passed.")
@@ -0,0 +1,182 @@
+import sys
+import os
+import time
+import tempfile
+import tracemalloc
+
+# Add parent directory to path to import core
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.decoder import decode
+from core.detection import DetectionEngine
+from core.logger import LogManager
+from core.flow_table import FlowTable, NEW, REPEAT, RETRANSMIT, COMPLETED, REJECTED, CLOSED
+from core.workers import routes, handle, shard_of
+from traffic_corpus import tcp, benign, syn_flood, spoofed_flood, START_TIME
+
+CLIENT = "10.0.0.5"
+SERVER = "10.1.0.10"
+
+def new_engine(flows):
+    logger = LogManager(log_dir=tempfile.mkdtemp(prefix="logs-", dir="."))
+    logger.notifier.is_enabled = False
+    engine = DetectionEngine(logger=logger)
+    engine.configure(CONN_TRACKING=flows)
+    return engine
+
+def replay(engine, frames):
+    """Alert types raised by a list of (timestamp, frame)."""
+    types = []
+    for ts, raw in frames:
+        for alert in engine.analyze(decode(raw, ts)):
+            types.append(alert)
+    engine.logger.close()
+    return types
+
+def session(t, sport, dport, seconds=0.5):
+    """One complete TCP session lasting `seconds`, from CLIENT to SERVER."""
+    return [(t, tcp(CLIENT, SERVER, sport, dport, "S")),
+            (t + 0.001, tcp(SERVER, CLIENT, dport, sport, "SA")),
+            (t + 0.002, tcp(CLIENT, SERVER, sport, dport, "A")),
+            (t + 0.003, tcp(CLIENT, SERVER, sport, dport, "PA", b"login")),
+            (t + seconds, tcp(SERVER, CLIENT, dport, sport, "FA")),
+            (t + seconds + 0.001, tcp(CLIENT, SERVER, sport, dport, "FA"))]
+
+def check_table():
+    table = FlowTable(short_session=5)
+    c, s = (CLIENT, 40000), (SERVER, 22)
+    events = [table.update(*c, *s, "S", 0.0).event,
+              table.update(*c, *s, "S", 0.05).event,     # Faster than any retransmission
+              table.update(*c, *s, "S", 1.0).event,      # Retransmission after 1s
+              table.update(*s, *c, "SA", 1.01).event,
+              table.update(*c, *s, "A", 1.02).event,
+              table.update(*c, *s, "PA", 1.5).event,
+              table.update(*s, *c, "FA", 2.0).event]
+    assert events == [NEW, REPEAT, RETRANSMIT, None, COMPLETED, None, CLOSED], events
+    assert abs(table.update(*c, *s, "FA", 2.02).duration() - 1.0) < 1e-9 # Since the handshake (1.02)
+    assert len(table) == 0, table.stats() # Both FINs: forgotten at once
+    assert table.update(CLIENT, 40001, SERVER, 23, "S", 3.0).event == NEW
+    assert table.update(SERVER, 23, CLIENT, 40001, "RA", 3.01).event == REJECTED
+    assert table.update(CLIENT, 40002, SERVER, 80, "A", 3.0) is None # Mid-stream: not picked up
+    table.update(CLIENT, 40003, SERVER, 80, "S", 4.0)
+    assert table.sweep(4.0 + table.handshake_ttl) == 1
+    stats = table.stats()
+    assert (stats["completed"], stats["rejected"], stats["half_open_expired"], stats["short_sessions"]) == (1, 1, 1, 1)
+    print(f"[V] Flow states and events: {stats}")
+
+def check_syn_flood():
+    # A client opening 60 connections in one second, all completed (browser, proxy...)
+    burst = []
+    for i in range(60):
+        burst += session(START_TIME + i / 60, 41000 + i, 443)[:3]
+    classic = replay(new_engine(False), burst)
+    tracked = replay(new_engine(True), burst)
+    assert any("SYN Flood" in a for a in classic) and not tracked, (classic, tracked)
+    print(f"[V] Completed burst: {len(classic)} alert(s) without tracking, none with it")
+
+    # A real flood still raises it
+    alerts = replay(new_engine(True), list(syn_flood(5000)))
+    assert any("semi-ouvertes" in a for a in alerts), alerts[:3]
+    print(f"[V] SYN flood still detected with tracking ({len(alerts)} alerts)")
+
+def check_brute_force():
+    # Retransmissions to an unreachable SSH server: not a brute force
+    retries = [(START_TIME + i * 3 + delay, tcp(CLIENT, SERVER, 42000 + i, 22, "S"))
+               for i in range(3) for delay in (0, 1, 3)]
+    classic = replay(new_engine(False), retries)
+    tracked = replay(new_engine(True), retries)
+    assert any("Brute Force" in a for a in classic) and not tracked, (classic, tracked)
+    print(f"[V] SYN retransmissions: {len(classic)} alert(s) without tracking, none with it")
+
+    # Short SSH sessions one after the other: a password guessing loop
+    frames = []
+    for i in range(8):
+        frames += session(START_TIME + i * 2, 43000 + i, 22, seconds=1.5)
+    alerts = replay(new_engine(True), frames)
+    assert any("sessions courtes" in a for a in alerts), alerts
+    print(f"[V] Short sessions on SSH: {alerts[0]}")
+
+def replay_sharded(frames, n=4):
+    """Same as replay() with the packets routed over n worker engines, the way
+    ShardedDetector does (in-process: no worker processes needed)."""
+    engines = [new_engine(True) for _ in range(n)]
+    alerts = []
+    for ts, raw in frames:
+        for shard, item in routes(decode(raw, ts), n, flows=True):
+            alerts += handle(engines[shard], item)
+    for engine in engines:
+        engine.logger.close()
+    return alerts
+
+def check_sharding():
+    assert shard_of(CLIENT, 4) != shard_of(SERVER, 4) # Replies cross workers
+    # Short sessions: the server's FINs must reach the client's worker
+    frames = []
+    for i in range(8):
+        frames += session(START_TIME + i * 2, 43000 + i, 22, seconds=1.5)
+    alerts = replay_sharded(frames)
+    assert any("sessions courtes" in a for a in alerts), alerts
+
+    # Completed burst: the SYN-ACKs must reach it too, or every handshake looks half-open
+    burst = []
+    for i in range(60):
+        burst += session(START_TIME + i / 60, 41000 + i, 443)[:3]
+    assert not replay_sharded(burst)
+
+    # Scanner with a privileged source port (nmap -g 53) over several targets:
+    # its per-source scan state must stay on one worker
+    scanner = "172.20.0.9"
+    targets = [f"10.1.0.{i}" for i in range(10, 18)]
+    scan = [(START_TIME + i / 1000, tcp(scanner, targets[i % len(targets)], 53, i // len(targets) + 1, "S"))
+            for i in range(400)]
+    single = replay(new_engine(True), scan)
+    sharded = replay_sharded(scan)
+    assert any("Scan de Ports" in a for a in single) and sorted(sharded) == sorted(single), (single, sharded)
+    print(f"[V] Sharded over 4 workers: same alerts as one engine ({len(sharded)} for a source-port-53 scan)")
+
+def check_memory():
+    engine = new_engine(True)
+    engine.configure(MAX_FLOWS=20000)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for ts, raw in spoofed_flood(100000):
+        engine.analyze(decode(raw, ts))
+    size = sum(d.size_diff for d in tracemalloc.take_snapshot().compare_to(before, "filename")
+               if d.traceback[0].filename.endswith("flow_table.py"))
+    tracemalloc.stop()
+    stats = engine.flows.stats()
+    engine.logger.close()
+    assert stats["entries"] <= 20000 and stats["evicted"] >= 80000, stats
+    print(f"[V] Spoofed flood: {stats['entries']} flows kept, {stats['evicted']} evicted, "
+          f"~{size / stats['entries']:.0f} bytes per flow in flow_table.py")
+
+def check_benign():
+    infos = [decode(raw, ts) for ts, raw in benign(100000)]
+    times = {}
+    for flows in (False, True):
+        engine = new_engine(flows)
+        start = time.perf_counter()
+        alerts = [a for info in infos for a in engine.analyze(info)]
+        times[flows] = time.perf_counter() - start
+        assert not alerts, alerts[:3]
+        if flows:
+            stats = engine.flows.stats()
+        engine.logger.close()
+    print(f"    - without tracking: {len(infos) / times[False]:>10,.0f} pkt/s")
+    print(f"    - with tracking:    {len(infos) / times[True]:>10,.0f} pkt/s")
+    print(f"[V] Benign traffic: no alert, {stats['completed']} handshakes completed, "
+          f"{stats['short_sessions']} short sessions")
+
+def run_verification():
+    print("[*] Connection tracking verification (offline, synthetic traffic)")
+    os.chdir(tempfile.mkdtemp(prefix="ids-flows-")) # No whitelist/blocklist files
+    check_table()
+    check_syn_flood()
+    check_brute_force()
+    check_sharding()
+    check_memory()
+    check_benign()
+
+if __name__ == "__main__":
+    run_verification()
@@ -0,0 +1,111 @@
+import ipaddress
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.ip_index import IPIndex, IPListFile
+
+# Checks the compiled whitelist/blocklist index against a plain scan with the
+# ipaddress module, on the kinds of entries operators actually write.
+
+def reference(entries, ip):
+    """The slow, obviously right answer."""
+    entries = [str(e).strip() for e in entries if str(e).strip()]
+    if ip in entries:
+        return True
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    for entry in entries:
+        try:
+            if addr in ipaddress.ip_network(entry, strict=False):
+                return True
+        except (ValueError, TypeError):
+            pass
+    return False
+
+def check(entries, cases):
+    index = IPIndex(entries)
+    for ip, expected in cases:
+        assert (ip in index) == expected, (entries, ip, expected)
+        assert (ip in index) == expected, (entries, ip, "cached") # Second lookup hits the cache
+        assert reference(entries, ip) == expected, (entries, ip, "reference")
+    return index
+
+def check_entries():
+    print("[*] Exact addresses, prefixes, IPv6, odd entries...")
+    check(["10.0.0.5", "192.168.1.1/32"], [
+        ("10.0.0.5", True), ("10.0.0.6", False), ("192.168.1.1", True), ("192.168.1.10", False),
+    ])
+    print("  [+] Exact IPs (a /32 counts as one)")
+
+    # Overlapping prefixes: the /16 covers the /24, the /24 with host bits set still works
+    check(["10.1.0.0/16", "10.1.2.0/24", "10.9.9.77/24", "172.16.0.0/12"], [
+        ("10.1.2.3", True), ("10.1.200.1", True), ("10.2.0.1", False),
+        ("10.9.9.1", True), ("10.9.10.1", False),
+        ("172.31.255.255", True), ("172.32.0.0", False), ("172.15.255.255", False),
+    ])
+    print("  [+] Overlapping prefixes and non-aligned networks")
+
+    check(["0.0.0.0/0"], [("1.2.3.4", True), ("255.255.255.255", True), ("2001:db8::1", False)])
+    check(["::/0"], [("2001:db8::1", True), ("::1", True), ("1.2.3.4", False)])
+    print("  [+] /0 matches its whole family, and only it")
+
+    check(["2001:db8::/32", "fe80::1", "2001:DB8:FFFF::7"], [
+        ("2001:db8:1::1", True), ("2001:db9::1", False), ("fe80::1", True), ("fe80::2", False),
+        ("2001:db8:ffff::7", True), # Written uppercase in the file: stored canonical
+        ("10.0.0.1", False),
+    ])
+    print("  [+] IPv6 networks and addresses")
+
+    index = check(["DNS_Server", "  10.0.0.1  ", "", "not/an/ip", "10.0.0.0/33", "192.168.0.0/16"], [
+        ("DNS_Server", True), ("10.0.0.1", True), ("not/an/ip", True),
+        ("dns_server", False), ("garbage", False), ("", False), ("192.168.3.4", True),
+    ])
+    assert len(index) == 5 and list(index)[1] == "10.0.0.1", list(index) # Blank entry dropped, others kept
+    print("  [+] Names and malformed entries: exact match only, never an error")
+
+def check_random():
+    print("[*] Random lookups against the ipaddress module...")
+    rng = random.Random(9)
+    entries = [f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}" for _ in range(300)]
+    entries += [f"10.{rng.randrange(256)}.{rng.randrange(256)}.0/{rng.choice((20, 24, 28))}" for _ in range(30)]
+    entries += [f"2001:db8:{rng.randrange(65536):x}::/48" for _ in range(10)]
+    index = IPIndex(entries)
+    ips = [f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}" for _ in range(3000)]
+    ips += [f"2001:db8:{rng.randrange(65536):x}::{rng.randrange(65536):x}" for _ in range(300)]
+    ips += rng.sample(entries[:300], 50)
+    mismatches = [ip for ip in ips if (ip in index) != reference(entries, ip)]
+    assert not mismatches, mismatches[:5]
+    print(f"  [+] {len(ips)} lookups, {sum(ip in index for ip in ips)} matches, same answers")
+
+def check_file():
+    print("[*] IPListFile reloads...")
+    path = os.path.join(tempfile.mkdtemp(prefix="ids-index-"), "firewall_rules.json")
+    source = IPListFile(path, lambda data: data.get("blocklist", []))
+    assert not source.refresh() and "1.1.1.1" not in source.index # Missing file
+    with open(path, "w") as f:
+        json.dump({"blocklist": ["1.1.1.1", "10.0.0.0/8"]}, f)
+    assert source.refresh() and "10.20.30.40" in source.index
+    assert not source.refresh() # Unchanged: no rebuild
+    time.sleep(0.01)
+    with open(path, "w") as f:
+        f.write('{"blocklist": ["2.2.2.2"') # Half-written
+    assert not source.refresh() and "1.1.1.1" in source.index # Old index kept
+    with open(path, "w") as f:
+        json.dump({"blocklist": ["2.2.2.2"]}, f)
+    assert source.refresh() and "2.2.2.2" in source.index and "1.1.1.1" not in source.index
+    assert source.reloads == 2
+    print("  [+] Rebuilt on change only, half-written file ignored")
+
+if __name__ == "__main__":
+    print("=== IP Index Verification ===")
+    check_entries()
+    check_random()
+    check_file()
+    print("\n[+] All IP index checks passed.")
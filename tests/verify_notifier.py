@@ -0,0 +1,117 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.notifier import Notifier
+
+# Runs the notifier against a local stub of the Telegram API (no network):
+# the stub is slow, fails now and then and counts what it receives.
+
+class StubTelegram(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, to see the session reuse its connection
+    delay = 0.0
+    fail_next = 0
+    received = []
+    connections = set()
+
+    def do_POST(self):
+        StubTelegram.connections.add(self.client_address)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(StubTelegram.delay)
+        if StubTelegram.fail_next > 0:
+            StubTelegram.fail_next -= 1
+            status, reply = 500, b'{"ok": false}'
+        else:
+            StubTelegram.received.append(body)
+            status, reply = 200, b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+def make_notifier(port, **config):
+    path = os.path.join(tempfile.mkdtemp(), "notifications.json")
+    with open(path, "w") as f:
+        json.dump(dict(enabled_platform="telegram", tg_bot_token="TOKEN", tg_chat_id="42",
+                       api_base=f"http://127.0.0.1:{port}", **config), f)
+    return Notifier(config_file=path)
+
+def reset(delay=0.0, fail_next=0):
+    StubTelegram.delay = delay
+    StubTelegram.fail_next = fail_next
+    StubTelegram.received = []
+    StubTelegram.connections = set()
+
+def check_non_blocking(port):
+    print("[*] Slow endpoint (2s per request)...")
+    reset(delay=2.0)
+    notifier = make_notifier(port)
+    start = time.perf_counter()
+    for i in range(5):
+        notifier.send_notification("SYN Flood", f"10.0.0.{i}", "2024-01-01 00:00:00")
+    elapsed = time.perf_counter() - start
+    print(f"  [+] 5 notifications queued in {elapsed * 1000:.2f} ms")
+    assert elapsed < 0.1, "send_notification blocked the caller"
+    notifier.close(timeout=30)
+    assert len(StubTelegram.received) == 5, StubTelegram.received
+    print(f"  [+] {len(StubTelegram.received)} delivered over {len(StubTelegram.connections)} connection(s)")
+
+def check_retry(port):
+    print("[*] Endpoint failing twice...")
+    reset(fail_next=2)
+    notifier = make_notifier(port)
+    notifier.send_notification("Port Scan", "10.0.0.9", "2024-01-01 00:00:00")
+    deadline = time.time() + 10
+    while not StubTelegram.received and time.time() < deadline:
+        time.sleep(0.1)
+    stats = notifier.stats()
+    notifier.close()
+    print(f"  [+] {stats}")
+    assert len(StubTelegram.received) == 1 and stats["retried"] == 2
+
+def check_digest(port):
+    print("[*] Burst of 30 alerts in digest mode (1s window)...")
+    reset()
+    notifier = make_notifier(port, digest_window=1)
+    for i in range(30):
+        notifier.send_notification("Brute Force", f"10.0.1.{i}", "2024-01-01 00:00:00")
+    notifier.close()
+    print(f"  [+] {len(StubTelegram.received)} message(s): {notifier.stats()}")
+    assert len(StubTelegram.received) == 1
+    assert "30 new" in StubTelegram.received[0]["text"]
+
+def check_rate_limit(port):
+    print("[*] Burst of 12 alerts without digest (5 burst, 1 msg/s)...")
+    reset()
+    notifier = make_notifier(port)
+    start = time.perf_counter()
+    for i in range(12):
+        notifier.send_notification("ARP Spoofing", f"10.0.2.{i}", "2024-01-01 00:00:00")
+    while len(StubTelegram.received) < 12 and time.perf_counter() - start < 20:
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    notifier.close()
+    print(f"  [+] 12 delivered in {elapsed:.1f}s")
+    assert len(StubTelegram.received) == 12 and elapsed >= 6
+
+if __name__ == "__main__":
+    print("=== Notification Dispatcher Verification ===")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTelegram)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    try:
+        check_non_blocking(port)
+        check_retry(port)
+        check_digest(port)
+        check_rate_limit(port)
+    finally:
+        server.shutdown()
+    print("\n[+] All notifier checks passed.")
@@ -98,42 +98,57 @@ def main(page: ft.Page):
     page.add(layout)
     
     # --- Auto-Refresh ---
-    from utils.data_handler import get_alerts, get_attacks
-    page.last_alert_count = len(get_alerts())
-    page.last_attack_count = len(get_attacks())
+    # Alerts are pushed live by the IDS (utils/event_client.py); when it is not
+    # reachable we fall back to polling the log, which only reads new alerts.
+    from utils.data_handler import get_alerts, get_feed, poll_new_alerts, resync_alerts
+    from utils.event_client import EventClient
+    get_alerts() # Loads the recent alerts once
+
+    pending = []
+    pending_lock = threading.Lock()
+    wake = threading.Event()
+
+    def queue_alerts(alerts):
+        if alerts:
+            with pending_lock:
+                pending.extend(alerts)
+            wake.set()
+
+    def on_events(events):
+        queue_alerts(get_feed().add([data for kind, data in events if kind == "alert"]))
+
+    events = EventClient(on_events, on_resync=lambda: queue_alerts(resync_alerts())).start()
 
     def update_data():
+        was_connected = False
         while True:
             try:
-                # 1. Fetch current data counts
-                current_alerts = get_alerts()
-                current_attacks = get_attacks()
-                
-                alert_count = len(current_alerts)
-                attack_count = len(current_attacks)
-                
-                has_new_data = False
-                
+                # 1. Wait for pushed alerts, or poll the log if the IDS channel is down
+                wake.wait(5)
+                wake.clear()
+                if not events.connected:
+                    # Just lost the channel: our place in the log is stale, jump to its end
+                    queue_alerts(resync_alerts() if was_connected else poll_new_alerts())
+                was_connected = events.connected
+                with pending_lock:
+                    new_alerts = pending[:]
+                    pending.clear()
+
                 # 2. Handle Notifications (New Alerts)
-                if alert_count > page.last_alert_count:
-                    new_alert = current_alerts[0] # newest first
+                if new_alerts:
+                    new_alert = new_alerts[-1] # oldest first, so the last one is the newest
                     page.snack_bar = ft.SnackBar(
                         content=ft.Text(f"🚨 New Threat: {new_alert.get('type')} from {new_alert.get('src_ip')}"),
                         bgcolor=ft.Colors.RED_700
                     )
                     page.snack_bar.open = True
-                    page.last_alert_count = alert_count
-                    has_new_data = True
-                
-                # Check if attacks increased
-                if attack_count > page.last_attack_count:
-                    page.last_attack_count = attack_count
-                    has_new_data = True
-
-                # 3. Only refresh UI if there is new data & not on Firewall page (index 3 now)
-                if has_new_data:
-                    if rail.selected_index != 3:
-                        # Refresh current view
+
+                    # 3. Only refresh UI if not on Firewall page (index 3 now)
+                    view = content_container.content
+                    if rail.selected_index != 3 and getattr(view, "apply_update", None) and view.apply_update(new_alerts):
+                        page.update() # Sends only the new rows and changed tiles
+                    elif rail.selected_index != 3:
+                        # No incremental update possible (e.g. "no alerts" placeholder): rebuild
                         if rail.selected_index == 0:
                             content_container.content = HomeView(page, change_view)
                         elif rail.selected_index == 1:
@@ -145,8 +160,8 @@ def main(page: ft.Page):
                         page.update() # Just update notifications bar
             except Exception as e:
                 print(f"Update error: {e}")
-            
-            time.sleep(5)
+
+            time.sleep(0.3) # Groups the alerts of a burst into one refresh
 
     threading.Thread(target=update_data, daemon=True).start()
 
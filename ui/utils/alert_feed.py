@@ -0,0 +1,280 @@
+import json
+import os
+import threading
+from collections import Counter, deque
+
+from core.alert_store import read_backend, segment_paths, tail_alerts
+from core.sqlite_store import SQLiteAlertStore
+
+# Incremental reader of the alert log for the dashboard.
+# The feed remembers where it stopped (inode + byte offset of the active JSONL
+# segment, or the last row id with SQLite) and each poll only reads what was
+# appended since. Recent alerts are kept in one shared ring that every view
+# reads, so a refresh costs as much as the new data, not the whole history.
+
+
+class AlertFeed:
+    def __init__(self, log_dir, limit=500, name="attacks", sqlite_file=None, legacy_file=None):
+        self.log_dir = log_dir
+        self.active = os.path.join(log_dir, f"{name}.jsonl")
+        self.name = name
+        self.sqlite_file = sqlite_file
+        self.legacy_file = legacy_file
+        self.recent = deque(maxlen=limit) # Oldest first, like the log
+        self._uids = set() # uid of the alerts in `recent`: the same alert may come live and from disk
+        # Aggregates over `recent`, kept up to date as alerts come and go
+        self._ip_counts = Counter()
+        self._type_counts = Counter()
+        self._count_values = Counter() # "count" field -> how many alerts have it (for the max)
+        self._critical = 0
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._source = None   # "sqlite", "jsonl" or "legacy"
+        self._store = None
+        self._last_id = 0     # SQLite: last row read
+        self._inode = None    # JSONL: active segment being followed...
+        self._offset = 0      # ...and how far we read it
+        self._legacy_mtime = None
+
+    def pick_source(self):
+        """Where the alerts are read from: the store the IDS was started with
+        (or, without that record, the one written last), then the legacy file."""
+        backend = read_backend(self.log_dir) or self._latest_store()
+        if backend == "sqlite" and self.sqlite_file and os.path.exists(self.sqlite_file):
+            return "sqlite"
+        if segment_paths(self.log_dir, self.name) or not (self.legacy_file and os.path.exists(self.legacy_file)):
+            return "jsonl"
+        return "legacy"
+
+    def _latest_store(self):
+        if not self.sqlite_file:
+            return "jsonl"
+        sqlite = max((_mtime(path) for path in (self.sqlite_file, f"{self.sqlite_file}-wal")), default=0)
+        segments = segment_paths(self.log_dir, self.name)
+        return "sqlite" if sqlite > (_mtime(segments[-1]) if segments else 0) else "jsonl"
+
+    def poll(self):
+        """Reads the alerts appended since the last call. Returns them (oldest
+        first); they are also added to `recent`."""
+        with self._lock:
+            source = self.pick_source()
+            if source != self._source:
+                self._source = source
+                self._clear()
+                return self._start()
+            if source == "legacy":
+                return self._poll_legacy() # Replaces `recent` itself
+            return self._add(self._poll_sqlite() if source == "sqlite" else self._poll_jsonl())
+
+    def resync(self):
+        """Reloads the last `limit` alerts and follows the log from its end
+        (after alerts came from elsewhere for a while, the saved position is
+        stale). Returns the alerts that were not known yet."""
+        with self._lock:
+            known = set(self._uids)
+            self._source = self.pick_source()
+            self._clear()
+            alerts = self._start()
+            return [a for a in alerts if a.get("uid") is None or a.get("uid") not in known]
+
+    def add(self, alerts):
+        """Adds alerts received from elsewhere (live channel). Returns the ones
+        not already known."""
+        with self._lock:
+            return self._add(alerts)
+
+    def _add(self, alerts):
+        new = []
+        for alert in alerts:
+            uid = alert.get("uid")
+            if uid is not None and uid in self._uids:
+                continue
+            if len(self.recent) == self.recent.maxlen:
+                self._forget(self.recent[0]) # About to fall out of the ring
+            if uid is not None:
+                self._uids.add(uid)
+            self.recent.append(alert)
+            self._count(alert, 1)
+            new.append(alert)
+        return new
+
+    def ensure_loaded(self):
+        """Does the first read if nobody polled yet."""
+        if self._source is None:
+            self.poll()
+
+    def snapshot(self):
+        """Copy of the recent alerts, oldest first."""
+        with self._lock:
+            return list(self.recent)
+
+    def _start(self):
+        """First read of a source: the last `limit` alerts, then follow from there."""
+        if self._source == "sqlite":
+            if self._store is None:
+                self._store = SQLiteAlertStore(self.sqlite_file, readonly=True)
+            alerts = self._store.tail(self.limit)
+            self._last_id = alerts[-1]["id"] if alerts else 0
+        elif self._source == "jsonl":
+            try:
+                with open(self.active, "rb") as f:
+                    self._inode = os.fstat(f.fileno()).st_ino
+                    self._offset = _complete_end(f)
+            except OSError:
+                self._inode, self._offset = None, 0
+            alerts = tail_alerts(self.log_dir, self.limit, self.name, active_end=self._offset)
+        else:
+            alerts = self._read_legacy()
+        return self._add(alerts)
+
+    def _clear(self):
+        self.recent.clear()
+        self._uids.clear()
+        self._ip_counts.clear()
+        self._type_counts.clear()
+        self._count_values.clear()
+        self._critical = 0
+
+    def _forget(self, alert):
+        self._uids.discard(alert.get("uid"))
+        self._count(alert, -1)
+
+    def _count(self, alert, delta):
+        for counter, key in ((self._ip_counts, alert.get("src_ip")), (self._type_counts, alert.get("type")),
+                             (self._count_values, alert.get("count", 1))):
+            counter[key] += delta
+            if counter[key] <= 0:
+                del counter[key]
+        if is_critical(alert):
+            self._critical += delta
+
+    def stats(self):
+        """Same aggregates as SQLiteAlertStore.stats(), over the recent alerts."""
+        with self._lock:
+            return {
+                "total": len(self.recent),
+                "unique_ips": len(self._ip_counts),
+                "max_count": max(self._count_values, default=0),
+                "critical": self._critical,
+            }
+
+    def types(self):
+        """Attack types of the recent alerts, most frequent first."""
+        with self._lock:
+            return [t for t, _ in self._type_counts.most_common()]
+
+    # --- SQLite: rows are numbered, we ask for the ones after the last seen ---
+    def _poll_sqlite(self):
+        new = self._store.since(self._last_id, self.limit)
+        if new:
+            self._last_id = new[-1]["id"]
+        return new
+
+    # --- JSONL: read the active segment from our offset, follow rotations ---
+    def _poll_jsonl(self):
+        try:
+            st = os.stat(self.active)
+        except OSError:
+            st = None # Between the rename and the first write of the new segment
+        new = []
+        if self._inode is not None and (st is None or st.st_ino != self._inode):
+            # The segment we were reading was rotated: finish it under its new name
+            old = self._find_rotated(self._inode)
+            if old is not None:
+                new += self._read_from(old)
+            self._inode, self._offset = None, 0
+        if st is None:
+            return new
+        if self._inode is None:
+            self._inode, self._offset = st.st_ino, 0
+        if st.st_size < self._offset:
+            self._offset = 0 # File replaced or truncated: start over
+        if st.st_size > self._offset:
+            new += self._read_from(self.active)
+        return new
+
+    def _find_rotated(self, inode):
+        for path in reversed(segment_paths(self.log_dir, self.name)[:-1]):
+            try:
+                if os.stat(path).st_ino == inode:
+                    return path
+            except OSError:
+                pass
+        return None
+
+    def _read_from(self, path):
+        """Complete lines of `path` after our offset (a half-written last line
+        is left for the next poll)."""
+        with open(path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        alerts = []
+        for line in data[:end].splitlines():
+            try:
+                alerts.append(json.loads(line))
+            except ValueError:
+                pass
+        return alerts
+
+    # --- Old attacks.json (rewritten as a whole): re-read only when it changes ---
+    def _read_legacy(self):
+        try:
+            self._legacy_mtime = os.stat(self.legacy_file).st_mtime_ns
+            with open(self.legacy_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data[-self.limit:] if isinstance(data, list) else []
+        except (OSError, ValueError):
+            return []
+
+    def _poll_legacy(self):
+        try:
+            mtime = os.stat(self.legacy_file).st_mtime_ns
+        except OSError:
+            return []
+        if mtime == self._legacy_mtime:
+            return []
+        old = list(self.recent)
+        alerts = self._read_legacy()
+        self._clear()
+        self._add(alerts)
+        # The file is capped, so compare contents rather than lengths
+        return alerts[_common_prefix_end(old, alerts):]
+
+
+def is_critical(alert):
+    return "BLOCK" in (alert.get("description") or "") or "Flood" in (alert.get("type") or "")
+
+
+def _complete_end(f, block=4096):
+    """Offset just after the last complete line of an open binary file."""
+    f.seek(0, os.SEEK_END)
+    pos = f.tell()
+    while pos > 0:
+        step = min(block, pos)
+        f.seek(pos - step)
+        data = f.read(step)
+        nl = data.rfind(b"\n")
+        if nl != -1:
+            return pos - step + nl + 1
+        pos -= step
+    return 0
+
+
+def _common_prefix_end(old, new):
+    """Index in `new` right after the last entry it shares with `old`."""
+    if not old:
+        return 0
+    last = old[-1]
+    for i in range(len(new) - 1, -1, -1):
+        if new[i] == last:
+            return i + 1
+    return 0
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
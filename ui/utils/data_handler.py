@@ -1,12 +1,26 @@
 import json
 import os
+import sys
 
 # Calculate project root (3 levels up from this file: ui/utils/data_handler.py)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
 
-ALERTS_FILE = os.path.join(LOG_DIR, "attacks.json")
-ATTACKS_FILE = os.path.join(LOG_DIR, "attacks.json")
+from core.alert_store import tail_alerts, segment_paths
+from core.sqlite_store import SQLiteAlertStore, entry_time
+from core.rules_file import read_rules, update_rules
+from utils.alert_feed import AlertFeed, is_critical
+
+# How many recent alerts the dashboard shows
+RECENT_LIMIT = 500
+
+LEGACY_ALERTS_FILE = os.path.join(LOG_DIR, "attacks.json") # Before the JSONL store
+SQLITE_FILE = os.path.join(LOG_DIR, "alerts.db")            # IDS started with --backend sqlite
+
+_sqlite = None
+_feed = None
 FIREWALL_FILE = os.path.join(LOG_DIR, "firewall_rules.json")
 
 def read_json_file(filepath):
@@ -24,27 +38,138 @@ def read_json_file(filepath):
         print(f"Error reading {filepath}: {e}")
         return []
 
+def get_sqlite_store():
+    """Read-only SQLite store if the IDS writes to one, else None."""
+    global _sqlite
+    if get_feed().pick_source() != "sqlite":
+        return None # Possibly a stale alerts.db: the IDS went back to JSONL
+    if _sqlite is None:
+        try:
+            _sqlite = SQLiteAlertStore(SQLITE_FILE, readonly=True)
+        except Exception as e:
+            print(f"Error opening {SQLITE_FILE}: {e}")
+    return _sqlite
+
+def read_recent_alerts(limit=RECENT_LIMIT):
+    """Last `limit` alerts (oldest first), read from the end of the alert log."""
+    store = get_sqlite_store()
+    if store is not None:
+        return store.tail(limit)
+    if segment_paths(LOG_DIR):
+        return tail_alerts(LOG_DIR, limit)
+    return read_json_file(LEGACY_ALERTS_FILE)[-limit:]
+
+def get_feed():
+    """The dashboard's shared feed of recent alerts (one per process)."""
+    global _feed
+    if _feed is None:
+        _feed = AlertFeed(LOG_DIR, RECENT_LIMIT, sqlite_file=SQLITE_FILE, legacy_file=LEGACY_ALERTS_FILE)
+    return _feed
+
+def poll_new_alerts():
+    """Alerts logged since the previous call (oldest first), read incrementally."""
+    return get_feed().poll()
+
+def resync_alerts():
+    """Re-reads the end of the log after live updates; returns the alerts missed."""
+    return get_feed().resync()
+
+def alert_matches(alert, src_ip=None, attack_type=None, start=None, end=None):
+    """True if the alert passes the dashboard filters."""
+    return ((not src_ip or alert.get("src_ip") == src_ip)
+            and (not attack_type or alert.get("type") == attack_type)
+            and (start is None or entry_time(alert) >= start)
+            and (end is None or entry_time(alert) < end))
+
+def query_alerts(src_ip=None, attack_type=None, start=None, end=None, limit=100, offset=0,
+                 newest_first=True):
+    """Filtered page of alerts. Uses the SQLite indexes when available,
+    otherwise filters the recent alerts in memory."""
+    store = get_sqlite_store()
+    if store is not None:
+        return store.query(start=start, end=end, src_ip=src_ip, attack_type=attack_type,
+                           limit=limit, offset=offset, newest_first=newest_first)
+    alerts = get_alerts()
+    if newest_first:
+        alerts.reverse()
+    alerts = [a for a in alerts if alert_matches(a, src_ip, attack_type, start, end)]
+    return alerts[offset:offset + limit]
+
+def count_alerts(src_ip=None, attack_type=None, start=None, end=None):
+    """Number of alerts matching the filters (for the page count)."""
+    store = get_sqlite_store()
+    if store is not None:
+        return store.count(start=start, end=end, src_ip=src_ip, attack_type=attack_type)
+    if not (src_ip or attack_type or start is not None or end is not None):
+        return get_alert_stats()["total"]
+    return sum(1 for a in get_alerts() if alert_matches(a, src_ip, attack_type, start, end))
+
+def get_attack_types():
+    """Attack types seen, most frequent first (filter choices)."""
+    store = get_sqlite_store()
+    if store is not None:
+        return [t for t, _ in store.count_by("type") if t]
+    get_feed().ensure_loaded()
+    return [t for t in get_feed().types() if t]
+
+def compute_stats(alerts):
+    """Same aggregates as SQLiteAlertStore.stats(), from a list of alerts."""
+    return {
+        "total": len(alerts),
+        "unique_ips": len(set(a.get("src_ip") for a in alerts)),
+        "max_count": max((a.get("count", 1) for a in alerts), default=0),
+        "critical": sum(1 for a in alerts if is_critical(a)),
+    }
+
+def get_alert_stats():
+    """Dashboard tiles: total, unique source IPs, peak count, critical alerts.
+    Precomputed: SQL aggregates, or the counters kept by the feed."""
+    store = get_sqlite_store()
+    if store is not None:
+        return store.stats()
+    feed = get_feed()
+    feed.ensure_loaded()
+    return feed.stats()
+
 def get_alerts():
-    return read_json_file(ALERTS_FILE)
+    """Recent alerts (oldest first) from the shared ring, after reading what is new."""
+    feed = get_feed()
+    feed.ensure_loaded() # First use: loads the last RECENT_LIMIT alerts
+    return feed.snapshot()
 
 def get_attacks():
-    return read_json_file(ATTACKS_FILE)
+    return get_alerts()
 
 def get_firewall_rules():
-    if not os.path.exists(FIREWALL_FILE):
-        return {"blocklist": [], "whitelist": []}
-    
-    try:
-        with open(FIREWALL_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return {"blocklist": [], "whitelist": []}
+    return read_rules(FIREWALL_FILE)
 
-def save_firewall_rules(rules):
+def update_firewall_rules(change):
+    """Applies change(rules) to the rules file as it is now, under the lock
+    shared with the IDS (see core/rules_file.py). Returns the new rules, or
+    None if the file could not be written."""
     try:
-        with open(FIREWALL_FILE, "w", encoding="utf-8") as f:
-            json.dump(rules, f, indent=4)
-        return True
+        return update_rules(FIREWALL_FILE, change)
     except Exception as e:
         print(f"Error saving firewall rules: {e}")
-        return False
+        return None
+
+def add_firewall_rule(list_name, ip):
+    """Adds one IP to the "blocklist" or "whitelist"."""
+    def change(rules):
+        if ip not in rules[list_name]:
+            rules[list_name].append(ip)
+    return update_firewall_rules(change)
+
+def remove_firewall_rule(list_name, ip):
+    """Removes one IP from the "blocklist" or "whitelist"."""
+    def change(rules):
+        rules[list_name] = [x for x in rules[list_name] if x != ip]
+    return update_firewall_rules(change)
+
+def save_firewall_rules(rules):
+    """Replaces the whole file. Prefer add/remove_firewall_rule(), which never
+    drop a change made meanwhile by the IDS."""
+    def change(current):
+        current.clear()
+        current.update(rules)
+    return update_firewall_rules(change) is not None
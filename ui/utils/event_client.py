@@ -0,0 +1,107 @@
+import json
+import socket
+import threading
+import time
+
+from core.event_bus import EVENT_HOST, EVENT_PORT
+
+RESYNC_EVENTS = 100 # Events replayed after a (re)sync from disk; duplicates are dropped by uid
+
+# Dashboard side of the live event channel (see core/event_bus.py).
+# A background thread stays connected to the IDS, reconnects with backoff
+# when it goes away and asks for the events it missed by sequence number.
+# While `connected` is False the dashboard falls back to polling the log.
+
+
+class EventClient:
+    def __init__(self, on_events, on_resync=None, host=EVENT_HOST, port=EVENT_PORT,
+                 min_backoff=1.0, max_backoff=10.0):
+        self.on_events = on_events   # Called with a list of (kind, data), oldest first
+        self.on_resync = on_resync   # Called when missed events can't be replayed: re-read the log
+        self.host = host
+        self.port = port
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.connected = False
+        self.session = None
+        self.last_seq = None
+        self._stop = threading.Event()
+        self._sock = None
+        self._thread = None
+
+        # Counters
+        self.received = 0
+        self.reconnects = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="event-client", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        backoff = self.min_backoff
+        while not self._stop.is_set():
+            try:
+                self._session()
+                backoff = self.min_backoff # Was connected: retry quickly
+            except (OSError, ValueError):
+                pass
+            self.connected = False
+            if self._stop.wait(backoff):
+                break
+            backoff = min(self.max_backoff, backoff * 2)
+            self.reconnects += 1
+
+    def _session(self):
+        with socket.create_connection((self.host, self.port), timeout=2) as sock:
+            self._sock = sock
+            sock.settimeout(None)
+            buf = b""
+            while b"\n" not in buf:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    return
+                buf += chunk
+            line, buf = buf.split(b"\n", 1)
+            hello = json.loads(line)
+
+            if hello.get("session") == self.session and self.last_seq is not None:
+                since = self.last_seq # Same IDS run: replay what we missed
+            else:
+                # First connection or IDS restarted: what we missed is on disk, except
+                # alerts still in the IDS write queue, hence the few last events replayed
+                if self.on_resync is not None:
+                    self.on_resync()
+                since = max(0, hello.get("seq", 0) - RESYNC_EVENTS)
+            self.session = hello.get("session")
+            self.last_seq = since
+            sock.sendall((json.dumps({"since": since}) + "\n").encode())
+            self.connected = True
+
+            while not self._stop.is_set():
+                # Every complete line received so far is delivered as one batch
+                *lines, buf = buf.split(b"\n")
+                batch = []
+                for line in lines:
+                    event = json.loads(line)
+                    if event.get("kind") == "gap":
+                        if self.on_resync is not None:
+                            self.on_resync()
+                        continue
+                    self.last_seq = event.get("seq", self.last_seq)
+                    batch.append((event.get("kind"), event.get("data")))
+                if batch:
+                    self.received += len(batch)
+                    self.on_events(batch)
+                chunk = sock.recv(65536)
+                if not chunk:
+                    return # IDS stopped
+                buf += chunk
+
+    def close(self):
+        self._stop.set()
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
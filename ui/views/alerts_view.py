@@ -1,42 +1,37 @@
+import time
 import flet as ft
-from utils.data_handler import get_alerts
+from utils.data_handler import (get_alert_stats, query_alerts, count_alerts, get_attack_types,
+                                alert_matches)
+
+PAGE_SIZE = 50 # Rows per page: only these are built and sent to the client
+
+# Time range choice -> seconds back from now (None = everything)
+TIME_RANGES = {"All time": None, "Last hour": 3600, "Last 24 hours": 86400, "Last 7 days": 7 * 86400}
+ALL_TYPES = "All types"
+
+def alert_row(alert):
+    # Determine color based on severity (simple keyword matching)
+    c = ft.Colors.WHITE
+    if "BLOCK" in alert.get('description', '') or "Flood" in alert.get('type', ''):
+        c = ft.Colors.RED_200
+    elif "Scan" in alert.get('type', ''):
+        c = ft.Colors.ORANGE_200
+
+    return ft.DataRow(
+        cells=[
+            ft.DataCell(ft.Text(alert.get('timestamp') or alert.get('logged_at') or 'N/A', color=c)),
+            ft.DataCell(ft.Text(alert.get('src_ip', 'N/A'), color=c, weight=ft.FontWeight.BOLD)),
+            ft.DataCell(ft.Text(alert.get('type', 'Unknown'), color=c)),
+            ft.DataCell(ft.Text(alert.get('description', '-'), color=c, size=12, overflow=ft.TextOverflow.ELLIPSIS)),
+        ]
+    )
 
 def AlertsView(page: ft.Page):
     # Fetch Data
-    alerts = get_alerts()
-    alerts.reverse() # Show newest first
-    
-    # Define Columns
-    columns = [
-        ft.DataColumn(ft.Text("Timestamp")),
-        ft.DataColumn(ft.Text("Source IP")),
-        ft.DataColumn(ft.Text("Type")),
-        ft.DataColumn(ft.Text("Description"), numeric=False),
-    ]
-    
-    # Create Rows
-    rows = []
-    for alert in alerts:
-        # Determine color based on severity (simple keyword matching)
-        c = ft.Colors.WHITE
-        if "BLOCK" in alert.get('description', '') or "Flood" in alert.get('type', ''):
-            c = ft.Colors.RED_200
-        elif "Scan" in alert.get('type', ''):
-            c = ft.Colors.ORANGE_200
-            
-        rows.append(
-            ft.DataRow(
-                cells=[
-                    ft.DataCell(ft.Text(alert.get('timestamp') or alert.get('logged_at') or 'N/A', color=c)),
-                    ft.DataCell(ft.Text(alert.get('src_ip', 'N/A'), color=c, weight=ft.FontWeight.BOLD)),
-                    ft.DataCell(ft.Text(alert.get('type', 'Unknown'), color=c)),
-                    ft.DataCell(ft.Text(alert.get('description', '-'), color=c, size=12, overflow=ft.TextOverflow.ELLIPSIS)),
-                ]
-            )
-        )
-        
+    stats = get_alert_stats() # Precomputed aggregates (SQL when available)
+
     # If no data
-    if not rows:
+    if not stats["total"]:
         return ft.Column([
             ft.Text("Alerts Dashboard", size=30, weight=ft.FontWeight.BOLD),
             ft.Container(
@@ -46,10 +41,18 @@ def AlertsView(page: ft.Page):
             )
         ], expand=True)
 
+    # Define Columns
+    columns = [
+        ft.DataColumn(ft.Text("Timestamp")),
+        ft.DataColumn(ft.Text("Source IP")),
+        ft.DataColumn(ft.Text("Type")),
+        ft.DataColumn(ft.Text("Description"), numeric=False),
+    ]
+
     # Table Container with Scroll
     table = ft.DataTable(
         columns=columns,
-        rows=rows,
+        rows=[],
         border=ft.border.all(1, ft.Colors.GREY_800),
         vertical_lines=ft.border.BorderSide(1, ft.Colors.GREY_800),
         horizontal_lines=ft.border.BorderSide(1, ft.Colors.GREY_800),
@@ -57,8 +60,72 @@ def AlertsView(page: ft.Page):
         heading_text_style=ft.TextStyle(weight=ft.FontWeight.BOLD, color=ft.Colors.CYAN_200),
         column_spacing=20,
     )
-    
-    return ft.Column(
+
+    # Paging state: filtering and paging are done by the data layer
+    # (SQL LIMIT/OFFSET when available), the table only holds one page
+    state = {"page": 0, "total": 0}
+
+    ip_filter = ft.TextField(label="Source IP", width=180, dense=True, on_submit=lambda e: reload(0))
+    type_filter = ft.Dropdown(
+        label="Type", width=220, dense=True, value=ALL_TYPES,
+        options=[ft.dropdown.Option(ALL_TYPES)] + [ft.dropdown.Option(t) for t in get_attack_types()],
+        on_change=lambda e: reload(0),
+    )
+    range_filter = ft.Dropdown(
+        label="Time range", width=170, dense=True, value="All time",
+        options=[ft.dropdown.Option(r) for r in TIME_RANGES],
+        on_change=lambda e: reload(0),
+    )
+    order_filter = ft.Dropdown(
+        label="Order", width=160, dense=True, value="Newest first",
+        options=[ft.dropdown.Option("Newest first"), ft.dropdown.Option("Oldest first")],
+        on_change=lambda e: reload(0),
+    )
+    page_text = ft.Text("", size=12, color=ft.Colors.GREY_400)
+    prev_button = ft.IconButton(ft.Icons.CHEVRON_LEFT, on_click=lambda e: reload(state["page"] - 1))
+    next_button = ft.IconButton(ft.Icons.CHEVRON_RIGHT, on_click=lambda e: reload(state["page"] + 1))
+    no_match_text = ft.Text("No alerts match the filters.", color=ft.Colors.GREY_500, visible=False)
+
+    def current_filters():
+        seconds = TIME_RANGES.get(range_filter.value)
+        return {
+            "src_ip": (ip_filter.value or "").strip() or None,
+            "attack_type": None if type_filter.value in (None, ALL_TYPES) else type_filter.value,
+            "start": time.time() - seconds if seconds else None,
+        }
+
+    def newest_first():
+        return order_filter.value != "Oldest first"
+
+    def update_pager():
+        pages = max(1, -(-state["total"] // PAGE_SIZE))
+        page_text.value = f"Page {state['page'] + 1} / {pages}  ({state['total']} alerts)"
+        prev_button.disabled = state["page"] == 0
+        next_button.disabled = state["page"] >= pages - 1
+        no_match_text.visible = not table.rows
+
+    def load(page_index):
+        filters = current_filters()
+        state["total"] = count_alerts(**filters)
+        pages = max(1, -(-state["total"] // PAGE_SIZE))
+        state["page"] = min(max(0, page_index), pages - 1)
+        table.rows = [alert_row(a) for a in query_alerts(**filters, limit=PAGE_SIZE,
+                                                           offset=state["page"] * PAGE_SIZE,
+                                                           newest_first=newest_first())]
+        update_pager()
+
+    def reload(page_index):
+        load(page_index)
+        page.update()
+
+    load(0)
+
+    # Stat values, kept to be updated in place
+    total_text = ft.Text(str(stats["total"]), size=20, weight=ft.FontWeight.BOLD)
+    critical_text = ft.Text(str(stats["critical"]), size=20, weight=ft.FontWeight.BOLD)
+    unique_text = ft.Text(str(stats["unique_ips"]), size=20, weight=ft.FontWeight.BOLD)
+
+    view = ft.Column(
         [
             ft.Row([
                 ft.Icon(ft.Icons.WARNING_ROUNDED, size=30, color=ft.Colors.ORANGE_400),
@@ -69,28 +136,34 @@ def AlertsView(page: ft.Page):
                 ft.Container(
                     content=ft.Column([
                         ft.Text("Total Logs", size=12, color=ft.Colors.CYAN_200),
-                        ft.Text(str(len(rows)), size=20, weight=ft.FontWeight.BOLD),
+                        total_text,
                     ]),
                     bgcolor=ft.Colors.GREY_900, padding=10, border_radius=10, expand=True
                 ),
                 ft.Container(
                     content=ft.Column([
                         ft.Text("Critical", size=12, color=ft.Colors.RED_200),
-                        ft.Text(str(sum(1 for r in alerts if "BLOCK" in r.get('description', '') or "Flood" in r.get('type', ''))), size=20, weight=ft.FontWeight.BOLD),
+                        critical_text,
                     ]),
                     bgcolor=ft.Colors.GREY_900, padding=10, border_radius=10, expand=True
                 ),
                 ft.Container(
                     content=ft.Column([
                         ft.Text("Unique IPs", size=12, color=ft.Colors.PURPLE_200),
-                        ft.Text(str(len(set(r.get('src_ip') for r in alerts))), size=20, weight=ft.FontWeight.BOLD),
+                        unique_text,
                     ]),
                     bgcolor=ft.Colors.GREY_900, padding=10, border_radius=10, expand=True
                 ),
             ], spacing=10),
             ft.Divider(),
+            # Filters and pager
+            ft.Row([
+                ip_filter, type_filter, range_filter, order_filter,
+                ft.Container(expand=True),
+                prev_button, page_text, next_button,
+            ], spacing=10, wrap=True),
             ft.Container(
-                content=ft.Column([table], scroll=ft.ScrollMode.ALWAYS),
+                content=ft.Column([table, no_match_text], scroll=ft.ScrollMode.ALWAYS),
                 expand=True,
                 bgcolor=ft.Colors.GREY_900,
                 border_radius=10,
@@ -99,3 +172,24 @@ def AlertsView(page: ft.Page):
         ],
         expand=True
     )
+
+    def apply_update(new_alerts):
+        """Refreshes the tiles and the pager in place. New alerts are only
+        inserted when the first page of the newest-first order is shown;
+        other pages keep their rows (the page count still moves)."""
+        filters = current_filters()
+        matching = [a for a in new_alerts if alert_matches(a, **filters)]
+        state["total"] = count_alerts(**filters)
+        if matching and state["page"] == 0 and newest_first():
+            for alert in matching[-PAGE_SIZE:]: # oldest first: each one goes above the previous
+                table.rows.insert(0, alert_row(alert))
+            del table.rows[PAGE_SIZE:] # Rows pushed to the next page
+        update_pager()
+        stats = get_alert_stats()
+        total_text.value = str(stats["total"])
+        critical_text.value = str(stats["critical"])
+        unique_text.value = str(stats["unique_ips"])
+        return True
+
+    view.apply_update = apply_update
+    return view
@@ -1,11 +1,14 @@
 import flet as ft
-from utils.data_handler import get_attacks, get_firewall_rules, save_firewall_rules
+from utils.data_handler import (get_alert_stats, get_firewall_rules, add_firewall_rule, remove_firewall_rule,
+                                query_alerts, count_alerts, get_attack_types, alert_matches)
 from core.firewall_manager import FirewallManager
 import json
 
+PAGE_SIZE = 24 # Cards per page
+ALL_TYPES = "All types"
+
 def AttacksView(page: ft.Page, nav):
-    attacks = get_attacks()
-    attacks.reverse()
+    stats = get_alert_stats()
     rules = get_firewall_rules()
     blocklist = rules.get("blocklist", [])
     
@@ -102,13 +105,11 @@ def AttacksView(page: ft.Page, nav):
             # Real Block (Windows)
             FirewallManager.block_ip(ip)
             
-            rules["blocklist"].append(ip)
-            save_firewall_rules(rules)
+            add_firewall_rule("blocklist", ip)
             page.snack_bar = ft.SnackBar(ft.Text(f"IP {ip} blocked & isolated!"), bgcolor=ft.Colors.RED_700)
             page.snack_bar.open = True
-            page.update()
-            # Refresh view to show Unblock button
-            nav(2) # Instant UI Refresh
+            # Refresh the current page to show Unblock button (keeps page and filters)
+            refresh_blocked()
         else:
             page.snack_bar = ft.SnackBar(ft.Text(f"IP {ip} is already blocked."))
             page.snack_bar.open = True
@@ -120,13 +121,11 @@ def AttacksView(page: ft.Page, nav):
             # Real Unblock (Windows)
             FirewallManager.unblock_ip(ip)
             
-            rules["blocklist"].remove(ip)
-            save_firewall_rules(rules)
+            remove_firewall_rule("blocklist", ip)
             page.snack_bar = ft.SnackBar(ft.Text(f"IP {ip} restored."), bgcolor=ft.Colors.GREEN_700)
             page.snack_bar.open = True
-            page.update()
             # Refresh
-            nav(2)
+            refresh_blocked()
         else:
             page.update()
 
@@ -136,7 +135,7 @@ def AttacksView(page: ft.Page, nav):
         ft.Text("Detected Attacks", size=30, weight=ft.FontWeight.BOLD),
     ])
 
-    if not attacks:
+    if not stats["total"]:
         return ft.Column([
             header,
             ft.Divider(),
@@ -157,7 +156,7 @@ def AttacksView(page: ft.Page, nav):
         run_spacing=10,
     )
 
-    for attack in attacks:
+    def attack_card(attack):
         src_ip = attack.get("src_ip", "Unknown")
         
         # Severity Color
@@ -173,52 +172,98 @@ def AttacksView(page: ft.Page, nav):
         # Actions logic
         is_blocked = src_ip in blocklist
 
-        grid.controls.append(
-            ft.Container(
-                content=ft.Column([
-                    ft.Row([
-                        # Icon Section
-                        ft.Container(
-                            content=ft.Icon(ft.Icons.SECURITY, color=ft.Colors.RED_200, size=40),
-                            padding=10,
-                            alignment=ft.Alignment(0, 0)
-                        ),
-                        # Info Section
-                        ft.Column([
-                            ft.Text(f"{attack.get('type', 'Unknown Attack').upper()}", weight=ft.FontWeight.BOLD, color=ft.Colors.RED_100),
-                            ft.Row([
-                               ft.Icon(ft.Icons.LANGUAGE, size=12, color=ft.Colors.CYAN_200),
-                               ft.Text(f"IP: {src_ip}", size=12, color=ft.Colors.GREY_400),
-                            ]),
-                            ft.Text(f"Count: {count} | Last: {attack.get('logged_at', '')}", size=10, color=ft.Colors.GREY_500),
-                        ], alignment=ft.MainAxisAlignment.CENTER, spacing=2, expand=True),
-                    ]),
-                    # Actions Section
-                    ft.Row([
-                        ft.TextButton(
-                            "Details", 
-                            icon=ft.Icons.INFO_OUTLINE,
-                            icon_color=ft.Colors.BLUE_400,
-                            on_click=lambda _, a=attack: show_details(a)
-                        ),
-                        ft.TextButton(
-                            "Unblock" if is_blocked else "Block IP", 
-                            icon=ft.Icons.SHIELD_OUTLINED if is_blocked else ft.Icons.BLOCK,
-                            icon_color=ft.Colors.GREEN_400 if is_blocked else ft.Colors.RED_400,
-                            on_click=lambda _, ip=src_ip, b=is_blocked: unblock_ip(ip) if b else block_ip(ip)
-                        ),
-                    ], alignment=ft.MainAxisAlignment.END, spacing=0)
-                ], tight=True),
-                bgcolor=card_color,
-                border=ft.border.all(1, border_color),
-                border_radius=10,
-                padding=10,
-                animate_scale=ft.Animation(300, ft.AnimationCurve.DECELERATE),
-                on_hover=lambda e: setattr(e.control, "scale", 1.02 if e.data == "true" else 1.0),
-            )
+        return ft.Container(
+            content=ft.Column([
+                ft.Row([
+                    # Icon Section
+                    ft.Container(
+                        content=ft.Icon(ft.Icons.SECURITY, color=ft.Colors.RED_200, size=40),
+                        padding=10,
+                        alignment=ft.Alignment(0, 0)
+                    ),
+                    # Info Section
+                    ft.Column([
+                        ft.Text(f"{attack.get('type', 'Unknown Attack').upper()}", weight=ft.FontWeight.BOLD, color=ft.Colors.RED_100),
+                        ft.Row([
+                           ft.Icon(ft.Icons.LANGUAGE, size=12, color=ft.Colors.CYAN_200),
+                           ft.Text(f"IP: {src_ip}", size=12, color=ft.Colors.GREY_400),
+                        ]),
+                        ft.Text(f"Count: {count} | Last: {attack.get('logged_at', '')}", size=10, color=ft.Colors.GREY_500),
+                    ], alignment=ft.MainAxisAlignment.CENTER, spacing=2, expand=True),
+                ]),
+                # Actions Section
+                ft.Row([
+                    ft.TextButton(
+                        "Details", 
+                        icon=ft.Icons.INFO_OUTLINE,
+                        icon_color=ft.Colors.BLUE_400,
+                        on_click=lambda _, a=attack: show_details(a)
+                    ),
+                    ft.TextButton(
+                        "Unblock" if is_blocked else "Block IP", 
+                        icon=ft.Icons.SHIELD_OUTLINED if is_blocked else ft.Icons.BLOCK,
+                        icon_color=ft.Colors.GREEN_400 if is_blocked else ft.Colors.RED_400,
+                        on_click=lambda _, ip=src_ip, b=is_blocked: unblock_ip(ip) if b else block_ip(ip)
+                    ),
+                ], alignment=ft.MainAxisAlignment.END, spacing=0)
+            ], tight=True),
+            bgcolor=card_color,
+            border=ft.border.all(1, border_color),
+            border_radius=10,
+            padding=10,
+            animate_scale=ft.Animation(300, ft.AnimationCurve.DECELERATE),
+            on_hover=lambda e: setattr(e.control, "scale", 1.02 if e.data == "true" else 1.0),
         )
 
-    return ft.Column(
+    # Paging state: only one page of cards exists at a time
+    state = {"page": 0, "total": 0}
+
+    ip_filter = ft.TextField(label="Source IP", width=180, dense=True, on_submit=lambda e: reload(0))
+    type_filter = ft.Dropdown(
+        label="Type", width=220, dense=True, value=ALL_TYPES,
+        options=[ft.dropdown.Option(ALL_TYPES)] + [ft.dropdown.Option(t) for t in get_attack_types()],
+        on_change=lambda e: reload(0),
+    )
+    page_text = ft.Text("", size=12, color=ft.Colors.GREY_400)
+    prev_button = ft.IconButton(ft.Icons.CHEVRON_LEFT, on_click=lambda e: reload(state["page"] - 1))
+    next_button = ft.IconButton(ft.Icons.CHEVRON_RIGHT, on_click=lambda e: reload(state["page"] + 1))
+
+    def current_filters():
+        return {
+            "src_ip": (ip_filter.value or "").strip() or None,
+            "attack_type": None if type_filter.value in (None, ALL_TYPES) else type_filter.value,
+        }
+
+    def update_pager():
+        pages = max(1, -(-state["total"] // PAGE_SIZE))
+        page_text.value = f"Page {state['page'] + 1} / {pages}  ({state['total']} attacks)"
+        prev_button.disabled = state["page"] == 0
+        next_button.disabled = state["page"] >= pages - 1
+
+    def load(page_index):
+        filters = current_filters()
+        state["total"] = count_alerts(**filters)
+        pages = max(1, -(-state["total"] // PAGE_SIZE))
+        state["page"] = min(max(0, page_index), pages - 1)
+        attacks = query_alerts(**filters, limit=PAGE_SIZE, offset=state["page"] * PAGE_SIZE)
+        grid.controls = [attack_card(attack) for attack in attacks]
+        update_pager()
+
+    def reload(page_index):
+        load(page_index)
+        page.update()
+
+    def refresh_blocked():
+        blocklist[:] = get_firewall_rules().get("blocklist", [])
+        reload(state["page"])
+
+    load(0)
+
+    # Stat values, kept to be updated in place
+    threats_text = ft.Text(str(stats["total"]), size=20, weight=ft.FontWeight.BOLD)
+    peak_text = ft.Text(str(stats["max_count"]), size=20, weight=ft.FontWeight.BOLD)
+
+    view = ft.Column(
         [
             header,
             # Stats Bar
@@ -226,20 +271,46 @@ def AttacksView(page: ft.Page, nav):
                 ft.Container(
                     content=ft.Column([
                         ft.Text("Threats", size=12, color=ft.Colors.RED_200),
-                        ft.Text(str(len(attacks)), size=20, weight=ft.FontWeight.BOLD),
+                        threats_text,
                     ]),
                     bgcolor=ft.Colors.GREY_900, padding=10, border_radius=10, expand=True
                 ),
                 ft.Container(
                     content=ft.Column([
                         ft.Text("Peak Intensity", size=12, color=ft.Colors.ORANGE_200),
-                        ft.Text(str(max((a.get('count', 1) for a in attacks), default=0)), size=20, weight=ft.FontWeight.BOLD),
+                        peak_text,
                     ]),
                     bgcolor=ft.Colors.GREY_900, padding=10, border_radius=10, expand=True
                 ),
             ], spacing=10),
             ft.Divider(),
+            # Filters and pager
+            ft.Row([
+                ip_filter, type_filter,
+                ft.Container(expand=True),
+                prev_button, page_text, next_button,
+            ], spacing=10, wrap=True),
             ft.Container(grid, expand=True)
         ],
         expand=True
     )
+
+    def apply_update(new_alerts):
+        """Puts cards for the new attacks on top of the first page and updates
+        the pager and tiles, without rebuilding the other cards."""
+        blocklist[:] = get_firewall_rules().get("blocklist", [])
+        filters = current_filters()
+        matching = [a for a in new_alerts if alert_matches(a, **filters)]
+        if matching and state["page"] == 0:
+            for attack in matching[-PAGE_SIZE:]: # oldest first: each one goes above the previous
+                grid.controls.insert(0, attack_card(attack))
+            del grid.controls[PAGE_SIZE:]
+        state["total"] = count_alerts(**filters)
+        update_pager()
+        stats = get_alert_stats()
+        threats_text.value = str(stats["total"])
+        peak_text.value = str(stats["max_count"])
+        return True
+
+    view.apply_update = apply_update
+    return view
@@ -1,5 +1,5 @@
 import flet as ft
-from utils.data_handler import get_firewall_rules, save_firewall_rules
+from utils.data_handler import get_firewall_rules, add_firewall_rule, remove_firewall_rule
 from core.firewall_manager import FirewallManager
 
 def FirewallView(page: ft.Page):
@@ -37,15 +37,13 @@ def FirewallView(page: ft.Page):
             # Real Block (Windows)
             FirewallManager.block_ip(ip_input.value)
             
-            blocklist.append(ip_input.value)
-            save_all()
+            save_change(add_firewall_rule("blocklist", ip_input.value))
             ip_input.value = ""
             refresh_tables()
             
     def add_to_whitelist(e):
          if ip_input.value and ip_input.value not in whitelist:
-            whitelist.append(ip_input.value)
-            save_all()
+            save_change(add_firewall_rule("whitelist", ip_input.value))
             ip_input.value = ""
             refresh_tables()
 
@@ -53,14 +51,16 @@ def FirewallView(page: ft.Page):
         if list_type == "block" and ip in blocklist:
             # Real Unblock (Windows)
             FirewallManager.unblock_ip(ip)
-            blocklist.remove(ip)
+            save_change(remove_firewall_rule("blocklist", ip))
         elif list_type == "white" and ip in whitelist:
-            whitelist.remove(ip)
-        save_all()
+            save_change(remove_firewall_rule("whitelist", ip))
         refresh_tables()
 
-    def save_all():
-        save_firewall_rules({"blocklist": blocklist, "whitelist": whitelist})
+    def save_change(rules):
+        # The file as written: also shows what the IDS changed meanwhile
+        if rules is not None:
+            blocklist[:] = rules["blocklist"]
+            whitelist[:] = rules["whitelist"]
         
     # Tables
     blocklist_table = ft.DataTable(
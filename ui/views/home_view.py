@@ -1,10 +1,9 @@
 import flet as ft
-from utils.data_handler import get_alerts, get_attacks, get_firewall_rules
+from utils.data_handler import get_alert_stats, get_firewall_rules
 
 def HomeView(page: ft.Page, nav):
-    # Fetch Data for Stats
-    alerts = get_alerts()
-    attacks = get_attacks()
+    # Fetch Data for Stats (precomputed aggregates, same numbers as the Alerts/Attacks views)
+    stats = get_alert_stats()
     rules = get_firewall_rules()
     
     # 1. Hero Section with Gradient
@@ -36,14 +35,17 @@ def HomeView(page: ft.Page, nav):
     ], spacing=10)
 
     # 3. Stats Section
+    stat_values = {} # label -> Text, updated in place on refresh
+
     def create_stat_tile(label, value, icon, color):
+        stat_values[label] = ft.Text(value, size=32, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE)
         return ft.Container(
             content=ft.Column([
                 ft.Row([
                     ft.Icon(icon, color=color, size=24),
                     ft.Text(label, size=12, color=ft.Colors.GREY_400, weight=ft.FontWeight.BOLD),
                 ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                ft.Text(value, size=32, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
+                stat_values[label],
             ], alignment=ft.MainAxisAlignment.CENTER, spacing=5),
             bgcolor=ft.Colors.with_opacity(0.05, ft.Colors.WHITE),
             border=ft.border.all(1, ft.Colors.with_opacity(0.1, ft.Colors.WHITE)),
@@ -55,8 +57,8 @@ def HomeView(page: ft.Page, nav):
         )
 
     stats_row = ft.Row([
-        create_stat_tile("Total Alerts", str(len(alerts)), ft.Icons.WARNING_ROUNDED, ft.Colors.ORANGE_400),
-        create_stat_tile("Threats", str(len(attacks)), ft.Icons.SECURITY_ROUNDED, ft.Colors.RED_400),
+        create_stat_tile("Total Alerts", str(stats["total"]), ft.Icons.WARNING_ROUNDED, ft.Colors.ORANGE_400),
+        create_stat_tile("Threats", str(stats["total"]), ft.Icons.SECURITY_ROUNDED, ft.Colors.RED_400),
         create_stat_tile("Firewall Rules", str(len(rules.get('blocklist', [])) + len(rules.get('whitelist', []))), ft.Icons.BLOCK_ROUNDED, ft.Colors.CYAN_400),
     ], spacing=20)
 
@@ -83,7 +85,7 @@ def HomeView(page: ft.Page, nav):
         create_action_card("Firewall Manager", "Control network access", ft.Icons.SHIELD_ROUNDED, 3, ft.Colors.CYAN_400),
     ], spacing=20)
 
-    return ft.Column([
+    view = ft.Column([
         status_indicator,
         ft.Divider(height=10, color=ft.Colors.TRANSPARENT),
         hero,
@@ -94,3 +96,16 @@ def HomeView(page: ft.Page, nav):
         ft.Text("QUICK NAVIGATION", size=14, weight=ft.FontWeight.BOLD, color=ft.Colors.GREY_500),
         actions_row,
     ], scroll=ft.ScrollMode.ADAPTIVE, expand=True)
+
+    def apply_update(new_alerts):
+        """Only the three counters change: update their text in place.
+        The totals come from the feed counters (or SQL), nothing is rescanned."""
+        rules = get_firewall_rules()
+        stats = get_alert_stats()
+        stat_values["Total Alerts"].value = str(stats["total"])
+        stat_values["Threats"].value = str(stats["total"])
+        stat_values["Firewall Rules"].value = str(len(rules.get('blocklist', [])) + len(rules.get('whitelist', [])))
+        return True
+
+    view.apply_update = apply_update
+    return view